@@ -13,14 +13,18 @@ import sys
 
 
 class MultiReceiverSectionSupport(collections.OrderedDict):
-    """This class adds an index number at the end of each [receiver] section."""
+    """This class adds an index number at the end of each [receiver] and [sdr] section."""
 
     index = 0
+    sdr_index = 0
 
     def __setitem__(self, key, val):
         if isinstance(val, dict) and key == "receiver":
             self.index = self.index + 1
             key += str(self.index)
+        elif isinstance(val, dict) and key == "sdr":
+            self.sdr_index = self.sdr_index + 1
+            key += str(self.sdr_index)
         collections.OrderedDict.__setitem__(self, key, val)
 
 
@@ -254,11 +258,45 @@ web_port = 7777
 web_authentication_token = [web_authentication_token]
 #for https support:
 #web_server_certfile=key_and_cert.pem
+#memory in MB used to cache radio signals of repeated commands (0 disables the cache)
+#waveform_cache_mb = 64
+#number of processes modulating radio signals, so that the web server does not stall (0 modulates in the server process)
+#modulation_processes = 1
+#memory in MB for radio signals modulated in the background after start-up, so that the first command is as fast as later ones (0 disables it).
+#With the waveform store, the signals are kept on disk instead, but still limited to this size
+#prewarm_mb = 0
+#disk space in MB for radio signals kept across restarts in ~/.cache/remoshock, which includes pre-warmed signals (0 disables it)
+#waveform_store_mb = 0
+#combine concurrent commands for receivers on the same frequency into one transmission
+#multiplex = true
+#number of times a command may be overtaken by commands on the current frequency to avoid retuning
+#retune_fairness_window = 3
+#keep the HackRF transmitting silence between commands, so that commands start within one buffer period
+#hot_radio = false
+#hold-to-activate commands are released, if the client does not send a heartbeat within this time
+#hold_heartbeat_timeout_ms = 1000
+#keep URH loaded in a worker process for devices used via urh_cli (e. g. LimeSDR) instead of starting urh_cli for each command
+#urh_worker = true
 
 # URH supports the following hardware, that can transmit on 27.195 MHz (upper/lower case is important):
 # HackRF, LimeSDR
 [sdr]
 
+#To use several SDR devices at the same time, add one [sdr] section for each. A receiver uses
+#the first device whose frequency range covers its frequency, unless its [receiver] section
+#selects a device by name, e. g. sdr = hackrf433
+#[sdr]
+#name = hackrf27
+#device = HackRF
+#serial = 0000000000000000a06063c8234e925f
+#min_frequency_mhz = 26
+#max_frequency_mhz = 28
+#
+#[sdr]
+#name = hackrf433
+#device = HackRF
+#serial = 0000000000000000a06063c8235a3d5f
+
 
 [randomizer]
 beep_probability_percent = 100
@@ -277,6 +315,8 @@ beep_shock_delay_ms = 1500
 """
 
         receiver_static_config = """
+#name of the [sdr] section used to send to this receiver, if there are several
+#sdr = hackrf433
 #limit_shock_max_power_percent = 100
 #limit_shock_max_duration_ms = 10000
 
@@ -287,7 +327,7 @@ beep_shock_delay_ms = 1500
 #random_shock_max_power_percent = 10
 """
 
-        config = config.replace("[sdr]", sdrs[sdr])
+        config = config.replace("[sdr]", sdrs[sdr], 1)
         config = config.replace("[web_authentication_token]", self.__generate_web_authentication_token())
 
         i = 0
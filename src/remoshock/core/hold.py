@@ -0,0 +1,141 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import logging
+import threading
+import time
+
+
+class Hold:
+    """an open-ended command, which lasts as long as the client holds it"""
+
+    def __init__(self, queued_command, timeout_s):
+        """creates a Hold
+
+        @param queued_command QueuedCommand of the maximal duration allowed for the receiver
+        @param timeout_s the hold is released, if no heartbeat is received for this time
+        """
+        self.hold_id = queued_command.command_id
+        self.queued_command = queued_command
+        self.timeout_s = timeout_s
+        self.started = time.monotonic()
+        self.expires = self.started + timeout_s
+
+
+    def to_dict(self):
+        """returns id, estimated timing and heartbeat timeout for clients"""
+        result = self.queued_command.to_dict()
+        result["max_duration_ms"] = self.queued_command.duration
+        result["heartbeat_timeout_ms"] = round(self.timeout_s * 1000)
+        return result
+
+
+
+class HoldManager:
+    """keeps track of hold-to-activate commands.
+
+    A hold is queued as command of the maximal duration allowed for the
+    receiver. The sender generates its frames just in time. The hold is
+    released, when the client stops it or does not send a heartbeat in
+    time. Releasing stops the transmission at the next buffer boundary."""
+
+    def __init__(self, cancel, timeout_ms):
+        """creates a HoldManager and starts the thread, which releases expired holds
+
+        @param cancel function called with a QueuedCommand to drop or stop it
+        @param timeout_ms a hold is released, if no heartbeat is received for this time
+        """
+        self.cancel = cancel
+        self.timeout_s = timeout_ms / 1000
+        self.started = 0
+        self.released = 0
+        self.expired = 0
+        self.__holds = {}
+        self.__condition = threading.Condition()
+        thread = threading.Thread(target=self.__run, name="holdmanager", daemon=True)
+        thread.start()
+
+
+    def add(self, queued_command):
+        """starts tracking a hold
+
+        @param queued_command QueuedCommand of the maximal duration allowed for the receiver
+        @return Hold
+        """
+        hold = Hold(queued_command, self.timeout_s)
+        with self.__condition:
+            self.__holds[hold.hold_id] = hold
+            self.started = self.started + 1
+            self.__condition.notify_all()
+        queued_command.future.add_done_callback(lambda _future: self.__forget(hold))
+        return hold
+
+
+    def heartbeat(self, hold_id):
+        """renews a hold
+
+        @param hold_id id of the hold
+        @return True if the hold is still active
+        """
+        with self.__condition:
+            hold = self.__holds.get(hold_id)
+            if hold is None:
+                return False
+            hold.expires = time.monotonic() + hold.timeout_s
+            self.__condition.notify_all()
+            return True
+
+
+    def release(self, hold_id):
+        """ends a hold, because the client let go
+
+        @param hold_id id of the hold
+        @return True if the hold was still active
+        """
+        with self.__condition:
+            hold = self.__holds.pop(hold_id, None)
+            if hold is None:
+                return False
+            self.released = self.released + 1
+        self.__cancel(hold, "released")
+        return True
+
+
+    def __forget(self, hold):
+        """stops tracking a hold, whose command has finished"""
+        with self.__condition:
+            self.__holds.pop(hold.hold_id, None)
+
+
+    def __cancel(self, hold, reason):
+        command = hold.queued_command
+        logging.info("{:9} receiver {:>1} {:} after {:>4} ms".format(
+            command.action.name, command.receiver, reason, round((time.monotonic() - hold.started) * 1000)))
+        self.cancel(command)
+
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                now = time.monotonic()
+                expired = [hold for hold in self.__holds.values() if hold.expires <= now]
+                for hold in expired:
+                    del self.__holds[hold.hold_id]
+                    self.expired = self.expired + 1
+                if len(expired) == 0:
+                    timeout = min([hold.expires for hold in self.__holds.values()], default=now + 60) - now
+                    self.__condition.wait(timeout)
+            for hold in expired:
+                self.__cancel(hold, "expired")
+
+
+    def get_statistics(self):
+        """returns the number of active, started, released and expired holds"""
+        with self.__condition:
+            return {
+                "active": len(self.__holds),
+                "started": self.started,
+                "released": self.released,
+                "expired": self.expired
+            }
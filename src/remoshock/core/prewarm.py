@@ -0,0 +1,98 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import logging
+import os
+import threading
+import time
+
+
+def lower_thread_priority():
+    """lowers the scheduling priority of the calling thread.
+
+    On Linux, each thread has its own nice value. On other systems,
+    this would lower the priority of the whole process, so it is skipped."""
+    if not hasattr(os, "setpriority") or not hasattr(threading, "get_native_id") or not os.uname().sysname == "Linux":
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except OSError:
+        pass
+
+
+
+class Prewarmer:
+    """modulates the frames of all commands of the configured receivers
+    in the background after boot.
+
+    The command space of a receiver is small: a few actions times 101
+    power levels. Once the frames are modulated, the first command of
+    a session is as fast as the following ones. Each sender limits the
+    size of the frames it prepares to prewarm_mb, whether it keeps them
+    in memory or on disk."""
+
+    def __init__(self, jobs):
+        """creates a Prewarmer
+
+        @param jobs list of (receiver number, receiver, sdr_sender) tuples
+        """
+        self.jobs = jobs
+        self.running = False
+        self.prepared = 0
+        self.skipped = 0
+        self.duration_s = 0
+
+
+    def start(self):
+        """starts the background thread"""
+        self.running = True
+        thread = threading.Thread(target=self.__run, name="prewarm", daemon=True)
+        thread.start()
+
+
+    def __run(self):
+        lower_thread_priority()
+        start = time.monotonic()
+        full_senders = set()
+        try:
+            for (number, receiver, sdr_sender) in self.jobs:
+                self.__prewarm_receiver(number, receiver, sdr_sender, full_senders)
+        except Exception:
+            logging.exception("Pre-warm failed")
+        finally:
+            self.duration_s = time.monotonic() - start
+            self.running = False
+        logging.info("Pre-warm finished: {} frames in {:.1f} s".format(self.prepared, self.duration_s))
+
+
+    def __prewarm_receiver(self, number, receiver, sdr_sender, full_senders):
+        plans = list(receiver.get_frame_plans())
+        if len(plans) == 0:
+            return
+
+        start = time.monotonic()
+        prepared = 0
+        for plan in plans:
+            if id(sdr_sender) in full_senders:
+                break
+            if not sdr_sender.prepare(plan):
+                logging.warning("Pre-warm: space for modulated frames (prewarm_mb) exhausted at receiver " + str(number))
+                full_senders.add(id(sdr_sender))
+                break
+            prepared = prepared + 1
+            self.prepared = self.prepared + 1
+
+        self.skipped = self.skipped + len(plans) - prepared
+        logging.info("Pre-warmed receiver {}: {} of {} frames in {:.1f} s".format(
+            number, prepared, len(plans), time.monotonic() - start))
+
+
+    def get_statistics(self):
+        """returns the progress of the pre-warm stage"""
+        return {
+            "running": self.running,
+            "prepared": self.prepared,
+            "skipped": self.skipped,
+            "seconds": round(self.duration_s, 1)
+        }
@@ -0,0 +1,17 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+from enum import Enum
+
+
+class Priority(Enum):
+    """Priority of commands.
+
+    Commands with a lower value are transmitted first and interrupt
+    running transmissions of commands with a higher value. Keep alive
+    commands are only transmitted, if nothing else is going on.
+    """
+    INTERACTIVE = 0
+    SCHEDULED = 1
+    KEEPALIVE = 2
@@ -2,6 +2,7 @@
 # Copyright nilswinter 2020-2025. License: AGPL
 # _____________________________________________
 
+import concurrent.futures
 import configparser
 import logging
 import logging.handlers
@@ -12,7 +13,12 @@ import threading
 
 from remoshock.core.action import Action
 from remoshock.core.config import ConfigManager
+from remoshock.core.hold import HoldManager
+from remoshock.core.prewarm import Prewarmer
+from remoshock.core.priority import Priority
 from remoshock.core.receiverproperties import ReceiverProperties
+from remoshock.core.sdrdevice import SdrDevice, route_to_device
+from remoshock.core.txqueue import QueuedCommand, TxQueue, estimate_airtime_ms
 
 from remoshock.receiver.arshock import ArduinoManager
 from remoshock.receiver.dogtra import Dogtra
@@ -27,7 +33,7 @@ from remoshock.scheduler.commandtask import CommandTask
 from remoshock.scheduler.periodictask import PeriodicTask
 from remoshock.scheduler.scheduler import scheduler
 
-lock = threading.RLock()
+from remoshock.util.transportlock import get_preemption_event
 
 
 class Remoshock:
@@ -114,14 +120,80 @@ class Remoshock:
         return None
 
 
-    def __instantitate_sdr_sender(self):
-        """creates a sdr_sender based on the configuration in remoshock.ini or the command line.
+    def __read_sdr_devices(self):
+        """reads the [sdr] sections of remoshock.ini. Without such sections,
+        the device configured by sdr= in the [global] section is used.
 
-        This method triggers a special case handling for HackRF devices.
+        @return list of SdrDevice objects
         """
-        sdr = self.config.get("global", "sdr", fallback=None)
+        default_device = self.config.get("global", "sdr", fallback=None)
         if "sdr" in self.args and self.args.sdr is not None:
-            sdr = self.args.sdr
+            default_device = self.args.sdr
+
+        devices = []
+        for section in self.config.sections():
+            if not section.startswith("sdr"):
+                continue
+            try:
+                min_frequency_mhz = self.config.getfloat(section, "min_frequency_mhz", fallback=None)
+                max_frequency_mhz = self.config.getfloat(section, "max_frequency_mhz", fallback=None)
+            except ValueError as e:
+                logging.error("Error parsing configuration file section " + section + ": " + str(e))
+                sys.exit(1)
+            devices.append(SdrDevice(
+                name=self.config.get(section, "name", fallback=section),
+                device=self.config.get(section, "device", fallback=default_device),
+                serial=self.config.get(section, "serial", fallback=None),
+                min_frequency=min_frequency_mhz * 1e6 if min_frequency_mhz is not None else None,
+                max_frequency=max_frequency_mhz * 1e6 if max_frequency_mhz is not None else None,
+                filename=self.config.get(section, "file", fallback=None)))
+
+        if len(devices) == 0:
+            devices.append(SdrDevice("sdr", default_device))
+        return devices
+
+
+    def __route_receiver(self, receiver, number, sdr_name):
+        """determines the transport used by a receiver
+
+        @param receiver the receiver
+        @param number number of the receiver
+        @param sdr_name name of the device configured in the [receiver] section, None for automatic selection
+        @return "arduino" or the name of a SdrDevice
+        """
+        if receiver.is_arduino_required():
+            return "arduino"
+
+        device = route_to_device(self.sdr_devices, receiver.create_plan().frequency, sdr_name)
+        if device is None:
+            logging.error("Unknown sdr \"" + sdr_name + "\" configured for receiver " + str(number) + " in remoshock.ini")
+            sys.exit(1)
+        if len(self.sdr_devices) > 1:
+            logging.info("Receiver " + str(number) + " uses " + device.name)
+        return device.name
+
+
+    def __get_tuning(self, receiver):
+        """returns the radio settings of a receiver, so that the TxQueue can
+        group commands which do not require retuning
+
+        @param receiver the receiver
+        @return tuple of frequency and sample rate, None for receivers without SDR
+        """
+        if not receiver.is_sdr_required():
+            return None
+        plan = receiver.create_plan()
+        return (plan.frequency, plan.sample_rate)
+
+
+    def __instantitate_sdr_sender(self, device):
+        """creates a sdr_sender for a device configured in remoshock.ini or on the command line.
+
+        This method triggers a special case handling for HackRF devices.
+
+        @param device SdrDevice
+        """
+        sdr = device.device
         if sdr is None:
             logging.error("SDR (software defined radio) hardware is required to send radio signals.")
             logging.error("Please edit remoshock.ini and add an entry sdr=... in the [global] section.")
@@ -131,9 +203,20 @@ class Remoshock:
             logging.error("")
             sys.exit(1)
 
+        if sdr.lower() == "file":
+            from remoshock.sdr.filesender import FileSender
+            filename = device.filename or os.getenv("HOME") + "/remoshock-" + device.name + ".log"
+            logging.info("Using fake SDR " + device.name + ", which writes to " + filename)
+            return FileSender(device.name, filename)
+
         logging.info("Please make sure your SDR sending hardware is connected and ready. Avoid USB hubs.")
         logging.info("")
 
+        # URH handles only one HackRF per process internally
+        if sdr.lower() == "hackrf" and self.internal_hackrf_used:
+            logging.info("Using urh_cli for additional HackRF " + device.name)
+            sdr = "hackrfcli"
+
         if sdr.lower() == "hackrf":
             logging.info("We are using internal URH invokation for HackRF. This is recommanded because it")
             logging.info("prevents a one second delay. But it might cause Python errors, if the URH version is")
@@ -141,7 +224,15 @@ class Remoshock:
             logging.info("")
 
             from remoshock.sdr.urhinternal import UrhInternalSender
-            sender = UrhInternalSender(self.args.verbose)
+            waveform_cache_mb = self.config.getint("global", "waveform_cache_mb", fallback=64)
+            multiplex = self.config.getboolean("global", "multiplex", fallback=True)
+            hot_radio = self.config.getboolean("global", "hot_radio", fallback=False)
+            modulation_processes = self.config.getint("global", "modulation_processes", fallback=1)
+            prewarm_mb = self.config.getint("global", "prewarm_mb", fallback=0)
+            waveform_store_mb = self.config.getint("global", "waveform_store_mb", fallback=0)
+            sender = UrhInternalSender(self.args.verbose, waveform_cache_mb, multiplex, device.serial, hot_radio,
+                                       modulation_processes, prewarm_mb, waveform_store_mb)
+            self.internal_hackrf_used = True
             return sender
 
         if sdr.lower() == "hackrfcli":
@@ -149,7 +240,8 @@ class Remoshock:
 
         logging.info("Using " + sdr + " via urh_cli")
         from remoshock.sdr.urhcli import UrhCliSender
-        return UrhCliSender(sdr, self.args.verbose)
+        persistent = self.config.getboolean("global", "urh_worker", fallback=True)
+        return UrhCliSender(sdr, self.args.verbose, device.serial, persistent)
 
 
     def _setup_from_config(self):
@@ -157,12 +249,14 @@ class Remoshock:
             self.config_manager = ConfigManager(self.args)
             self.config = self.config_manager.config
             receivers = []
+            sdr_names = []
             for receiver_section_name in self.config.sections():
                 if receiver_section_name.startswith("receiver"):
                     try:
                         receiver = self.__instantiate_receiver(receiver_section_name)
                         if receiver is not None:
                             receivers.append(receiver)
+                            sdr_names.append(self.config.get(receiver_section_name, "sdr", fallback=None))
                     except configparser.NoOptionError as e:
                         logging.error("Error reading configuration file: " + str(e))
 
@@ -170,6 +264,15 @@ class Remoshock:
                 logging.error("No valid receivers configured in remoshock.ini")
                 sys.exit(1)
             self.receivers = receivers
+            self.sdr_devices = self.__read_sdr_devices()
+            self.receiver_transports = [self.__route_receiver(receiver, i + 1, sdr_names[i])
+                                        for (i, receiver) in enumerate(receivers)]
+            self.receiver_tunings = [self.__get_tuning(receiver) for receiver in receivers]
+            self.tx_queues = {}
+            self.tx_queues_lock = threading.Lock()
+            heartbeat_timeout_ms = self.config.getint("global", "hold_heartbeat_timeout_ms", fallback=1000)
+            self.hold_manager = HoldManager(self.__cancel_command, heartbeat_timeout_ms)
+            self.prewarmer = None
         except configparser.NoOptionError as e:
             logging.error(e)
             sys.exit(1)
@@ -188,36 +291,54 @@ class Remoshock:
         self._start_logging()
         self._setup_from_config()
         arduino_required = False
-        sdr_required = False
 
         for receiver in self.receivers:
             if receiver.is_arduino_required():
                 arduino_required = True
-            if receiver.is_sdr_required():
-                sdr_required = True
 
         arduino_manager = None
         if arduino_required:
             arduino_manager = ArduinoManager()
             arduino_manager.boot()
+        self.arduino_manager = arduino_manager
 
-        sdr_sender = None
-        if sdr_required:
-            sdr_sender = self.__instantitate_sdr_sender()
+        # only devices used by a receiver are initialized
+        self.sdr_senders = {}
+        self.internal_hackrf_used = False
+        for (receiver, transport) in zip(self.receivers, self.receiver_transports):
+            if receiver.is_sdr_required() and transport not in self.sdr_senders:
+                device = next(device for device in self.sdr_devices if device.name == transport)
+                self.sdr_senders[transport] = self.__instantitate_sdr_sender(device)
 
         i = 1
-        for receiver in self.receivers:
-            receiver.boot(arduino_manager, sdr_sender)
+        for (receiver, transport) in zip(self.receivers, self.receiver_transports):
+            receiver.boot(arduino_manager, self.sdr_senders.get(transport))
 
             # schedule keep awake timer
             awake_time_s = receiver.receiver_properties.awake_time_s
             if awake_time_s > 0:
-                command_task = CommandTask(None, None, None, self, i, Action.KEEPAWAKE, 0, 250, "keepalive")
+                command_task = CommandTask(None, None, None, self, i, Action.KEEPAWAKE, 0, 250, "keepalive", Priority.KEEPALIVE)
                 periodic_task = PeriodicTask(awake_time_s / 2 - 5, command_task)
                 scheduler().schedule_task(periodic_task)
 
             i = i + 1
 
+        if self.config.getint("global", "prewarm_mb", fallback=0) > 0:
+            self.__start_prewarm()
+
+
+    def __start_prewarm(self):
+        """modulates the frames of all SDR receivers in the background"""
+        jobs = []
+        for (i, (receiver, transport)) in enumerate(zip(self.receivers, self.receiver_transports)):
+            sdr_sender = self.sdr_senders.get(transport)
+            if receiver.is_sdr_required() and sdr_sender is not None:
+                jobs.append((i + 1, receiver, sdr_sender))
+        if len(jobs) > 0:
+            logging.info("Pre-warming radio signals of " + str(len(jobs)) + " receivers in the background")
+            self.prewarmer = Prewarmer(jobs)
+            self.prewarmer.start()
+
 
     def _start_logging(self):
         """configures the logging system"""
@@ -245,12 +366,56 @@ class Remoshock:
         @param power power level (1-100)
         @param duration duration in ms
         """
-        with lock:
-            self.receivers[receiver - 1].command(action, power, duration, beep_shock_delay_ms)
+        # Transmissions are serialized by the lock of the SDR or Arduino
+        # in use, so that independent hardware transmits concurrently.
+        self.receivers[receiver - 1].command(action, power, duration, beep_shock_delay_ms)
 
 
-    def command(self, receiver, action, power, duration, source="client", beep_shock_delay_ms=None):
-        """sends a command to the indicated receiver
+    def _get_tx_queue(self, receiver):
+        """returns the queue of the transport used by the indicated receiver
+
+        @param receiver number of receiver to use
+        """
+        transport = self.receiver_transports[receiver - 1]
+
+        with self.tx_queues_lock:
+            tx_queue = self.tx_queues.get(transport)
+            if tx_queue is None:
+                # one worker per receiver, so that a receiver waiting for the
+                # delay of BEEPSHOCK does not block the others
+                workers = self.receiver_transports.count(transport)
+                fairness_window = self.config.getint("global", "retune_fairness_window", fallback=3)
+                tx_queue = TxQueue(transport, self.__execute_queued_command, workers, fairness_window)
+                self.tx_queues[transport] = tx_queue
+            return tx_queue
+
+
+    def __execute_queued_command(self, command):
+        self._process_command(command.receiver, command.action, command.power, command.duration, command.beep_shock_delay_ms)
+
+
+    def command(self, receiver, action, power, duration, source="client", beep_shock_delay_ms=None, priority=Priority.INTERACTIVE):
+        """sends a command to the indicated receiver and waits until it was transmitted
+
+        @param action action to perform (e. g. BEEP)
+        @param receiver number of receiver to use
+        @param power power level (1-100)
+        @param duration duration in ms
+        @param source source of the command (e. g. web, cli, ...)
+        @param beep_shock_delay_ms delay in ms for beepshock command
+        @param priority Priority of the command
+        """
+        queued_command = self.submit(receiver, action, power, duration, source, beep_shock_delay_ms, priority)
+        if queued_command:
+            try:
+                queued_command.result()
+            except concurrent.futures.CancelledError:
+                pass
+
+
+    def submit(self, receiver, action, power, duration, source="client", beep_shock_delay_ms=None, priority=Priority.INTERACTIVE,
+               mergeable=True):
+        """queues a command for the indicated receiver without waiting for its transmission
 
         @param action action to perform (e. g. BEEP)
         @param receiver number of receiver to use
@@ -258,6 +423,10 @@ class Remoshock:
         @param duration duration in ms
         @param source source of the command (e. g. web, cli, ...)
         @param beep_shock_delay_ms delay in ms for beepshock command
+        @param priority Priority of the command
+        @param mergeable whether the command may be merged with other commands for the receiver
+        @return QueuedCommand with id, estimated timing and a future, None if the command is invalid,
+                False if there is nothing to send (duration 0)
         """
 
         if receiver < 1 or receiver > len(self.receivers):
@@ -282,18 +451,102 @@ class Remoshock:
             duration = receiver_properties.limit_shock_max_duration_ms
 
         if duration == 0:
-            return
+            return False
 
+        # commands resulting in the same transmission get the same power level, so that they can be merged
+        (action, normalized_power, normalized_duration) = self.receivers[receiver - 1].canonicalize(action, power, duration)
+        effective = "" if normalized_power == power else " (requested {} %)".format(power)
+        power = normalized_power
         if self.debug_duration_in_message_count:
             normalized_duration = duration
-            logging.info("{:9} receiver {:>1} at {:>3} % for {:>4} n by {:}".format(action.name, receiver, power, normalized_duration, source))
+            logging.info("{:9} receiver {:>1} at {:>3} % for {:>4} n by {:}{:}".format(action.name, receiver, power, normalized_duration, source, effective))
         else:
-            duration_increment_ms = receiver_properties.duration_increment_ms
-            duration_min_ms = receiver_properties.duration_min_ms
-            normalized_duration = max(duration_min_ms, round(duration / duration_increment_ms) * duration_increment_ms)
-            logging.info("{:9} receiver {:>1} at {:>3} % for {:>4} ms by {:}".format(action.name, receiver, power, normalized_duration, source))
+            logging.info("{:9} receiver {:>1} at {:>3} % for {:>4} ms by {:}{:}".format(action.name, receiver, power, normalized_duration, source, effective))
+
+        delay = beep_shock_delay_ms or receiver_properties.beep_shock_delay_ms
+        airtime_ms = estimate_airtime_ms(action, normalized_duration, delay)
+        queued_command = QueuedCommand(receiver, action, power, normalized_duration, source, beep_shock_delay_ms, airtime_ms,
+                                       priority, receiver_properties.limit_shock_max_duration_ms if mergeable else None,
+                                       self.receiver_tunings[receiver - 1])
+        return self._get_tx_queue(receiver).submit(queued_command)
+
+
+    def hold(self, receiver, action, power, source="client"):
+        """starts an open-ended command, which lasts until it is released, until
+        the client stops sending heartbeats, or until the maximal duration
+        allowed for the receiver has been reached
+
+        @param receiver number of receiver to use
+        @param action action to perform (e. g. VIBRATE)
+        @param power power level (1-100)
+        @param source source of the command (e. g. web, cli, ...)
+        @return Hold with id, None if the command is invalid
+        """
+        if receiver < 1 or receiver > len(self.receivers):
+            logging.error("Receiver number \"" + str(receiver) + "\" is out of range. It should be between 1 and " + str(len(self.receivers)))
+            return None
+
+        if action == Action.BEEPSHOCK:
+            logging.error("BEEPSHOCK cannot be held")
+            return None
+
+        # the Arduino cannot stop a command early
+        if not self.receivers[receiver - 1].is_sdr_required():
+            logging.error("Receiver " + str(receiver) + " does not support hold-to-activate commands")
+            return None
 
-        self._process_command(receiver, action, power, normalized_duration, beep_shock_delay_ms)
+        max_duration = min(10000, self.receivers[receiver - 1].receiver_properties.limit_shock_max_duration_ms)
+        queued_command = self.submit(receiver, action, power, max_duration, source, mergeable=False)
+        if not queued_command:
+            return None
+        return self.hold_manager.add(queued_command)
+
+
+    def hold_heartbeat(self, hold_id):
+        """renews a hold started by hold()
+
+        @param hold_id id of the hold
+        @return True if the hold is still active
+        """
+        return self.hold_manager.heartbeat(hold_id)
+
+
+    def release_hold(self, hold_id):
+        """ends a hold started by hold()
+
+        @param hold_id id of the hold
+        @return True if the hold was still active
+        """
+        return self.hold_manager.release(hold_id)
+
+
+    def __cancel_command(self, queued_command):
+        self._get_tx_queue(queued_command.receiver).cancel(queued_command)
+
+
+    def stop(self, receiver=None):
+        """stops transmissions at once, drops queued commands and cancels
+        groups of scheduled commands
+
+        @param receiver number of receiver to stop, None for all receivers
+        @return number of dropped or stopped commands, None if the receiver is invalid
+        """
+        if receiver is not None and (receiver < 1 or receiver > len(self.receivers)):
+            logging.error("Invalid receiver number: " + str(receiver))
+            return None
+
+        logging.info("STOP      receiver " + ("all" if receiver is None else str(receiver)))
+
+        def matches(task):
+            task = getattr(task, "task", task)
+            return isinstance(task, CommandTask) and (receiver is None or task.receiver == receiver)
+
+        # cancel scheduled commands first, so that they do not refill the queues
+        scheduler().cancel_matching_groups(matches)
+
+        with self.tx_queues_lock:
+            tx_queues = list(self.tx_queues.values())
+        return sum(tx_queue.stop(receiver) for tx_queue in tx_queues)
 
 
     def get_receiver_properties(self, receiver):
@@ -310,7 +563,7 @@ class Remoshock:
 
         config = {}
         for section in self.config.sections():
-            if not section.startswith("#") and not section.startswith("receiver") and not section == "global":
+            if not section.startswith("#") and not section.startswith("receiver") and not section.startswith("sdr") and not section == "global":
                 config[section] = dict(self.config[section])
         result["applications"] = config
 
@@ -328,6 +581,21 @@ class Remoshock:
         return result
 
 
+    def get_statistics(self):
+        """get statistics about the transmission pipeline (e. g. cache hits, lock wait times)"""
+        result = {}
+        if len(self.sdr_senders) > 0:
+            result["sdr"] = {name: sdr_sender.get_statistics() for (name, sdr_sender) in self.sdr_senders.items()}
+        if self.arduino_manager is not None:
+            result["arduino"] = self.arduino_manager.get_statistics()
+        with self.tx_queues_lock:
+            result["queues"] = {name: tx_queue.get_statistics() for (name, tx_queue) in self.tx_queues.items()}
+        result["holds"] = self.hold_manager.get_statistics()
+        if self.prewarmer is not None:
+            result["prewarm"] = self.prewarmer.get_statistics()
+        return result
+
+
 
 class RemoshockMock(Remoshock):
     """A mock used for testing without requiring any SDR hardware."""
@@ -336,9 +604,16 @@ class RemoshockMock(Remoshock):
     def _process_command(self, _receiver, action, _power, duration, beep_shock_delay_ms=None):
         """wait but do nothing, because this is a mock only"""
 
+        duration_s = duration / 1000
         if action == Action.BEEPSHOCK:
-            time.sleep((beep_shock_delay_ms or 1000) / 1000 + 0.2)
-        time.sleep(duration / 1000)
+            duration_s = duration_s + (beep_shock_delay_ms or 1000) / 1000 + 0.2
+
+        # like a real sender, stop early if asked to
+        preempted = get_preemption_event()
+        if preempted is None:
+            time.sleep(duration_s)
+        else:
+            preempted.wait(duration_s)
 
 
     def boot(self):
@@ -349,4 +624,6 @@ class RemoshockMock(Remoshock):
         self._start_logging()
 
         self._setup_from_config()
+        self.sdr_senders = {}
+        self.arduino_manager = None
         logging.info("Loaded mock")
@@ -0,0 +1,74 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+
+class SdrDevice:
+    """a software defined radio configured in a [sdr] section of remoshock.ini.
+
+    Example for a HackRF sending on 27 MHz and another one for all other receivers:
+
+        [sdr]
+        name = hackrf27
+        device = HackRF
+        serial = 0000000000000000a06063c8234e925f
+        min_frequency_mhz = 26
+        max_frequency_mhz = 28
+
+        [sdr]
+        name = hackrf433
+        device = HackRF
+        serial = 0000000000000000a06063c8235a3d5f
+
+    Receivers are routed to a device by an explicit sdr=name entry in their
+    [receiver] section, or to the first device whose band covers their
+    frequency."""
+
+    def __init__(self, name, device, serial=None, min_frequency=None, max_frequency=None, filename=None):
+        """creates a SdrDevice
+
+        @param name name used by receivers to refer to this device
+        @param device type of hardware (e. g. HackRF, HackRFcli, LimeSDR) or "file" for a fake device
+        @param serial serial number of the device, None to use any device
+        @param min_frequency lowest frequency in Hz this device is used for, None for no limit
+        @param max_frequency highest frequency in Hz this device is used for, None for no limit
+        @param filename file that a fake device writes transmissions to
+        """
+        self.name = name
+        self.device = device
+        self.serial = serial
+        self.min_frequency = min_frequency
+        self.max_frequency = max_frequency
+        self.filename = filename
+
+
+    def covers(self, frequency):
+        """checks whether the frequency is in the band of this device"""
+        if self.min_frequency is not None and frequency < self.min_frequency:
+            return False
+        if self.max_frequency is not None and frequency > self.max_frequency:
+            return False
+        return True
+
+
+    def is_band_limited(self):
+        return self.min_frequency is not None or self.max_frequency is not None
+
+
+
+def route_to_device(devices, frequency, name=None):
+    """selects the device for a receiver
+
+    @param devices list of SdrDevice objects
+    @param frequency frequency of the receiver in Hz
+    @param name name of the device requested in the configuration of the receiver, None for automatic selection
+    @return the selected SdrDevice, None if the requested device does not exist
+    """
+    if name is not None:
+        return next((device for device in devices if device.name == name), None)
+
+    # prefer devices dedicated to a band over general purpose devices
+    for device in sorted(devices, key=lambda device: not device.is_band_limited()):
+        if device.covers(frequency):
+            return device
+    return devices[0]
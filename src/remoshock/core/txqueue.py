@@ -0,0 +1,369 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import collections
+import concurrent.futures
+import itertools
+import logging
+import threading
+import time
+
+from remoshock.core.action import Action
+from remoshock.core.priority import Priority
+from remoshock.util.transportlock import set_thread_priority
+
+
+command_ids = itertools.count(1)
+
+# outcome of a command, which was executed
+COMPLETED = "completed"
+PREEMPTED = "preempted"
+STOPPED = "stopped"
+
+
+class QueuedCommand:
+    """a command waiting for transmission"""
+
+    def __init__(self, receiver, action, power, duration, source, beep_shock_delay_ms, airtime_ms,
+                 priority=Priority.INTERACTIVE, max_duration=None, tuning=None):
+        """creates a QueuedCommand
+
+        @param receiver number of receiver to use
+        @param action action to perform (e. g. BEEP)
+        @param power power level (1-100)
+        @param duration duration in ms
+        @param source source of the command (e. g. web, cli, ...)
+        @param beep_shock_delay_ms delay in ms for beepshock command
+        @param airtime_ms estimated time required to execute the command
+        @param priority Priority of the command
+        @param max_duration limit for the duration of merged commands, None to prevent merging
+        @param tuning radio settings (e. g. frequency and sample rate) required by the command, None if not applicable
+        """
+        self.command_id = next(command_ids)
+        self.receiver = receiver
+        self.action = action
+        self.power = power
+        self.duration = duration
+        self.source = source
+        self.beep_shock_delay_ms = beep_shock_delay_ms
+        self.airtime_ms = airtime_ms
+        self.priority = priority
+        self.max_duration = max_duration
+        self.tuning = tuning
+        self.overtaken = 0
+        self.preempted = threading.Event()
+        self.stopped = False
+        self.outcome = None
+        self.estimated_start = None
+        self.estimated_finish = None
+        self.future = concurrent.futures.Future()
+
+
+    def result(self, timeout=None):
+        """waits until the command was transmitted"""
+        return self.future.result(timeout)
+
+
+    def wait_for_outcome(self, timeout=None):
+        """waits until the command was executed
+
+        @return COMPLETED, PREEMPTED by a more urgent command or STOPPED,
+                None if the command was dropped before it was started"""
+        try:
+            self.future.result(timeout)
+        except concurrent.futures.CancelledError:
+            return None
+        return self.outcome
+
+
+    def to_dict(self):
+        """returns id and estimated timing (seconds since the epoch) for clients"""
+        return {
+            "id": self.command_id,
+            "estimated_start": round(self.estimated_start, 3),
+            "estimated_finish": round(self.estimated_finish, 3)
+        }
+
+
+
+def estimate_airtime_ms(action, duration, beep_shock_delay_ms):
+    """estimates how long it takes to execute a command
+
+    @param action action to perform (e. g. BEEP)
+    @param duration duration in ms
+    @param beep_shock_delay_ms delay in ms for beepshock command
+    """
+    if action == Action.BEEPSHOCK:
+        return duration + beep_shock_delay_ms
+    return duration
+
+
+
+class TxQueue:
+    """queues commands for one transport (e. g. the SDR or the Arduino).
+
+    Commands are executed by worker threads in the order of their priority
+    and submission. Commands for the same receiver never run concurrently.
+    Commands for different receivers may, because the transport lock decides
+    who is transmitting. This allows a sender to serve other receivers while
+    one receiver waits (e. g. during the delay of BEEPSHOCK).
+
+    A command is merged into the last pending command of the same receiver,
+    if they are compatible: The durations of commands with same action and
+    power are added. A newer BEEP supersedes an older one.
+
+    Keep alive commands are only started, if no other command is running.
+    A running command is asked to stop transmitting, if a more urgent
+    command for the same receiver is submitted.
+
+    Commands of the same priority, which use the current tuning of the
+    radio, may overtake commands that require retuning. To be fair, a
+    command is overtaken at most fairness_window times."""
+
+    def __init__(self, name, execute, workers, fairness_window=3):
+        """creates a TxQueue and starts its worker threads
+
+        @param name name of the transport
+        @param execute function called with a QueuedCommand to execute it
+        @param workers number of worker threads
+        @param fairness_window number of times a command may be overtaken to avoid retuning
+        """
+        self.name = name
+        self.execute = execute
+        self.fairness_window = fairness_window
+        self.processed = 0
+        self.preempted = 0
+        self.stopped = 0
+        self.merged = 0
+        self.reordered = 0
+        self.retunes = 0
+        self.__retune_times = collections.deque()
+        self.__tuning = None
+        self.__pending = []
+        self.__running = {}
+        self.__idle_at = {}
+        self.__condition = threading.Condition()
+        for i in range(0, workers):
+            thread = threading.Thread(target=self.__run, name="txqueue-" + name + "-" + str(i), daemon=True)
+            thread.start()
+
+
+    def submit(self, command):
+        """adds a command to the queue and estimates its start and finish time
+
+        @param command QueuedCommand
+        @return the command, or the pending command it was merged into
+        """
+        with self.__condition:
+            merged = self.__merge(command)
+            if merged is not None:
+                return merged
+
+            # commands are not delayed by less urgent ones
+            now = time.time()
+            idle_at = [finish for (priority, finish) in self.__idle_at.items() if priority.value <= command.priority.value]
+            command.estimated_start = max([now] + idle_at)
+            command.estimated_finish = command.estimated_start + command.airtime_ms / 1000
+            self.__idle_at[command.priority] = max(self.__idle_at.get(command.priority, 0), command.estimated_finish)
+
+            running = self.__running.get(command.receiver)
+            if running is not None and running.priority.value > command.priority.value:
+                logging.info("Preempting " + running.action.name + " of receiver " + str(running.receiver))
+                self.preempted = self.preempted + 1
+                running.preempted.set()
+
+            self.__pending.append(command)
+            self.__condition.notify_all()
+        return command
+
+
+    def __merge(self, command):
+        """merges a command into the last pending command of the same receiver
+
+        @return the pending command, None if the commands are not compatible
+        """
+        pending = [other for other in self.__pending if other.receiver == command.receiver]
+        if len(pending) == 0:
+            return None
+        last = pending[-1]
+        if last.max_duration is None or command.max_duration is None:
+            return None
+        if last.action != command.action or last.priority != command.priority or command.action == Action.BEEPSHOCK:
+            return None
+
+        if command.action == Action.BEEP:
+            power = command.power
+            duration = command.duration
+        elif last.power == command.power and last.duration + command.duration <= command.max_duration:
+            power = last.power
+            duration = last.duration + command.duration
+        else:
+            return None
+
+        added_ms = duration - last.duration
+        last.power = power
+        last.duration = duration
+        last.airtime_ms = last.airtime_ms + added_ms
+        last.estimated_finish = last.estimated_finish + added_ms / 1000
+        self.__idle_at[last.priority] = self.__idle_at[last.priority] + added_ms / 1000
+        self.merged = self.merged + 1
+        logging.info("{:9} receiver {:>1} merged into command {:} at {:>3} % for {:>4} ms".format(
+            command.action.name, command.receiver, last.command_id, power, duration))
+        return last
+
+
+    def stop(self, receiver=None):
+        """drops pending commands and asks running commands to stop transmitting.
+
+        This does not wait for the transport lock, running transmissions
+        stop at the next buffer boundary.
+
+        @param receiver number of receiver, None for all receivers
+        @return number of dropped and stopped commands
+        """
+        with self.__condition:
+            dropped = [command for command in self.__pending if receiver is None or command.receiver == receiver]
+            for command in dropped:
+                self.__pending.remove(command)
+                command.future.cancel()
+
+            running = [command for command in self.__running.values() if receiver is None or command.receiver == receiver]
+            for command in running:
+                command.stopped = True
+                command.preempted.set()
+
+            self.stopped = self.stopped + len(dropped) + len(running)
+            self.__condition.notify_all()
+            return len(dropped) + len(running)
+
+
+    def cancel(self, command):
+        """drops a pending command or asks it to stop transmitting, if it is running
+
+        @param command QueuedCommand
+        @return True if the command was pending or running
+        """
+        with self.__condition:
+            if command in self.__pending:
+                self.__pending.remove(command)
+                command.future.cancel()
+                self.__condition.notify_all()
+                return True
+            if self.__running.get(command.receiver) is command:
+                command.stopped = True
+                command.preempted.set()
+                return True
+            return False
+
+
+    def __is_startable(self, command):
+        if command.receiver in self.__running:
+            return False
+        if command.priority == Priority.KEEPALIVE:
+            return len(self.__running) == 0
+        return True
+
+
+    def __next_command(self):
+        """waits for the most urgent command, which may be started"""
+        with self.__condition:
+            while True:
+                startable = [command for command in self.__pending if self.__is_startable(command)]
+                if len(startable) > 0:
+                    # sort is stable, so commands of the same priority stay in order
+                    command = sorted(startable, key=lambda command: command.priority.value)[0]
+                    command = self.__avoid_retune(command, startable)
+                    self.__pending.remove(command)
+                    self.__running[command.receiver] = command
+                    self.__track_tuning(command)
+                    return command
+                self.__condition.wait()
+
+
+    def __avoid_retune(self, command, startable):
+        """selects a command of the same priority, which uses the current tuning
+
+        @param command the next command in order
+        @param startable commands which may be started
+        @return the selected command
+        """
+        if command.tuning is None or command.tuning == self.__tuning:
+            return command
+        candidates = [other for other in startable if other.priority == command.priority]
+        for (i, candidate) in enumerate(candidates):
+            if candidate.tuning == self.__tuning and candidate.tuning is not None:
+                overtaken = candidates[:i]
+                if any(other.overtaken >= self.fairness_window for other in overtaken):
+                    return command
+                for other in overtaken:
+                    other.overtaken = other.overtaken + 1
+                self.reordered = self.reordered + 1
+                return candidate
+        return command
+
+
+    def __track_tuning(self, command):
+        """counts the changes of the tuning of the radio"""
+        if command.tuning is None:
+            return
+        if self.__tuning is not None and self.__tuning != command.tuning:
+            self.retunes = self.retunes + 1
+            self.__retune_times.append(time.monotonic())
+        self.__tuning = command.tuning
+
+
+    def __retunes_per_minute(self):
+        while len(self.__retune_times) > 0 and self.__retune_times[0] < time.monotonic() - 60:
+            self.__retune_times.popleft()
+        return len(self.__retune_times)
+
+
+    def __run(self):
+        while True:
+            command = self.__next_command()
+            try:
+                set_thread_priority(command.priority.value, command.preempted)
+                if command.future.set_running_or_notify_cancel():
+                    result = self.execute(command)
+                    command.outcome = self.__get_outcome(command)
+                    command.future.set_result(result)
+            except Exception as e:
+                logging.exception("Command " + str(command.command_id) + " failed")
+                command.future.set_exception(e)
+            finally:
+                set_thread_priority(None)
+                with self.__condition:
+                    del self.__running[command.receiver]
+                    self.processed = self.processed + 1
+                    if len(self.__pending) == 0 and len(self.__running) == 0:
+                        self.__idle_at = {}
+                    self.__condition.notify_all()
+
+
+    def __get_outcome(self, command):
+        """tells whether the command was transmitted completely"""
+        with self.__condition:
+            if command.stopped:
+                return STOPPED
+            if command.preempted.is_set():
+                logging.info(command.action.name + " of receiver " + str(command.receiver) + " was preempted")
+                return PREEMPTED
+            return COMPLETED
+
+
+    def get_statistics(self):
+        """returns the number of pending, running, processed, preempted, stopped, merged
+        and reordered commands and the number of retunes"""
+        with self.__condition:
+            return {
+                "pending": len(self.__pending),
+                "running": len(self.__running),
+                "processed": self.processed,
+                "preempted": self.preempted,
+                "stopped": self.stopped,
+                "merged": self.merged,
+                "reordered": self.reordered,
+                "retunes": self.retunes,
+                "retunes_per_minute": self.__retunes_per_minute()
+            }
@@ -2,10 +2,12 @@
 # Copyright nilswinter 2020-2025. License: AGPL
 # _____________________________________________
 
+import concurrent.futures
 import json
 import logging
 import os
 import shutil
+import time
 
 from urllib.parse import parse_qsl, urlparse
 
@@ -57,7 +59,12 @@ class RestHandler:
 
 
     def handle_command(self, params):
-        """Sends the specified command to specified receiver"""
+        """Queues the specified command for the specified receiver. If the parameter wait
+        is set, the answer is sent after the command was executed and tells whether it
+        was "completed", "preempted" by a more urgent command or "stopped".
+
+        @return id and estimated timing of the command, an empty dict if there is nothing
+                to send (duration 0), None if the command was rejected"""
 
         action = Action[params["action"]]
         receiver = int(params["receiver"])
@@ -68,7 +75,66 @@ class RestHandler:
         if action not in [Action.LIGHT, Action.BEEP, Action.VIBRATE, Action.SHOCK, Action.BEEPSHOCK]:
             raise Exception("Invalid action")
 
-        self.requesthandler.remoshock.command(receiver, action, power, duration, "web-" + source)
+        queued_command = self.requesthandler.remoshock.submit(receiver, action, power, duration, "web-" + source)
+        if queued_command is None:
+            return None
+        if queued_command is False:
+            # like before commands were queued, a command without duration is accepted as no-op
+            return {}
+        result = queued_command.to_dict()
+        if "wait" in params and params["wait"] not in [False, "false", "0"]:
+            result["result"] = self.wait_for_outcome(queued_command)
+        return result
+
+
+    def wait_for_outcome(self, queued_command):
+        """waits until the command was executed
+
+        @return "completed", "preempted", "stopped", "dropped" if the command was
+                stopped before it was started, "pending" if it is still queued"""
+        timeout = max(0, queued_command.estimated_finish - time.time()) + 10
+        try:
+            return queued_command.wait_for_outcome(timeout) or "dropped"
+        except concurrent.futures.TimeoutError:
+            return "pending"
+
+
+    def handle_hold(self, path, params):
+        """Starts, renews or releases a hold-to-activate command
+
+        @return id and timing of a started hold, True if a hold was renewed or released,
+                None if the command was rejected or the hold is no longer active"""
+
+        remoshock = self.requesthandler.remoshock
+        if "start" in path:
+            action = Action[params["action"]]
+            receiver = int(params["receiver"])
+            power = int(params["power"])
+            source = params["source"] if "source" in params else "client"
+
+            if action not in [Action.LIGHT, Action.BEEP, Action.VIBRATE, Action.SHOCK]:
+                raise Exception("Invalid action")
+
+            hold = remoshock.hold(receiver, action, power, "web-" + source)
+            if hold is None:
+                return None
+            return hold.to_dict()
+
+        hold_id = int(params["id"])
+        if "heartbeat" in path:
+            return remoshock.hold_heartbeat(hold_id) or None
+        return remoshock.release_hold(hold_id) or None
+
+
+    def handle_stop(self, params):
+        """Stops transmissions of the specified receiver, or of all receivers
+
+        @return number of dropped or stopped commands, None if the receiver is invalid"""
+
+        receiver = None
+        if "receiver" in params and params["receiver"] is not None:
+            receiver = int(params["receiver"])
+        return self.requesthandler.remoshock.stop(receiver)
 
 
     def read_parameters(self):
@@ -125,14 +191,38 @@ class RestHandler:
             return
 
         if path.startswith("/remoshock/command"):
-            self.handle_command(params)
-            self.answer_json(200, {"status": "ok"})
+            queued_command = self.handle_command(params)
+            if queued_command is None:
+                self.answer_json(422, {"status": "error", "error": "invalid command"})
+                return
+            queued_command["status"] = "ok"
+            self.answer_json(200, queued_command)
+
+        elif path.startswith("/remoshock/hold"):
+            result = self.handle_hold(path, params)
+            if result is None:
+                self.answer_json(422, {"status": "error", "error": "invalid command or hold no longer active"})
+                return
+            if result is True:
+                result = {}
+            result["status"] = "ok"
+            self.answer_json(200, result)
+
+        elif path.startswith("/remoshock/stop"):
+            stopped = self.handle_stop(params)
+            if stopped is None:
+                self.answer_json(422, {"status": "error", "error": "invalid receiver"})
+                return
+            self.answer_json(200, {"status": "ok", "stopped": stopped})
 
         elif path.startswith("/remoshock/config"):
             if method == "POST":
                 self.requesthandler.remoshock.config_manager.save_settings(params["settings"])
             self.answer_json(200, self.requesthandler.remoshock.get_config())
 
+        elif path.startswith("/remoshock/statistics"):
+            self.answer_json(200, self.requesthandler.remoshock.get_statistics())
+
         elif path.startswith("/remoshock/randomizer"):
             if method == "POST":
                 if "start" in path:
@@ -9,7 +9,6 @@
 
 import time
 from enum import Enum
-from threading import RLock
 available = True
 try:
     import serial
@@ -18,6 +17,7 @@ except ModuleNotFoundError:
 
 from remoshock.core.action import Action  # noqa: E402
 from remoshock.receiver.receiver import Receiver  # noqa: E402
+from remoshock.util.transportlock import TransportLock  # noqa: E402
 
 
 # type            code, code, channel
@@ -147,7 +147,7 @@ class ArduinoManager():
             return
 
         self.ser = serial.Serial('/dev/ttyACM0')
-        self.serial_lock = RLock()
+        self.serial_lock = TransportLock('/dev/ttyACM0')
         self.receiver_index = -1
 
         with self.serial_lock:
@@ -159,6 +159,13 @@ class ArduinoManager():
             self.read_responses()
 
 
+    def get_statistics(self):
+        """returns statistics about the serial connection"""
+        if not available:
+            return {}
+        return {"lock": self.serial_lock.get_statistics()}
+
+
     def register_receiver(self, receiver_type, arg1, arg2, arg3):
         with self.serial_lock:
             self.send(bytes([ProtocolAction.ADD.value, 4, receiver_type, arg1, arg2, arg3]))
@@ -0,0 +1,97 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import numpy as np
+
+
+def from_string(bits):
+    """converts a bit string into a bit array
+
+    @param bits string of "0" and "1", or a bit array, which is returned as is
+    @return uint8 numpy array of 0 and 1
+    """
+    if isinstance(bits, str):
+        return np.frombuffer(bits.encode("ascii"), dtype=np.uint8) - ord("0")
+    return np.asarray(bits, dtype=np.uint8)
+
+
+def to_string(bits):
+    """converts a bit array into a bit string
+
+    @param bits uint8 numpy array of 0 and 1
+    @return string of "0" and "1"
+    """
+    return (np.asarray(bits, dtype=np.uint8) + ord("0")).tobytes().decode("ascii")
+
+
+def from_int(value, width, lsb_first=False):
+    """converts a number into a bit array of fixed width
+
+    @param value non-negative number
+    @param width number of bits, higher bits are dropped
+    @param lsb_first whether the least significant bit comes first
+    @return uint8 numpy array of 0 and 1
+    """
+    shifts = np.arange(width) if lsb_first else np.arange(width - 1, -1, -1)
+    return ((value >> shifts) & 1).astype(np.uint8)
+
+
+def concat(*parts):
+    """concatenates bit strings and bit arrays into one bit array"""
+    return np.concatenate([from_string(part) for part in parts])
+
+
+def runs(bits, lengths):
+    """repeats each bit
+
+    @param bits bit string or array, e. g. "101"
+    @param lengths number of repetitions of each bit, e. g. [1, 3, 2]
+    @return uint8 numpy array, e. g. 100011
+    """
+    return np.repeat(from_string(bits), lengths)
+
+
+
+class LineCode:
+    """transmission encoding, which replaces each data bit by a symbol
+    and frames the result with a prefix and a suffix.
+
+    This covers the codes of all SDR receivers: fillers between the bits
+    (symbols "0" + filler and "1" + filler), pulse width modulation
+    (e. g. "1000" and "1110") and pulses of different length
+    (e. g. "10000" and "100000000")."""
+
+    def __init__(self, zero, one, prefix="", suffix=""):
+        """creates a LineCode
+
+        @param zero symbol sent for a 0 bit
+        @param one symbol sent for a 1 bit
+        @param prefix synchronization bits before the data
+        @param suffix bits after the data
+        """
+        # symbols of coded bits, followed by the symbols of bits sent as they are
+        self.symbols = concat(zero, one, "01")
+        self.lengths = np.array([len(zero), len(one), 1, 1], dtype=np.int64)
+        self.offsets = np.array([0, len(zero), len(zero) + len(one), len(zero) + len(one) + 1], dtype=np.int64)
+        self.prefix = from_string(prefix)
+        self.suffix = from_string(suffix)
+
+
+    def encode(self, data, uncoded=None):
+        """encodes data bits for transmission
+
+        @param data bit string or array
+        @param uncoded optional boolean array, which marks bits that are sent without symbol coding
+        @return uint8 numpy array of 0 and 1
+        """
+        data = from_string(data)
+        if uncoded is not None:
+            data = data + 2 * np.asarray(uncoded, dtype=np.uint8)
+        lengths = self.lengths[data]
+        ends = np.cumsum(lengths)
+        total = int(ends[-1]) if len(ends) > 0 else 0
+
+        # position of each output bit within the symbol table
+        positions = np.arange(total, dtype=np.int64) + np.repeat(self.offsets[data] - (ends - lengths), lengths)
+        return np.concatenate([self.prefix, self.symbols[positions], self.suffix])
@@ -5,7 +5,11 @@
 import re
 import threading
 
+import numpy as np
+
 from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, concat, from_string, runs, to_string
+from remoshock.receiver.protocol import Constant, Field, ProtocolSpec
 from remoshock.receiver.receiver import Receiver
 
 lock = threading.RLock()
@@ -28,6 +32,41 @@ class Dogtra(Receiver):
         221, 226, 231, 237, 243, 249, 255, 255, 255, 255,
         255]
 
+    # the intensity code is sent without fillers
+    fields = [
+        Field("transmitter_code"),
+        Constant("1"),
+        Field("vibrate", codes={0: "100", 1: "001"}),
+        Field("intensity", coded=False)
+    ]
+
+    protocol = ProtocolSpec(
+        fields=fields,
+        # synchronization prefix and a filler after each bit of the first part of the message
+        line_code=LineCode(zero="0" + "01", one="1" + "01", prefix="11100" + "01"),
+        radio=dict(
+            frequency=27.1e6,
+            sample_rate=2e6,
+            carrier_frequency=27.1e6,
+            modulation_type="FSK",
+            samples_per_symbol=1500,
+            low_frequency=41e3,
+            high_frequency=46e3,
+            pause=262924))
+
+    protocol_600ncp = ProtocolSpec(
+        fields=fields,
+        line_code=LineCode(zero="0" + "01", one="1" + "01", prefix="1111100" + "01"),
+        radio=dict(
+            frequency=27e6,
+            sample_rate=2e6,
+            carrier_frequency=27e6,
+            modulation_type="FSK",
+            samples_per_symbol=1200,
+            low_frequency=91e3,
+            high_frequency=95e3,
+            pause=262924))
+
 
     def __init__(self, receiver_properties, transmitter_code, channel):
         super().__init__(receiver_properties)
@@ -45,6 +84,7 @@ class Dogtra(Receiver):
         self.channel = channel
         if receiver_properties.receiver_type == "600ncp":
             self.end_one = False
+            self.protocol = self.protocol_600ncp
 
 
     def validate_config(self):
@@ -72,6 +112,25 @@ class Dogtra(Receiver):
     def boot(self, _arduino_manader, sdr_sender):
         """keep a references to the sdr_sender for later use"""
         self.sender = sdr_sender
+        self.frames = self.protocol.compile(self.protocol_values, [Action.VIBRATE, Action.SHOCK], native_power=self.native_power)
+
+
+    def native_power(self, action, power):
+        """converts a power level into the Dogtra scale of 0-255"""
+        if action == Action.LIGHT:
+            # sent as shock with power 0
+            return 0
+        return self.power_mapping[power]
+
+
+    def protocol_values(self, action, power):
+        """returns the values of the protocol fields for a command.
+        Beep is sent as vibration."""
+        return {
+            "transmitter_code": self.transmitter_code,
+            "vibrate": 1 if action == Action.BEEP or action == Action.VIBRATE else 0,
+            "intensity": self.calculate_intensity_bits(power)
+        }
 
 
     def generate(self, transmitter_code, intensity, vibrate):
@@ -83,10 +142,12 @@ class Dogtra(Receiver):
         @param intensity power level in the Dogtra scale of 0-255 as bit-string
         @param vibrate   true to send a vibration (page-command), false to send a shock
         """
-        cmd = "100"
-        if vibrate:
-            cmd = "001"
-        return transmitter_code + "1" + cmd + self.calculate_intensity_code(intensity)
+        values = {
+            "transmitter_code": transmitter_code,
+            "vibrate": 1 if vibrate else 0,
+            "intensity": self.calculate_intensity_bits(intensity)
+        }
+        return to_string(self.protocol.frame(values))
 
 
     def calculate_intensity_code(self, power):
@@ -103,27 +164,23 @@ class Dogtra(Receiver):
         # (number of 0 minus one) times  10
         # (number of 1 minus one) times   1
         # some transmitter have a suffix of 01, others don't have it
+        return to_string(self.calculate_intensity_bits(power))
 
-        intensity = self.power_mapping[power]
-
-        res = ""
-        for _ in range(0, intensity // 100):
-            res = res + "1"
 
-        intensity = intensity % 100
-        for _ in range(0, intensity // 10 + 1):
-            res = res + "0"
-
-        intensity = intensity % 10
-        for _ in range(0, intensity + 1):
-            res = res + "1"
+    def calculate_intensity_bits(self, power):
+        """like calculate_intensity_code(), but returns a uint8 numpy array of 0 and 1"""
+        intensity = self.power_mapping[power]
+        hundreds = intensity // 100
+        tens = intensity % 100 // 10
+        ones = intensity % 10
 
         if self.end_one:
-            res = res + "01"
-            return res.ljust(22, "0")
+            res = runs("10101", [hundreds, tens + 1, ones + 1, 1, 1])
+            length = 22
         else:
-            res = res + "00"
-            return res.ljust(27, "0")
+            res = runs("10100", [hundreds, tens + 1, ones + 1, 1, 1])
+            length = 27
+        return concat(res, np.zeros(max(0, length - len(res)), dtype=np.uint8))
 
 
     def encode_for_transmission(self, data):
@@ -131,46 +188,14 @@ class Dogtra(Receiver):
 
         This methods adds the synchronization prefix as well as the fillers
         between each bit in the first part of the message."""
+        data = from_string(data)
+        return to_string(self.protocol.line_code.encode(data, np.arange(len(data)) >= 16))
 
-        if self.end_one:
-            prefix = "11100"
-        else:
-            prefix = "1111100"
-
-        filler = "01"
-        res = prefix + filler
-        for i in range(0, 16):
-            res = res + data[i] + filler
-        return res + data[16:]
 
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this receiver"""
+        return self.protocol.create_plan()
 
-    def send(self, messages):
-        """sends messages over the air using the SDR sender.
-
-        @param messages messages that have already been encoded for transmission"""
-
-        if self.end_one:
-            self.sender.send(
-                frequency=27.1e6,
-                sample_rate=2e6,
-                carrier_frequency=27.1e6,
-                modulation_type="FSK",
-                samples_per_symbol=1500,
-                low_frequency=41e3,
-                high_frequency=46e3,
-                pause=262924,
-                data=messages)
-        else:
-            self.sender.send(
-                frequency=27e6,
-                sample_rate=2e6,
-                carrier_frequency=27e6,
-                modulation_type="FSK",
-                samples_per_symbol=1200,
-                low_frequency=91e3,
-                high_frequency=95e3,
-                pause=262924,
-                data=messages)
 
     def command(self, action, power, duration, beep_shock_delay_ms=None):
         """sends a command to the receiver.
@@ -186,17 +211,26 @@ class Dogtra(Receiver):
         if action == Action.KEEPAWAKE:
             return
 
-        message = ""
+        if self.end_one:
+            start_of_transmission = "11111110000000111111100000000000"
+        else:
+            start_of_transmission = "111111100000001111111000000000000"
+        plan = self.create_plan()
+        plan.add_message(start_of_transmission, gap=0)
+
         if action == Action.BEEPSHOCK:
-            message_template = self.encode_for_transmission(self.generate(self.transmitter_code, 50, 1))
+            message_template = self.frames.lookup(Action.VIBRATE, 50)
             delay = beep_shock_delay_ms or self.receiver_properties.beep_shock_delay_ms
-            message = message_template + message_template + message_template + "/" + str(delay) + "ms "
+            plan.add_message(message_template, repeats=3, gap=0)
+            plan.add_silence(delay)
+            action = Action.SHOCK
 
-        beep = 0
-        if action == Action.BEEP or action == Action.VIBRATE:
-            beep = 1
+        if action == Action.BEEP:
+            # the beep is sent as vibration
+            action = Action.VIBRATE
         if action == Action.LIGHT:
             # Note: even power 0 might create a tiny shock
+            action = Action.SHOCK
             power = 0
 
         if duration < 250:
@@ -204,12 +238,10 @@ class Dogtra(Receiver):
         if duration > 10000:
             duration = 10000
 
-        message_template = self.encode_for_transmission(self.generate(self.transmitter_code, power, beep))
-        for _ in range(0, round(duration / 60)):
-            message = message + message_template
+        # frames follow each other without pause
+        message_template = self.frames.lookup(action, power)
+        repeats = round(duration / 60)
+        plan.add_message(message_template, repeats=repeats - 1, gap=0)
+        plan.add_message(message_template)
 
-        if self.end_one:
-            start_of_transmission = "11111110000000111111100000000000"
-        else:
-            start_of_transmission = "111111100000001111111000000000000"
-        self.send(start_of_transmission + message.strip())
+        self.sender.send(plan)
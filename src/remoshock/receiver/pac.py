@@ -6,10 +6,17 @@ import re
 import threading
 
 from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, from_int, from_string, to_string
+from remoshock.receiver.protocol import Checksum, Field, ProtocolSpec, parity
 from remoshock.receiver.receiver import Receiver
 
 lock = threading.RLock()
 
+# each checksum bit is the parity of these bits of the command
+# a b c d e f g h i  j  k  l  m  n  o p q  r  s
+# 7 6 5 4 3 2 1 0 15 14 13 12 11 10 9 8 23 22 21
+checksum = parity([0, 8], [1, 9, 21], [2, 10, 22], [3, 11, 23], [4, 12])
+
 
 class Pac(Receiver):
     """communication with PAC ACX collars"""
@@ -26,6 +33,28 @@ class Pac(Receiver):
         [1, 1, 1]   # unused
     ]
 
+    protocol = ProtocolSpec(
+        fields=[
+            Field("transmitter_code", value=lambda values: values["transmitter_code"][0:2]),
+            Field("intensity", 6, lsb_first=True),
+            Field("button", codes=dict(enumerate(code[0:1] for code in button_codes))),
+            Field("transmitter_code", value=lambda values: values["transmitter_code"][2:]),
+            Checksum("checksum", 5, checksum),
+            Field("beep", 1),
+            Field("button", codes=dict(enumerate(code[1:3] for code in button_codes)))
+        ],
+        # synchronization prefix and a filler after each bit
+        line_code=LineCode(zero="0" + "10", one="1" + "10", prefix="0101010101010101111" + "10"),
+        radio=dict(
+            frequency=27.10e6,
+            sample_rate=2e6,
+            carrier_frequency=27.1e6,
+            modulation_type="FSK",
+            samples_per_symbol=3100,
+            low_frequency=92e3,
+            high_frequency=95e3,
+            pause=262924))
+
 
     def __init__(self, receiver_properties, transmitter_code, channel):
         super().__init__(receiver_properties)
@@ -60,6 +89,26 @@ class Pac(Receiver):
     def boot(self, _arduino_manader, sdr_sender):
         """keep a references to the sdr_sender for later use"""
         self.sender = sdr_sender
+        self.frames = self.protocol.compile(self.protocol_values, [Action.BEEP, Action.SHOCK], native_power=self.native_power)
+
+
+    def native_power(self, action, power):
+        """converts a power level into the PAC scale of 0-63"""
+        if action == Action.LIGHT:
+            # sent as shock with power 0
+            return 0
+        return power * 63 // 100
+
+
+    def protocol_values(self, action, power):
+        """returns the values of the protocol fields for a command.
+        Beep and vibration use the same frame."""
+        return {
+            "transmitter_code": self.transmitter_code,
+            "intensity": self.native_power(action, power),
+            "button": self.button,
+            "beep": 1 if action == Action.BEEP or action == Action.VIBRATE else 0
+        }
 
 
     def generate(self, transmitter_code, intensity, button, beep):
@@ -72,18 +121,18 @@ class Pac(Receiver):
         @param button    index of button
         @param beep      true to send a beep, false to send a shock
         """
-        pre_checksum = transmitter_code[0:2] + self.calculate_intensity_code(intensity) + str(self.button_codes[button][0]) + transmitter_code[2:]
-        post_checksum = str(beep) + str(self.button_codes[button][1]) + str(self.button_codes[button][2])
-        data = pre_checksum + "CCCCC" + post_checksum
-        return pre_checksum + self.calculate_checksum(data) + post_checksum
+        values = {
+            "transmitter_code": transmitter_code,
+            "intensity": intensity,
+            "button": button,
+            "beep": beep
+        }
+        return to_string(self.protocol.frame(values))
 
 
     def calculate_intensity_code(self, intensity):
         """expands power level (in PAC scale from 0-63) from integer to bit-string"""
-        res = ""
-        for i in range(0, 6):
-            res = res + str(intensity // 2**i % 2)
-        return res
+        return to_string(from_int(intensity, 6, lsb_first=True))
 
 
     def calculate_checksum(self, data):
@@ -91,15 +140,8 @@ class Pac(Receiver):
 
         @param data the command data structure without transmission encoding
                     but with a placeholder for the checksum bits"""
-
-        # a b c d e f g h i  j  k  l  m  n  o p q  r  s
-        # 7 6 5 4 3 2 1 0 15 14 13 12 11 10 9 8 23 22 21
-        res =       str((int(data[0]) + int(data[ 8])) % 2)                   # noqa: E201, E222
-        res = res + str((int(data[1]) + int(data[ 9]) + int(data[21])) % 2)   # noqa: E201, E222
-        res = res + str((int(data[2]) + int(data[10]) + int(data[22])) % 2)
-        res = res + str((int(data[3]) + int(data[11]) + int(data[23])) % 2)
-        res = res + str((int(data[4]) + int(data[12])) % 2)
-        return res
+        # the placeholder bits are not part of the checksum
+        return to_string(checksum(from_string(data)))
 
 
     def encode_for_transmission(self, data):
@@ -107,29 +149,12 @@ class Pac(Receiver):
 
         This methods adds the synchronization prefix as well as the fillers
         between each bit."""
+        return to_string(self.protocol.line_code.encode(data))
 
-        prefix = "0101010101010101111"
-        filler = "10"
-        res = prefix + filler
-        for bit in data:
-            res = res + bit + filler
-        return res
 
-
-    def send(self, messages):
-        """sends messages over the air using the SDR sender.
-
-        @param messages messages that have already been encoded for transmission"""
-        self.sender.send(
-            frequency=27.10e6,
-            sample_rate=2e6,
-            carrier_frequency=27.1e6,
-            modulation_type="FSK",
-            samples_per_symbol=3100,
-            low_frequency=92e3,
-            high_frequency=95e3,
-            pause=262924,
-            data=messages)
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this receiver"""
+        return self.protocol.create_plan()
 
 
     def command(self, action, power, duration, beep_shock_delay_ms=None):
@@ -146,16 +171,19 @@ class Pac(Receiver):
         if action == Action.KEEPAWAKE:
             return
 
-        message = ""
+        plan = self.create_plan()
         if action == Action.BEEPSHOCK:
             delay = beep_shock_delay_ms or self.receiver_properties.beep_shock_delay_ms
-            message = self.encode_for_transmission(self.generate(self.transmitter_code, 0, self.button, 1)) + "/" + str(delay) + "ms "
+            plan.add_message(self.frames.lookup(Action.BEEP, 0), gap=0)
+            plan.add_silence(delay)
+            action = Action.SHOCK
 
-        beep = 0
-        if action == Action.BEEP or action == Action.VIBRATE:
-            beep = 1
+        if action == Action.VIBRATE:
+            # the vibration is sent as beep
+            action = Action.BEEP
         if action == Action.LIGHT:
             # Note: even power 0 creates a tiny shock
+            action = Action.SHOCK
             power = 0
 
         if duration < 250:
@@ -163,8 +191,7 @@ class Pac(Receiver):
         if duration > 10000:
             duration = 10000
 
-        message_template = self.encode_for_transmission(self.generate(self.transmitter_code, power * 63 // 100, self.button, beep))
-        for _ in range(0, round(duration / 250)):
-            message = message + message_template + " "
+        message_template = self.frames.lookup(action, power)
+        plan.add_message(message_template, repeats=round(duration / 250))
 
-        self.send(message)
+        self.sender.send(plan)
@@ -7,6 +7,8 @@ import re
 import threading
 
 from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, to_string
+from remoshock.receiver.protocol import Field, ProtocolSpec
 from remoshock.receiver.receiver import Receiver
 
 lock = threading.RLock()
@@ -29,6 +31,28 @@ class PatpetT150(Receiver):
         Action.SHOCK:   "0011"   # noqa: E241
     }
 
+    protocol = ProtocolSpec(
+        fields=[
+            Field("channel", codes=dict(enumerate(channel_codes_normal, 1))),
+            Field("action", codes=action_code_normal),
+            Field("transmitter_code"),
+            Field("power", 8),
+            Field("action", codes=action_code_inverse),
+            Field("channel", codes=dict(enumerate(channel_codes_inverse, 1)))
+        ],
+        # a pulse followed by a short pause for 0, by a long pause for 1
+        line_code=LineCode(zero="10000", one="100000000", prefix="11110000", suffix="1"),
+        radio=dict(
+            frequency=915e6,
+            sample_rate=2e6,
+            carrier_frequency=0e3,
+            modulation_type="ASK",
+            samples_per_symbol=410,
+            low_frequency="0",
+            high_frequency="100",
+            pause=11531))
+
+
     def __init__(self, receiver_properties, transmitter_code, channel):
         super().__init__(receiver_properties)
         self.receiver_properties.capabilities(action_light=True, action_beep=True, action_vibrate=True, action_shock=True)
@@ -61,6 +85,24 @@ class PatpetT150(Receiver):
     def boot(self, _arduino_manader, sdr_sender):
         """keep a references to the sdr_sender for later use"""
         self.sender = sdr_sender
+        self.frames = self.protocol.compile(self.protocol_values, [Action.BEEP, Action.VIBRATE, Action.SHOCK], native_power=self.native_power)
+
+
+    def native_power(self, action, power):
+        """light is sent as vibration with power 0"""
+        if action == Action.LIGHT:
+            return 0
+        return power
+
+
+    def protocol_values(self, action, power):
+        """returns the values of the protocol fields for a command"""
+        return {
+            "channel": self.channel,
+            "action": action,
+            "transmitter_code": self.transmitter_code,
+            "power": power
+        }
 
 
     def generate(self, action, power):
@@ -71,10 +113,7 @@ class PatpetT150(Receiver):
         @param action action
         @param power power level in the scale of 0-100
         """
-        data = self.channel_codes_normal[self.channel - 1] + self.action_code_normal[action] \
-            + self.transmitter_code + format(power, '08b') \
-            + self.action_code_inverse[action] + self.channel_codes_inverse[self.channel - 1]
-        return data
+        return to_string(self.protocol.frame(self.protocol_values(action, power)))
 
 
     def encode_for_transmission(self, data):
@@ -82,32 +121,12 @@ class PatpetT150(Receiver):
 
         This methods adds the synchronization prefix and suffix as well.
         """
-        prefix = "11110000"
-        suffix = "1"
-        res = prefix
-        for bit in data:
-            if bit == "0":
-                res = res + "10000"
-            else:
-                res = res + "100000000"
-        res = res + suffix
-        return res
-
-
-    def send(self, messages):
-        """sends messages over the air using the SDR sender.
-
-        @param messages messages that have already been encoded for transmission"""
-        self.sender.send(
-            frequency=915e6,
-            sample_rate=2e6,
-            carrier_frequency=0e3,
-            modulation_type="ASK",
-            samples_per_symbol=410,
-            low_frequency="0",
-            high_frequency="100",
-            pause=11531,
-            data=messages)
+        return to_string(self.protocol.line_code.encode(data))
+
+
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this receiver"""
+        return self.protocol.create_plan()
 
 
     def command(self, action, power, duration, beep_shock_delay_ms=None):
@@ -130,11 +149,13 @@ class PatpetT150(Receiver):
             action = Action.VIBRATE
             power = 0
 
-        message = ""
+        plan = self.create_plan()
         if action == Action.BEEPSHOCK:
-            message = self.encode_for_transmission(self.generate(Action.BEEP, 1))
+            message = self.frames.lookup(Action.BEEP, 1)
             delay = (beep_shock_delay_ms or self.receiver_properties.beep_shock_delay_ms) + 100
-            message = message + " " + message + " " + message + " " + message + " " + message + "/" + str(delay) + "ms "
+            plan.add_message(message, repeats=4)
+            plan.add_message(message, gap=0)
+            plan.add_silence(delay)
             action = Action.SHOCK
 
         if duration <= 500:
@@ -151,8 +172,7 @@ class PatpetT150(Receiver):
         # 1500ms ==> messages for 1000ms, followed by 5 messages
         repeats = round((duration - 500) / 60 + 5)
 
-        message_template = self.encode_for_transmission(self.generate(action, power))
-        for _ in range(0, repeats):
-            message = message + message_template + " "
+        message_template = self.frames.lookup(action, power)
+        plan.add_message(message_template, repeats=repeats)
 
-        self.send(message)
+        self.sender.send(plan)
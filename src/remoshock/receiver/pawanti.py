@@ -9,6 +9,8 @@ import threading
 import time
 
 from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, from_int, to_string
+from remoshock.receiver.protocol import Constant, Field, ProtocolSpec
 from remoshock.receiver.receiver import Receiver
 
 
@@ -24,6 +26,107 @@ class Pawanti(Receiver):
         Action.SHOCK:   "001"   # noqa: E241
     }
 
+    # transmitter codes with a complete checksum table
+    supported_transmitter_codes = ["011001010000000000001011", "011000000000000000001011"]
+
+    # I have no idea how the checksum works so this is a simple
+    # lookup table of known values by transmitter code. The channel
+    # is not part of the checksum.
+    checksum_tables = {
+        "011001010000000000001011": {
+            "0110000": "1010",  # noqa: E241
+            "0100001": "1000",  # noqa: E241
+            "0100010": "1011",  # noqa: E241
+            "0100011": "1010",  # noqa: E241
+            "0100100": "1101",  # noqa: E241
+            "0100101": "1100",  # noqa: E241
+            "0100110": "1111",  # noqa: E241
+            "0100111": "1110",  # noqa: E241
+            "0101000": "0001",  # noqa: E241
+            "0101001": "0000",  # noqa: E241
+            "0010001": "1001",  # noqa: E241
+            "0010010": "1010",  # noqa: E241
+            "0010011": "1011",  # noqa: E241
+            "0010100": "1100",  # noqa: E241
+            "0010101": "1101",  # noqa: E241
+            "0010110": "1110",  # noqa: E241
+            "0010111": "1111",  # noqa: E241
+            "0011000": "0000",  # noqa: E241
+            "0011001": "0001",  # noqa: E241
+            "1000101": "1100",  # noqa: E241
+            "1001010": "0001",  # noqa: E241
+        },
+        "011000000000000000001011": {
+            "0110000": "0010",  # noqa: E241
+            "0100001": "0100",  # noqa: E241
+            "0100010": "0101",  # noqa: E241
+            "0100011": "0110",  # noqa: E241
+            "0100100": "0111",  # noqa: E241
+            "0100101": "0001",  # noqa: E241
+            "0100110": "1000",  # noqa: E241
+            "0100111": "1011",  # noqa: E241
+            "0101000": "1010",  # noqa: E241
+            "0101001": "1101",  # noqa: E241
+            "0010001": "1011",  # noqa: E241
+            "0010010": "1010",  # noqa: E241
+            "0010011": "1001",  # noqa: E241
+            "0010100": "1000",  # noqa: E241
+            "0010101": "1000",  # noqa: E241
+            "0010110": "1001",  # noqa: E241
+            "0010111": "1010",  # noqa: E241
+            "0011000": "1011",  # noqa: E241
+            "0011001": "1100",  # noqa: E241
+            "1000101": "1011",  # noqa: E241
+            "1001010": "1110",  # noqa: E241
+        },
+        "011100000000000000001011": {
+            "0110000": "0001",  # noqa: E241
+            "0100001": "0101",  # noqa: E241
+            "0100010": "0100",  # noqa: E241
+            "0100011": "0111",  # noqa: E241
+            "0100100": "0110",  # noqa: E241
+            "0100101": "1010",  # noqa: E241
+            "0100110": "1011",  # noqa: E241
+            "0100111": "1000",  # noqa: E241
+            "0101000": "1001",  # noqa: E241
+            "0101001": "1110",  # noqa: E241
+            "0010001": "0110",  # noqa: E241
+            "0010010": "1000",  # noqa: E241
+            "0010011": "0010",  # noqa: E241
+            "0010100": "0011",  # noqa: E241
+            "0010101": "",  # noqa: E241
+            "0010110": "",  # noqa: E241
+            "0010111": "",  # noqa: E241
+            "0011000": "",  # noqa: E241
+            "0011001": "",  # noqa: E241
+            "1000101": "",  # noqa: E241
+            "1001010": "",  # noqa: E241
+        }
+    }
+
+    protocol = ProtocolSpec(
+        fields=[
+            Constant("00"),
+            Field("channel", 2),
+            Field("checksum"),
+            Constant("0"),
+            Field("action", codes=action_code),
+            Field("intensity", 4),
+            Field("transmitter_code"),
+            Constant("1")
+        ],
+        # synchronization prefix, each bit is sent twice after a filler
+        line_code=LineCode(zero="0011" + "00", one="0011" + "11", prefix="00000000000000000000000000000000000"),
+        radio=dict(
+            frequency=433e6,
+            sample_rate=2e6,
+            carrier_frequency=433e6,
+            modulation_type="FSK",
+            samples_per_symbol=500,
+            low_frequency="859000",
+            high_frequency="928000",
+            pause=357599))
+
 
     def __init__(self, receiver_properties, transmitter_code, channel):
         super().__init__(receiver_properties)
@@ -47,7 +150,7 @@ class Pawanti(Receiver):
 
         # TODO: remove False
         # False and
-        if self.transmitter_code != "011001010000000000001011" and self.transmitter_code != "011000000000000000001011":
+        if self.transmitter_code not in self.supported_transmitter_codes:
             print("ERROR: Unsupported transmitter_code \"" + self.transmitter_code + "\" in remoshock.ini.")
             print("The transmitter_code must be either 011001010000000000001011 or 011000000000000000001011")
             print(" because the checksum is only known for these specific transmitter codes.")
@@ -72,6 +175,10 @@ class Pawanti(Receiver):
         and schedules keep-awake messages"""
         self.sender = sdr_sender
 
+        # validate_config() reports unsupported transmitter codes, their frames are encoded on demand
+        actions = [Action.BEEP, Action.VIBRATE, Action.SHOCK] if self.transmitter_code in self.supported_transmitter_codes else []
+        self.frames = self.protocol.compile(self.protocol_values, actions, native_power=self.native_power)
+
 
     def generate(self, action, power):
         """generates the data structure for a single command.
@@ -81,19 +188,31 @@ class Pawanti(Receiver):
         @param action action
         @param power power level in the scale of 0-100
         """
-        channel = format(self.channel, '02b')
-        action_code = self.action_code[action]
-        intensity = format(min(int(power / 100 * 9) + 1, 9), '04b')
-        if action == Action.BEEP:
-            intensity = "0000"
+        return to_string(self.protocol.frame(self.protocol_values(action, power)))
+
 
+    def native_power(self, action, power):
+        """converts a power level into the Pawanti scale of 1-9. Beep has no power level."""
+        if action == Action.BEEP or action == Action.LIGHT:
+            return 0
+        return min(int(power / 100 * 9) + 1, 9)
+
+
+    def protocol_values(self, action, power):
+        """returns the values of the protocol fields for a command"""
+        intensity = self.native_power(action, power)
 
         if self.checksum is None:
-            checksum = self.calcualte_checksum(action_code, intensity)
+            checksum = self.calcualte_checksum(self.action_code[action], format(intensity, '04b'))
         else:
-            checksum = format(self.checksum, '04b')
-        data = "00" + channel + checksum + "0" + action_code + intensity + self.transmitter_code + "1"
-        return data
+            checksum = from_int(self.checksum, 4)
+        return {
+            "channel": self.channel,
+            "checksum": checksum,
+            "action": action,
+            "intensity": intensity,
+            "transmitter_code": self.transmitter_code
+        }
 
 
     def calcualte_checksum(self, action_code, intensity_code):
@@ -102,86 +221,8 @@ class Pawanti(Receiver):
         @param action_code binary values of action
         @param intensity_code binary value of power intensity
         """
-
-        # I have no idea how the checksum works so this is a simple
-        # lookup table of known values. The channel is not part
-        # of the checksum.
-        # ...
-        # my code:
-        if self.transmitter_code == "011001010000000000001011":
-            checksum_table = {
-                "0110000": "1010",  # noqa: E241
-                "0100001": "1000",  # noqa: E241
-                "0100010": "1011",  # noqa: E241
-                "0100011": "1010",  # noqa: E241
-                "0100100": "1101",  # noqa: E241
-                "0100101": "1100",  # noqa: E241
-                "0100110": "1111",  # noqa: E241
-                "0100111": "1110",  # noqa: E241
-                "0101000": "0001",  # noqa: E241
-                "0101001": "0000",  # noqa: E241
-                "0010001": "1001",  # noqa: E241
-                "0010010": "1010",  # noqa: E241
-                "0010011": "1011",  # noqa: E241
-                "0010100": "1100",  # noqa: E241
-                "0010101": "1101",  # noqa: E241
-                "0010110": "1110",  # noqa: E241
-                "0010111": "1111",  # noqa: E241
-                "0011000": "0000",  # noqa: E241
-                "0011001": "0001",  # noqa: E241
-                "1000101": "1100",  # noqa: E241
-                "1001010": "0001",  # noqa: E241
-            }
-            return checksum_table[action_code + intensity_code]
-        elif self.transmitter_code == "011000000000000000001011":
-            checksum_table = {
-                "0110000": "0010",  # noqa: E241
-                "0100001": "0100",  # noqa: E241
-                "0100010": "0101",  # noqa: E241
-                "0100011": "0110",  # noqa: E241
-                "0100100": "0111",  # noqa: E241
-                "0100101": "0001",  # noqa: E241
-                "0100110": "1000",  # noqa: E241
-                "0100111": "1011",  # noqa: E241
-                "0101000": "1010",  # noqa: E241
-                "0101001": "1101",  # noqa: E241
-                "0010001": "1011",  # noqa: E241
-                "0010010": "1010",  # noqa: E241
-                "0010011": "1001",  # noqa: E241
-                "0010100": "1000",  # noqa: E241
-                "0010101": "1000",  # noqa: E241
-                "0010110": "1001",  # noqa: E241
-                "0010111": "1010",  # noqa: E241
-                "0011000": "1011",  # noqa: E241
-                "0011001": "1100",  # noqa: E241
-                "1000101": "1011",  # noqa: E241
-                "1001010": "1110",  # noqa: E241
-            }
-            return checksum_table[action_code + intensity_code]
-        elif self.transmitter_code == "011100000000000000001011":
-            checksum_table = {
-                "0110000": "0001",  # noqa: E241
-                "0100001": "0101",  # noqa: E241
-                "0100010": "0100",  # noqa: E241
-                "0100011": "0111",  # noqa: E241
-                "0100100": "0110",  # noqa: E241
-                "0100101": "1010",  # noqa: E241
-                "0100110": "1011",  # noqa: E241
-                "0100111": "1000",  # noqa: E241
-                "0101000": "1001",  # noqa: E241
-                "0101001": "1110",  # noqa: E241
-                "0010001": "0110",  # noqa: E241
-                "0010010": "1000",  # noqa: E241
-                "0010011": "0010",  # noqa: E241
-                "0010100": "0011",  # noqa: E241
-                "0010101": "",  # noqa: E241
-                "0010110": "",  # noqa: E241
-                "0010111": "",  # noqa: E241
-                "0011000": "",  # noqa: E241
-                "0011001": "",  # noqa: E241
-                "1000101": "",  # noqa: E241
-                "1001010": "",  # noqa: E241
-            }
+        checksum_table = self.checksum_tables.get(self.transmitter_code)
+        if checksum_table is not None:
             return checksum_table[action_code + intensity_code]
         print("ERROR: Unsupported transmitter_code")
         return "0000"
@@ -193,29 +234,12 @@ class Pawanti(Receiver):
 
         This methods adds the synchronization prefix as well as the fillers
         between each bit."""
+        return to_string(self.protocol.line_code.encode(data))
 
-        prefix = "00000000000000000000000000000000000"
-        filler = "0011"
-        res = prefix
-        for bit in data:
-            res = res + filler + bit + bit
-        return res
 
-
-    def send(self, messages):
-        """sends messages over the air using the SDR sender.
-
-        @param messages messages that have already been encoded for transmission"""
-        self.sender.send(
-            frequency=433e6,
-            sample_rate=2e6,
-            carrier_frequency=433e6,
-            modulation_type="FSK",
-            samples_per_symbol=500,
-            low_frequency="859000",
-            high_frequency="928000",
-            pause=357599,
-            data=messages)
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this receiver"""
+        return self.protocol.create_plan()
 
 
     def command(self, action, power, duration, beep_shock_delay_ms=None):
@@ -234,10 +258,14 @@ class Pawanti(Receiver):
             duration = 250
         message = "01010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101010101"
 
+        plan = self.create_plan()
+        plan.add_message(message, gap=0)
+
         if action == Action.BEEPSHOCK:
-            message_template = self.encode_for_transmission(self.generate(Action.BEEP, 1))
+            message_template = self.frames.lookup(Action.BEEP, 1)
             delay = (beep_shock_delay_ms or self.receiver_properties.beep_shock_delay_ms) + 100
-            message = message + message_template + message_template + message_template + "/" + str(delay) + "ms "
+            plan.add_message(message_template, repeats=3, gap=0)
+            plan.add_silence(delay)
             action = Action.SHOCK
 
         if action == Action.LIGHT:
@@ -263,10 +291,11 @@ class Pawanti(Receiver):
 
         if True:
             print(self.checksum)
-            message_template = self.encode_for_transmission(self.generate(action, power))
-            for _ in range(0, repeats):
-                message = message + message_template
-            self.send(message)
+            # frames follow each other without pause
+            message_template = self.frames.lookup(action, power)
+            plan.add_message(message_template, repeats=repeats - 1, gap=0)
+            plan.add_message(message_template)
+            self.sender.send(plan)
 
         else:
             for self.checksum in range(0, 16):
@@ -278,4 +307,4 @@ class Pawanti(Receiver):
                 message_template = self.encode_for_transmission(self.generate(action, power))
                 for _ in range(0, repeats):
                     message = message + message_template
-                self.send(message)
+                self.sender.send(self.create_plan().add_message(message))
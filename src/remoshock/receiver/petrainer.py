@@ -8,6 +8,8 @@ import re
 import threading
 
 from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, to_string
+from remoshock.receiver.protocol import Field, ProtocolSpec
 from remoshock.receiver.receiver import Receiver
 
 
@@ -34,6 +36,27 @@ class Petrainer(Receiver):
         Action.SHOCK:   "0111"   # noqa: E241
     }
 
+    protocol = ProtocolSpec(
+        fields=[
+            Field("channel", codes=dict(enumerate(channel_codes_normal, 1))),
+            Field("action", codes=action_code_normal),
+            Field("transmitter_code"),
+            Field("power", 8),
+            Field("action", codes=action_code_inverse),
+            Field("channel", codes=dict(enumerate(channel_codes_inverse, 1)))
+        ],
+        # pulse width modulation: a short pulse for 0, a long pulse for 1
+        line_code=LineCode(zero="1000", one="1110", prefix="111111000", suffix="1"),
+        radio=dict(
+            frequency=433e6,
+            sample_rate=2e6,
+            carrier_frequency=98e3,
+            modulation_type="ASK",
+            samples_per_symbol=500,
+            low_frequency="0",
+            high_frequency="100",
+            pause=16954))
+
 
     def __init__(self, receiver_properties, transmitter_code, channel):
         super().__init__(receiver_properties)
@@ -68,6 +91,17 @@ class Petrainer(Receiver):
         """keep a references to the sdr_sender for later use
         and schedules keep-awake messages"""
         self.sender = sdr_sender
+        self.frames = self.protocol.compile(self.protocol_values, [Action.LIGHT, Action.BEEP, Action.VIBRATE, Action.SHOCK], native_power=self.native_power)
+
+
+    def protocol_values(self, action, power):
+        """returns the values of the protocol fields for a command"""
+        return {
+            "channel": self.channel,
+            "action": action,
+            "transmitter_code": self.transmitter_code,
+            "power": power
+        }
 
 
     def generate(self, action, power):
@@ -78,10 +112,7 @@ class Petrainer(Receiver):
         @param action action
         @param power power level in the scale of 0-100
         """
-        data = self.channel_codes_normal[self.channel - 1] + self.action_code_normal[action] \
-            + self.transmitter_code + format(power, '08b') \
-            + self.action_code_inverse[action] + self.channel_codes_inverse[self.channel - 1]
-        return data
+        return to_string(self.protocol.frame(self.protocol_values(action, power)))
 
 
     def encode_for_transmission(self, data):
@@ -89,33 +120,13 @@ class Petrainer(Receiver):
 
         This methods adds the synchronization prefix and suffx as well.
         """
-        prefix = "111111000"
-        suffix = "1"
-        res = prefix
-        for bit in data:
-            if bit == "0":
-                res = res + "1000"
-            else:
-                res = res + "1110"
-        res = res + suffix
-        return res
-
-
-    def send(self, messages):
-        """sends messages over the air using the SDR sender.
-
-        @param messages messages that have already been encoded for transmission"""
+        return to_string(self.protocol.line_code.encode(data))
+
+
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this receiver"""
         # TODO duration of simples, heading, tailing, etc.
-        self.sender.send(
-            frequency=433e6,
-            sample_rate=2e6,
-            carrier_frequency=98e3,
-            modulation_type="ASK",
-            samples_per_symbol=500,
-            low_frequency="0",
-            high_frequency="100",
-            pause=16954,
-            data=messages)
+        return self.protocol.create_plan()
 
 
     def command(self, action, power, duration, beep_shock_delay_ms=None):
@@ -134,11 +145,13 @@ class Petrainer(Receiver):
             power = 0
             duration = 250
 
-        message = ""
+        plan = self.create_plan()
         if action == Action.BEEPSHOCK:
-            message = self.encode_for_transmission(self.generate(Action.BEEP, 1))
+            message = self.frames.lookup(Action.BEEP, 1)
             delay = (beep_shock_delay_ms or self.receiver_properties.beep_shock_delay_ms) + 100
-            message = message + " " + message + " " + message + "/" + str(delay) + "ms "
+            plan.add_message(message, repeats=2)
+            plan.add_message(message, gap=0)
+            plan.add_silence(delay)
             action = Action.SHOCK
 
         if duration <= 500:
@@ -151,8 +164,7 @@ class Petrainer(Receiver):
         # 1000ms ==> messages for  500ms, followed by 1 message
         # 1500ms ==> messages for 1000ms, followed by 1 message
         repeats = round((duration - 500) / 51 + 1)
-        message_template = self.encode_for_transmission(self.generate(action, power))
-        for _ in range(0, repeats):
-            message = message + message_template + " "
+        message_template = self.frames.lookup(action, power)
+        plan.add_message(message_template, repeats=repeats)
 
-        self.send(message)
+        self.sender.send(plan)
@@ -0,0 +1,219 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import numpy as np
+
+from remoshock.receiver.bitencoding import concat, from_int, from_string
+from remoshock.sdr.transmissionplan import TransmissionPlan
+
+
+class Field:
+    """a field of a frame.
+
+    The content is taken from the values of a command by name, translated
+    by an optional table of codes. Numbers are expanded to the width of the
+    field, bit strings are used as they are."""
+
+    def __init__(self, name, width=None, lsb_first=False, codes=None, value=None, coded=True):
+        """creates a Field
+
+        @param name name of the value
+        @param width number of bits of numbers
+        @param lsb_first whether numbers are sent least significant bit first
+        @param codes optional dict, which maps the value to a number or bit string
+        @param value optional function computing the content from all values of the command
+        @param coded False if the bits are sent without the symbol coding of the protocol
+        """
+        self.name = name
+        self.width = width
+        self.lsb_first = lsb_first
+        self.codes = codes
+        self.value = value
+        self.coded = coded
+
+
+    def bits(self, values):
+        """returns the content of the field as uint8 numpy array of 0 and 1"""
+        content = self.value(values) if self.value is not None else values[self.name]
+        if self.codes is not None:
+            content = self.codes[content]
+        return self.to_bits(content)
+
+
+    def to_bits(self, content):
+        if isinstance(content, (int, np.integer)):
+            return from_int(int(content), self.width, self.lsb_first)
+        return from_string(content)
+
+
+
+class Constant(Field):
+    """a field with fixed bits, e. g. a start bit"""
+
+    def __init__(self, bits, coded=True):
+        """creates a Constant
+
+        @param bits bit string
+        @param coded False if the bits are sent without the symbol coding of the protocol
+        """
+        super().__init__(None, coded=coded)
+        self.constant = from_string(bits)
+
+
+    def bits(self, _values):
+        return self.constant
+
+
+
+class Checksum(Field):
+    """a field calculated from the other fields of the frame"""
+
+    def __init__(self, name, width, function, lsb_first=False):
+        """creates a Checksum
+
+        @param name name of the field
+        @param width number of bits
+        @param function called with the frame, in which the checksum bits are 0.
+                        It returns the checksum as number or bit array
+        @param lsb_first whether the checksum is sent least significant bit first
+        """
+        super().__init__(name, width, lsb_first)
+        self.function = function
+
+
+    def bits(self, _values):
+        # placeholder until the rest of the frame is known
+        return np.zeros(self.width, dtype=np.uint8)
+
+
+
+def parity(*groups):
+    """checksum function, which creates a parity bit for each group of bit positions"""
+    length = max(max(group) for group in groups) + 1
+    matrix = np.array([np.isin(np.arange(length), group) for group in groups], dtype=np.int64)
+    return lambda frame: (matrix @ frame[0:length].astype(np.int64) % 2).astype(np.uint8)
+
+
+def byte_sum(frame):
+    """checksum function, which adds up all bytes of the frame modulo 256"""
+    return int(np.packbits(frame).sum()) % 256
+
+
+
+class ProtocolSpec:
+    """declarative description of a collar protocol: the fields of a
+    frame, the symbol coding for transmission and the radio parameters.
+
+    Receivers describe their protocol once and compile it into a
+    FrameTable at boot, so that sending a command does not encode
+    anything."""
+
+    def __init__(self, fields, line_code, radio):
+        """creates a ProtocolSpec
+
+        @param fields list of Field in transmission order
+        @param line_code LineCode applied to the frame
+        @param radio dict with the parameters of TransmissionPlan (frequency, sample_rate,
+                     carrier_frequency, modulation_type, samples_per_symbol, low_frequency,
+                     high_frequency, pause)
+        """
+        self.fields = fields
+        self.line_code = line_code
+        self.radio = radio
+
+        self.uncoded = None
+        if any(not field.coded for field in fields):
+            self.uncoded = [not field.coded for field in fields]
+
+
+    def frame(self, values):
+        """assembles a frame without transmission encoding
+
+        @param values dict with the content of the fields by name
+        @return uint8 numpy array of 0 and 1
+        """
+        return self.__assemble(values)[0]
+
+
+    def __assemble(self, values):
+        parts = [field.bits(values) for field in self.fields]
+        frame = concat(*parts)
+        start = 0
+        for (field, part) in zip(self.fields, parts):
+            if isinstance(field, Checksum):
+                frame[start:start + len(part)] = field.to_bits(field.function(frame))
+            start = start + len(part)
+        return (frame, parts)
+
+
+    def encode(self, values):
+        """assembles a frame and encodes it for transmission
+
+        @param values dict with the content of the fields by name
+        @return uint8 numpy array of 0 and 1
+        """
+        (frame, parts) = self.__assemble(values)
+        uncoded = None
+        if self.uncoded is not None:
+            uncoded = np.repeat(self.uncoded, [len(part) for part in parts])
+        return self.line_code.encode(frame, uncoded)
+
+
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this protocol"""
+        return TransmissionPlan(**self.radio)
+
+
+    def compile(self, values, actions, powers=range(0, 101), native_power=None):
+        """precomputes the encoded frames of all commands
+
+        @param values function, which returns the values of the fields for an action and a power level
+        @param actions actions to precompute
+        @param powers power levels to precompute
+        @param native_power optional function, which converts an action and a power level into the
+                            scale of the receiver. Power levels with the same native level share a frame
+        @return FrameTable
+        """
+        return FrameTable(self, values, actions, powers, native_power)
+
+
+
+class FrameTable:
+    """encoded frames of a receiver by action and power level"""
+
+    def __init__(self, protocol, values, actions, powers, native_power=None):
+        """creates a FrameTable and encodes all frames
+
+        @param protocol ProtocolSpec
+        @param values function, which returns the values of the fields for an action and a power level
+        @param actions actions to precompute
+        @param powers power levels to precompute
+        @param native_power optional function, which converts an action and a power level into the
+                            scale of the receiver. Power levels with the same native level share a frame
+        """
+        self.protocol = protocol
+        self.values = values
+        self.frames = {}
+        for action in actions:
+            by_native = {}
+            for power in powers:
+                native = power if native_power is None else native_power(action, power)
+                frame = by_native.get(native)
+                if frame is None:
+                    frame = self.__encode(action, power)
+                    by_native[native] = frame
+                self.frames[(action, power)] = frame
+
+
+    def __encode(self, action, power):
+        # bytes are immutable, so the same frame can be handed to many transmission plans
+        return self.protocol.encode(self.values(action, power)).tobytes()
+
+
+    def lookup(self, action, power):
+        """returns the encoded frame of a command as bytes of the values 0 and 1"""
+        frame = self.frames.get((action, power))
+        if frame is None:
+            frame = self.__encode(action, power)
+        return frame
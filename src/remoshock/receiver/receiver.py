@@ -12,6 +12,7 @@ class Receiver:
         @param receiver_properties receiver_properties
         """
         self.receiver_properties = receiver_properties
+        self.frames = None
 
 
     def is_arduino_required(self):
@@ -36,6 +37,51 @@ class Receiver:
         """transmit a command to the receiver, sub-classes will do something useful here"""
 
 
+    def native_power(self, _action, power):
+        """converts a power level into the scale of the receiver, sub-classes
+        with fewer power levels will do something useful here
+
+        @param _action action to perform (e. g. SHOCK)
+        @param power power level (0-100)
+        @return power level of the receiver, which does not decrease with power
+        """
+        return power
+
+
+    def canonicalize(self, action, power, duration):
+        """maps a command onto the resolution of the receiver, so that commands
+        resulting in the same transmission are represented the same way.
+
+        The power level is lowered to the lowest power level with the same
+        native power level, so it never exceeds the requested power level.
+
+        @param action action to perform (e. g. SHOCK)
+        @param power power level (0-100)
+        @param duration duration in ms
+        @return tuple of action, power level and duration
+        """
+        native = self.native_power(action, power)
+        while power > 0 and self.native_power(action, power - 1) == native:
+            power = power - 1
+
+        duration_increment_ms = self.receiver_properties.duration_increment_ms
+        duration = max(self.receiver_properties.duration_min_ms, round(duration / duration_increment_ms) * duration_increment_ms)
+        return (action, power, duration)
+
+
+    def get_frame_plans(self):
+        """returns a TransmissionPlan with a single frame for each distinct
+        command, so that the sender can modulate the frames ahead of time.
+
+        The plans are ordered by power level, so that all actions are
+        covered, if the memory is not sufficient for all power levels."""
+        if self.frames is None:
+            return
+        frames = dict.fromkeys(frame for (_key, frame) in sorted(self.frames.frames.items(), key=lambda item: item[0][1]))
+        for frame in frames:
+            yield self.create_plan().add_message(frame)
+
+
     def get_config(self):
         """returns configuration information for the website
 
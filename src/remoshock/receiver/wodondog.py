@@ -7,6 +7,8 @@ import re
 import threading
 
 from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, to_string
+from remoshock.receiver.protocol import Checksum, Field, ProtocolSpec, byte_sum
 from remoshock.receiver.receiver import Receiver
 
 lock = threading.RLock()
@@ -20,6 +22,31 @@ class Wodondog(Receiver):
         Action.SHOCK: 1
     }
 
+    # 16 bits  transmitter code
+    #  4 bits  channel
+    #  4 bits  action: 1: shock, 2: vibreate, 3: beep
+    #  8 bits  power
+    #  8 bits  sum of the previous bytes modulo 256
+    protocol = ProtocolSpec(
+        fields=[
+            Field("transmitter_code"),
+            Field("channel", 4, value=lambda values: values["channel"] - 1),
+            Field("action", 4, codes=action_codes),
+            Field("power", 8),
+            Checksum("checksum", 8, byte_sum)
+        ],
+        # pulse width modulation: a short pulse for 0, a long pulse for 1
+        line_code=LineCode(zero="1000", one="1110", prefix="111111000", suffix="1000100010000"),
+        radio=dict(
+            frequency=433.85e6,
+            sample_rate=2e6,
+            carrier_frequency=6e3,
+            modulation_type="ASK",
+            samples_per_symbol=500,
+            low_frequency="0",
+            high_frequency="100",
+            pause=0))
+
     def __init__(self, receiver_properties, transmitter_code, channel):
         super().__init__(receiver_properties)
         self.receiver_properties.capabilities(action_light=True, action_beep=True, action_vibrate=True, action_shock=True)
@@ -53,30 +80,32 @@ class Wodondog(Receiver):
         """keep a references to the sdr_sender for later use
         and schedules keep-awake messages"""
         self.sender = sdr_sender
+        self.frames = self.protocol.compile(self.protocol_values, [Action.BEEP, Action.VIBRATE, Action.SHOCK], native_power=self.native_power)
 
 
-    def generate(self, action, power):
-        """generates the data structure (without transfer encoding)"""
-
-        # 16 bits  transmitter code
-        #  4 bits  action: 1: shock, 2: vibreate, 3: beep
-        #  4 bits  channel
-        #  8 bits  power
-        #  8 bits  sum of the previous bytes modulo 256
+    def native_power(self, action, power):
+        """converts a power level into the Wodondog scale of 0-99"""
+        if action == Action.LIGHT:
+            # sent as vibration with power 0
+            return 0
+        return min(power, 99)
 
-        action_code = self.action_codes.get(action, 3)
-        if power > 99:
-            power = 99
 
-        data = self.transmitter_code \
-            + format(self.channel - 1, '04b') \
-            + format(action_code, '04b') \
-            + format(power, '08b')
+    def protocol_values(self, action, power):
+        """returns the values of the protocol fields for a command"""
+        if action not in self.action_codes:
+            action = Action.BEEP
+        return {
+            "transmitter_code": self.transmitter_code,
+            "channel": self.channel,
+            "action": action,
+            "power": self.native_power(action, power)
+        }
 
-        checksum = (int(data[0:8], 2) + int(data[8:16], 2) + int(data[16:24], 2) + int(data[24:32], 2)) % 256
-        data = data + format(checksum, '08b')
 
-        return data
+    def generate(self, action, power):
+        """generates the data structure (without transfer encoding)"""
+        return to_string(self.protocol.frame(self.protocol_values(action, power)))
 
 
     def encode_for_transmission(self, data):
@@ -84,32 +113,12 @@ class Wodondog(Receiver):
 
         This methods adds the synchronization prefix and suffix as well.
         """
-        prefix = "111111000"
-        suffix = "1000100010000"
-        res = prefix
-        for bit in data:
-            if bit == "0":
-                res = res + "1000"
-            else:
-                res = res + "1110"
-        res = res + suffix
-        return res
-
-
-    def send(self, messages):
-        """sends messages over the air using the SDR sender.
-
-        @param messages messages that have already been encoded for transmission"""
-        self.sender.send(
-            frequency=433.85e6,
-            sample_rate=2e6,
-            carrier_frequency=6e3,
-            modulation_type="ASK",
-            samples_per_symbol=500,
-            low_frequency="0",
-            high_frequency="100",
-            pause=0,
-            data=messages)
+        return to_string(self.protocol.line_code.encode(data))
+
+
+    def create_plan(self):
+        """creates an empty TransmissionPlan with the radio parameters of this receiver"""
+        return self.protocol.create_plan()
 
 
     def command(self, action, power, duration, beep_shock_delay_ms=None):
@@ -129,11 +138,12 @@ class Wodondog(Receiver):
             duration = 250
 
 
-        message = ""
+        plan = self.create_plan()
         if action == Action.BEEPSHOCK:
-            message = self.encode_for_transmission(self.generate(Action.BEEP, 1))
+            message = self.frames.lookup(Action.BEEP, 1)
             delay = (beep_shock_delay_ms or self.receiver_properties.beep_shock_delay_ms) + 100
-            message = message + message + message + "/" + str(delay) + "ms "
+            plan.add_message(message, repeats=3)
+            plan.add_silence(delay)
             action = Action.SHOCK
 
         if action == Action.LIGHT:
@@ -155,8 +165,7 @@ class Wodondog(Receiver):
         # 1000ms ==> messages for  500ms, followed by 3 messages
         # 1500ms ==> messages for 1000ms, followed by 3 messages
         repeats = round((duration - 500) / 45.75 + 3)
-        message_template = self.encode_for_transmission(self.generate(action, power))
-        for _ in range(0, repeats):
-            message = message + message_template
+        message_template = self.frames.lookup(action, power)
+        plan.add_message(message_template, repeats=repeats)
 
-        self.send(message)
+        self.sender.send(plan)
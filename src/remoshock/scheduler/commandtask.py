@@ -4,6 +4,7 @@
 
 import datetime
 
+from remoshock.core.priority import Priority
 from remoshock.scheduler.task import Task
 
 
@@ -11,7 +12,7 @@ class CommandTask(Task):
     """A remoshock-command task that can be scheduled"""
 
 
-    def __init__(self, timestamp, identifier, group_identifier, remoshock, receiver, action, power, duration, source):
+    def __init__(self, timestamp, identifier, group_identifier, remoshock, receiver, action, power, duration, source, priority=Priority.SCHEDULED):
         """a schedulable task object
 
         @param timestamp when this task should be executed
@@ -22,6 +23,8 @@ class CommandTask(Task):
         @param action Action (e. g. BEEP, SHOCK)
         @param power power level (0-100)
         @param duration duration in ms
+        @param source source of the command (e. g. keepalive)
+        @param priority Priority of the command
         """
 
         super().__init__(timestamp, identifier, group_identifier)
@@ -31,6 +34,7 @@ class CommandTask(Task):
         self.power = power
         self.duration = duration
         self.source = source
+        self.priority = priority
 
 
     def __call__(self):
@@ -42,4 +46,4 @@ class CommandTask(Task):
         delayed = (datetime.datetime.now() - self.timestamp).total_seconds()
         if delayed > 30:
             return
-        self.remoshock.command(self.receiver, self.action, self.power, self.duration, self.source)
+        self.remoshock.command(self.receiver, self.action, self.power, self.duration, self.source, priority=self.priority)
@@ -89,6 +89,20 @@ class Scheduler:
                     self.cancel_task(task_identifier)
 
 
+    def cancel_matching_groups(self, matches):
+        """chancels all future tasks of groups, which contain a matching task
+
+        @param matches function called with a task, returns True if its group should be canceled
+        @return number of canceled groups"""
+        with self.lock:
+            group_identifiers = [group_identifier for (group_identifier, task_identifiers) in self.__scheduled_groups.items()
+                                 if any(matches(self.__scheduled_tasks[task_identifier]) for task_identifier in task_identifiers
+                                        if task_identifier in self.__scheduled_tasks)]
+            for group_identifier in group_identifiers:
+                self.cancel_group(group_identifier)
+            return len(group_identifiers)
+
+
 
 __scheduler = None
 
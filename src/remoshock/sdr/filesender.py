@@ -0,0 +1,48 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import json
+import time
+
+from remoshock.sdr.sdrsender import SdrSender
+from remoshock.util.transportlock import TransportLock, get_preemption_event
+
+
+class FileSender(SdrSender):
+    """a fake SDR, which writes a line for each transmission to a file.
+
+    It takes as long as a real device would. So it can be used to test
+    the routing and queueing of commands without hardware."""
+
+    def __init__(self, name, filename):
+        """constructs the FileSender
+
+        @param name name of the device
+        @param filename file the transmissions are appended to"""
+        self.name = name
+        self.filename = filename
+        self.lock = TransportLock(name)
+
+
+    def send(self, plan):
+        preempted = get_preemption_event()
+        with self.lock:
+            start = time.time()
+            duration = plan.total_samples() / plan.sample_rate
+            if preempted is None:
+                time.sleep(duration)
+            else:
+                preempted.wait(duration)
+
+            entry = {
+                "device": self.name,
+                "start": round(start, 3),
+                "end": round(time.time(), 3),
+                "frequency": plan.frequency,
+                "modulation_type": plan.modulation_type,
+                "interrupted": preempted is not None and preempted.is_set(),
+                "messages": plan.to_urh_messages()
+            }
+            with open(self.filename, "a") as file:
+                file.write(json.dumps(entry) + "\n")
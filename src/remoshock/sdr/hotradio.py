@@ -0,0 +1,294 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+
+import numpy as np
+
+from remoshock.sdr.waveform import NO_SAMPLES, Segment, Waveform, multiplex
+
+
+class Injection:
+    """a waveform added to the continuous transmission of a HotRadio"""
+
+    def __init__(self, waveform, start_deadline, preempted, priority):
+        """creates an Injection
+
+        @param waveform samples to send
+        @param start_deadline time.monotonic() at which the waveform should start, None to start as early as possible
+        @param preempted threading.Event, which drops the rest of the waveform, or None
+        @param priority priority of the injecting thread, lower values are more urgent
+        """
+        self.waveform = waveform
+        self.start_deadline = start_deadline
+        self.preempted = preempted
+        self.priority = priority
+        self.requested = time.monotonic()
+        self.start = None
+        self.end = None
+        self.interrupted = False
+        self.completed = threading.Event()
+
+
+
+class HotRadio:
+    """keeps the radio transmitting, so that commands do not pay for
+    starting and stopping it.
+
+    While idle, the radio sends silence. Waveforms are injected by the
+    callback at the next buffer boundary, so they wait at most one buffer
+    period. Injected waveforms take turns like joined transmissions.
+
+    The delay of injections and underruns (the callback was too late to
+    keep the radio busy) are recorded in the statistics."""
+
+    def __init__(self, guard_ms, transfer_count, buffer_count=2):
+        """creates a HotRadio
+
+        @param guard_ms minimal distance between messages of different injections in ms
+        @param transfer_count number of buffers the radio keeps in flight
+        @param buffer_count number of buffers used to generate samples
+        """
+        self.guard_ms = guard_ms
+        self.transfer_count = transfer_count
+        self.buffer_count = buffer_count
+        self.lock = threading.Lock()
+        self.running = False
+        self.tuning = None
+        self.sample_rate = None
+        self.buffers = []
+        self.silence = None
+        self.__reset()
+
+        self.restarts = 0
+        self.injections = 0
+        self.interrupted = 0
+        self.underruns = 0
+        self.underrun_s = 0.0
+        self.splice_delays = 0
+        self.total_splice_delay_s = 0.0
+        self.max_splice_delay_s = 0.0
+        self.start_delays = 0
+        self.total_start_delay_s = 0.0
+        self.max_start_delay_s = 0.0
+
+
+    def __reset(self):
+        self.stream_start = None
+        self.position = 0
+        self.buffer_length = 0
+        self.frames = []
+        self.chunks = None
+        self.pending = []
+        self.active = []
+
+
+    def start(self, sample_rate, tuning):
+        """prepares a new continuous transmission, before the radio is started
+
+        @param sample_rate sample rate the radio is tuned to
+        @param tuning radio settings (e. g. frequency and sample rate), which injected waveforms require
+        """
+        with self.lock:
+            self.__reset()
+            self.sample_rate = sample_rate
+            self.tuning = tuning
+            self.running = True
+            self.restarts = self.restarts + 1
+
+
+    def stop(self):
+        """ends the continuous transmission, after the radio was stopped.
+        Waveforms which have not been sent completely are interrupted."""
+        with self.lock:
+            self.running = False
+            for injection in self.pending + self.active:
+                self.__finish(injection, True)
+            self.__reset()
+
+
+    def inject(self, waveform, start_deadline=None, preempted=None, priority=0):
+        """adds a waveform to the transmission at the next buffer boundary
+
+        @param waveform samples to send
+        @param start_deadline time.monotonic() at which the waveform should start, None to start as early as possible
+        @param preempted threading.Event, which drops the rest of the waveform, or None
+        @param priority priority of the injecting thread, lower values are more urgent
+        @return Injection, whose completed event is set after the waveform was sent; None if the radio is not running
+        """
+        with self.lock:
+            if not self.running:
+                return None
+            injection = Injection(waveform, start_deadline, preempted, priority)
+            self.pending.append(injection)
+            return injection
+
+
+    def is_idle(self):
+        with self.lock:
+            return len(self.pending) == 0 and len(self.active) == 0
+
+
+    def wait_idle(self, priority, timeout=15):
+        """waits until all injected waveforms have been sent. Less urgent
+        injections are asked to stop, so that the radio can be retuned.
+
+        @param priority priority of the waiting thread, lower values are more urgent
+        @param timeout maximal time to wait in seconds
+        @return True if the radio is idle
+        """
+        with self.lock:
+            for injection in self.pending + self.active:
+                if injection.priority > priority and injection.preempted is not None:
+                    injection.preempted.set()
+
+        deadline = time.monotonic() + timeout
+        while not self.is_idle():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+
+    def get_data_to_send(self, buffer_length: int):
+        """callback of the radio, which returns the next buffer of samples"""
+        now = time.monotonic()
+        with self.lock:
+            if self.stream_start is None:
+                self.stream_start = now
+                self.buffer_length = buffer_length
+                self.buffers = [np.zeros(buffer_length, dtype=np.uint8) for _ in range(self.buffer_count)]
+                self.silence = np.zeros(buffer_length, dtype=np.uint8)
+            else:
+                lag = now - self.stream_start - self.position / 2 / self.sample_rate
+                if lag > 0:
+                    # the radio ran out of samples, so the stream clock is late
+                    self.underruns = self.underruns + 1
+                    self.underrun_s = self.underrun_s + lag
+                    self.stream_start = self.stream_start + lag
+
+            changed = self.__drop_preempted()
+            changed = self.__splice(now) or changed
+            if changed:
+                self.__rebuild()
+
+            chunk = next(self.chunks, None) if self.chunks is not None else None
+            if chunk is None:
+                self.chunks = None
+                chunk = self.silence
+            self.position = self.position + len(chunk)
+            self.__complete()
+            return chunk
+
+
+    def __splice(self, now):
+        """adds the pending injections to the frames of the transmission
+
+        @return True if frames were added
+        """
+        if len(self.pending) == 0:
+            return False
+
+        earliest = self.position // 2
+        guard = round(self.guard_ms * self.sample_rate / 1000)
+        added = []
+        for injection in self.pending:
+            if injection.preempted is not None and injection.preempted.is_set():
+                self.__finish(injection, True)
+                continue
+            start = earliest
+            if injection.start_deadline is not None:
+                start = max(earliest, round((injection.start_deadline - self.stream_start) * self.sample_rate))
+            frames = injection.waveform.frames(start, injection)
+            if len(frames) == 0:
+                self.__finish(injection, False)
+                continue
+            added = added + frames
+            self.active.append(injection)
+            self.injections = self.injections + 1
+
+            delay = now - injection.requested
+            self.splice_delays = self.splice_delays + 1
+            self.total_splice_delay_s = self.total_splice_delay_s + delay
+            self.max_splice_delay_s = max(self.max_splice_delay_s, delay)
+        self.pending = []
+        if len(added) == 0:
+            return False
+
+        self.frames = multiplex(self.frames + added, earliest, guard)
+        for injection in self.active:
+            owned = [frame for frame in self.frames if frame.owner is injection]
+            first_start = injection.start
+            injection.start = self.stream_start + owned[0].start / self.sample_rate
+            injection.end = owned[-1].end()
+            if first_start is None and injection.start_deadline is None:
+                delay = injection.start - injection.requested
+                self.start_delays = self.start_delays + 1
+                self.total_start_delay_s = self.total_start_delay_s + delay
+                self.max_start_delay_s = max(self.max_start_delay_s, delay)
+        return True
+
+
+    def __drop_preempted(self):
+        """removes the remaining frames of preempted injections
+
+        @return True if frames were removed
+        """
+        preempted = [injection for injection in self.active
+                     if injection.preempted is not None and injection.preempted.is_set()]
+        for injection in preempted:
+            self.active.remove(injection)
+            self.frames = [frame for frame in self.frames if frame.owner is not injection]
+            self.__finish(injection, True)
+        return len(preempted) > 0
+
+
+    def __rebuild(self):
+        """continues the transmission with the current frames"""
+        waveform = Waveform.from_frames(self.frames)
+
+        # the radio always gets complete buffers
+        padding = (-waveform.total_bytes()) % self.buffer_length
+        if padding > 0:
+            waveform.segments.append(Segment(NO_SAMPLES, 1, padding // 2))
+        self.chunks = waveform.chunks(self.buffers, self.position)
+
+
+    def __complete(self):
+        """finishes injections, whose samples have left the radio"""
+        in_flight = self.transfer_count * self.buffer_length
+        for injection in list(self.active):
+            if self.position >= injection.end * 2 + in_flight:
+                self.active.remove(injection)
+                self.frames = [frame for frame in self.frames if frame.owner is not injection]
+                self.__finish(injection, False)
+
+
+    def __finish(self, injection, interrupted):
+        injection.interrupted = interrupted
+        if interrupted:
+            self.interrupted = self.interrupted + 1
+        injection.completed.set()
+
+
+    def get_statistics(self):
+        """returns the number of injections and underruns and the delay of injections"""
+        with self.lock:
+            return {
+                "running": self.running,
+                "restarts": self.restarts,
+                "injections": self.injections,
+                "interrupted": self.interrupted,
+                "underruns": self.underruns,
+                "underrun_ms": round(self.underrun_s * 1000, 1),
+                "splice_delay_ms": {
+                    "mean": round(self.total_splice_delay_s * 1000 / max(1, self.splice_delays), 1),
+                    "max": round(self.max_splice_delay_s * 1000, 1)
+                },
+                "start_delay_ms": {
+                    "mean": round(self.total_start_delay_s * 1000 / max(1, self.start_delays), 1),
+                    "max": round(self.max_start_delay_s * 1000, 1)
+                }
+            }
@@ -0,0 +1,161 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import concurrent.futures
+import multiprocessing
+import threading
+import time
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from remoshock.sdr.modulator import Modulator
+from remoshock.sdr.transmissionplan import Silence
+from remoshock.sdr.waveform import Waveform
+
+
+# modulators of a pool process, by modulation parameters
+modulators = {}
+
+
+def modulate_into_shared_memory(parameters, bits, name):
+    """modulates a message in a pool process
+
+    @param parameters arguments of the Modulator constructor
+    @param bits message as string of "0" and "1" or as bytes of the values 0 and 1
+    @param name name of the shared memory block for the samples, which is owned by the server process
+    """
+    modulator = modulators.get(parameters)
+    if modulator is None:
+        modulator = Modulator(*parameters)
+        modulators[parameters] = modulator
+
+    length = 2 * len(bits) * modulator.samples_per_symbol
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        out = np.ndarray(length, dtype=np.int8, buffer=block.buf)
+        modulator.modulate(bits, out)
+        del out
+    finally:
+        block.close()
+
+
+
+class ModulationPool:
+    """modulates messages in separate processes.
+
+    Modulation is CPU-bound. In the server process, it would hold the GIL
+    and stall the threads answering HTTP requests. The pool processes write
+    the samples into shared memory, so they are not pickled. The server
+    process creates and unlinks the shared memory, because Python before
+    3.13 tracks a block in the process, that created it."""
+
+    def __init__(self, processes):
+        """creates a ModulationPool
+
+        @param processes number of pool processes
+        """
+        self.processes = processes
+        self.lock = threading.Lock()
+        self.modulated = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.executor = self.__create_executor()
+
+        # start the processes now, so that the first command does not wait for them
+        self.executor.submit(int)
+
+
+    def __create_executor(self):
+        # forking would copy the locks held by other threads of the server
+        context = multiprocessing.get_context("spawn")
+        return concurrent.futures.ProcessPoolExecutor(self.processes, mp_context=context)
+
+
+    def modulate_plan(self, plan):
+        """modulates a TransmissionPlan into a Waveform. The distinct
+        messages are modulated in parallel.
+
+        @param plan TransmissionPlan
+        """
+        distinct = dict.fromkeys(item.bits for item in plan.items if not isinstance(item, Silence))
+        samples = self.modulate_messages(plan, distinct)
+        return Waveform.from_plan(plan, samples.__getitem__)
+
+
+    def modulate_messages(self, plan, messages):
+        """modulates messages in parallel
+
+        @param plan TransmissionPlan with the modulation parameters
+        @param messages distinct messages
+        @return dict of interleaved int8 I/Q samples by message
+        """
+        start = time.monotonic()
+        parameters = (plan.sample_rate, plan.carrier_frequency, plan.modulation_type,
+                      plan.samples_per_symbol, plan.low_frequency, plan.high_frequency)
+        with self.lock:
+            executor = self.executor
+        futures = {}
+        error = None
+        try:
+            for bits in messages:
+                length = 2 * len(bits) * plan.samples_per_symbol
+                block = shared_memory.SharedMemory(create=True, size=max(1, length))
+                try:
+                    future = executor.submit(modulate_into_shared_memory, parameters, bits, block.name)
+                except Exception:
+                    block.close()
+                    block.unlink()
+                    raise
+                futures[bits] = (block, length, future)
+        except concurrent.futures.process.BrokenProcessPool as e:
+            error = e
+
+        # all results are received, so that no shared memory is left behind
+        samples = {}
+        for (bits, (block, length, future)) in futures.items():
+            try:
+                samples[bits] = self.__receive(block, length, future)
+            except Exception as e:
+                error = error or e
+        if isinstance(error, concurrent.futures.process.BrokenProcessPool):
+            # a pool process died, the next plan gets a new pool
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = self.__create_executor()
+        if error is not None:
+            raise error
+
+        duration = time.monotonic() - start
+        with self.lock:
+            self.modulated = self.modulated + 1
+            self.total_s = self.total_s + duration
+            self.max_s = max(self.max_s, duration)
+        return samples
+
+
+    @staticmethod
+    def __receive(block, length, future):
+        """waits for a pool process, copies the samples out of shared memory and releases it"""
+        try:
+            future.result()
+            view = np.ndarray(length, dtype=np.int8, buffer=block.buf)
+            samples = view.copy()
+            del view
+        finally:
+            block.close()
+            block.unlink()
+        return samples
+
+
+    def get_statistics(self):
+        """returns the number of modulated plans and the time spent"""
+        with self.lock:
+            return {
+                "processes": self.processes,
+                "modulated": self.modulated,
+                "mean_ms": round(self.total_s * 1000 / max(1, self.modulated), 1),
+                "max_ms": round(self.max_s * 1000, 1)
+            }
@@ -0,0 +1,192 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import math
+
+import numpy as np
+
+
+# number of samples synthesized at once. This limits the size of the temporary arrays.
+DEFAULT_BLOCK_SAMPLES = 16384
+
+
+class ModulationScratch:
+    """temporary arrays for the synthesis of one block of samples.
+
+    A sender keeps one instance for all its transmissions, so that
+    modulation does not allocate large temporary arrays."""
+
+    def __init__(self, block_samples=DEFAULT_BLOCK_SAMPLES):
+        """creates a ModulationScratch
+
+        @param block_samples number of samples synthesized at once
+        """
+        self.block_samples = block_samples
+        self.offsets = np.arange(block_samples, dtype=np.int64)
+        self.index = np.empty(block_samples, dtype=np.int64)
+        self.symbol = np.empty(block_samples, dtype=np.int64)
+        self.time = np.empty(block_samples, dtype=np.float64)
+        self.argument = np.empty(block_samples, dtype=np.float64)
+        self.single = np.empty(block_samples, dtype=np.float32)
+        self.value = np.empty(block_samples, dtype=np.float32)
+
+
+
+class Modulator:
+    """modulates bit strings into interleaved int8 I/Q samples.
+
+    This is a vectorized implementation of the FSK and ASK modulation
+    of Universal Radio Hacker (urh_cli). It reproduces the single precision
+    arithmetic and the phase correction between FSK symbols of URH, so it
+    creates the same samples without depending on URH internals.
+
+    Note: URH uses cosf()/sinf() of the C library, which may round a very
+    small number of samples by one step differently than numpy.
+    """
+
+    def __init__(self, sample_rate, carrier_frequency, modulation_type,
+                 samples_per_symbol, low_frequency, high_frequency, scratch=None):
+        """creates a Modulator
+
+        @param sample_rate sample rate in samples per second
+        @param carrier_frequency carrier frequency in Hz (ASK only)
+        @param modulation_type "FSK" or "ASK"
+        @param samples_per_symbol number of samples per bit
+        @param low_frequency frequency in Hz (FSK) or amplitude (ASK) of a 0 bit
+        @param high_frequency frequency in Hz (FSK) or amplitude (ASK) of a 1 bit
+        @param scratch ModulationScratch to reuse, a new one is created otherwise
+        """
+        self.sample_rate = np.float32(sample_rate)
+        self.carrier_frequency = np.float32(carrier_frequency)
+        self.modulation_type = modulation_type.upper()
+        self.samples_per_symbol = int(samples_per_symbol)
+
+        if self.modulation_type == "ASK":
+            self.parameters = np.array([self.__parse_amplitude(low_frequency),
+                                        self.__parse_amplitude(high_frequency)], dtype=np.float32)
+        elif self.modulation_type == "FSK":
+            self.parameters = np.array([float(low_frequency), float(high_frequency)], dtype=np.float32)
+        else:
+            raise ValueError("Unsupported modulation type " + modulation_type)
+        self.scratch = scratch or ModulationScratch()
+
+
+    @staticmethod
+    def __parse_amplitude(value):
+        """converts an amplitude parameter the way urh_cli does:
+        "50%" is half the amplitude, other values are multiplied by 100 percent.
+
+        Note: This means "100" is an amplitude of 10000 percent, which overflows
+        the int8 range. Receivers rely on the resulting signal, so we keep it.
+        """
+        value = str(value)
+        if value.endswith("%"):
+            percent = float(value[:-1])
+        else:
+            percent = float(value) * 100
+        return percent / 100
+
+
+    def modulate(self, bits, out=None):
+        """modulates a message.
+
+        The samples are synthesized block by block into the output array,
+        so that the temporary arrays do not grow with the message length.
+
+        @param bits message as string of "0" and "1", as bytes or uint8 numpy array of 0 and 1
+        @param out optional int8 array of 2 * samples_per_symbol * len(bits) values to write to
+        @return interleaved int8 I/Q samples
+        """
+        if isinstance(bits, str):
+            bits = np.frombuffer(bits.encode("ascii"), dtype=np.uint8) - ord("0")
+        elif isinstance(bits, bytes):
+            bits = np.frombuffer(bits, dtype=np.uint8)
+        bits = np.asarray(bits, dtype=np.uint8)
+        length = len(bits) * self.samples_per_symbol
+        if out is None:
+            out = np.empty(2 * length, dtype=np.int8)
+        iq = out.reshape(-1, 2)
+
+        if self.modulation_type == "ASK":
+            amplitudes = self.parameters[bits]
+            angular_frequencies = None
+            phase_corrections = None
+        else:
+            amplitudes = None
+            angular_frequencies = (2 * math.pi) * self.parameters[bits].astype(np.float64)
+            phase_corrections = self.__fsk_phase_corrections(bits)
+
+        block_samples = self.scratch.block_samples
+        for start in range(0, length, block_samples):
+            end = min(start + block_samples, length)
+            self.__synthesize(iq[start:end], start, amplitudes, angular_frequencies, phase_corrections)
+        return out
+
+
+    def __synthesize(self, iq, start, amplitudes, angular_frequencies, phase_corrections):
+        """synthesizes one block of samples
+
+        @param iq int8 output array of shape (n, 2)
+        @param start index of the first sample of the block within the message
+        @param amplitudes amplitude of each symbol (ASK)
+        @param angular_frequencies angular frequency of each symbol (FSK)
+        @param phase_corrections phase correction of each symbol (FSK)
+        """
+        n = len(iq)
+        scratch = self.scratch
+        index = scratch.index[:n]
+        symbol = scratch.symbol[:n]
+        time = scratch.time[:n]
+        argument = scratch.argument[:n]
+        single = scratch.single[:n]
+        value = scratch.value[:n]
+
+        np.add(scratch.offsets[:n], start, out=index)
+        np.floor_divide(index, self.samples_per_symbol, out=symbol)
+
+        # time in single precision, as URH does
+        np.copyto(single, index, casting="unsafe")
+        np.divide(single, self.sample_rate, out=single)
+        np.copyto(time, single)
+
+        if angular_frequencies is None:
+            np.multiply(time, 2 * math.pi * np.float64(self.carrier_frequency), out=argument)
+        else:
+            np.take(angular_frequencies, symbol, out=argument)
+            np.multiply(argument, time, out=argument)
+            np.take(phase_corrections, symbol, out=time)
+            np.add(argument, time, out=argument)
+
+        # URH rounds the argument to single precision before calculating cos and sin
+        np.copyto(single, argument, casting="same_kind")
+        np.copyto(argument, single)
+
+        if amplitudes is not None:
+            np.take(amplitudes, symbol, out=value)
+
+        for (column, function) in ((0, np.cos), (1, np.sin)):
+            function(argument, out=single, casting="same_kind")
+            if amplitudes is not None:
+                np.multiply(single, value, out=single)
+            np.multiply(single, np.float32(127), out=single)
+            np.copyto(iq[:, column], single, casting="unsafe")
+
+
+    def __fsk_phase_corrections(self, bits):
+        """calculates the phase correction of each symbol, which prevents phase
+        jumps when the frequency changes between two symbols.
+
+        @param bits message as uint8 numpy array
+        """
+        corrections = np.zeros(len(bits), dtype=np.float64)
+        frequencies = self.parameters[bits]
+        correction = np.float32(0)
+        two_pi = 2 * math.pi
+        for i in np.flatnonzero(frequencies[1:] != frequencies[:-1]) + 1:
+            t = np.float32(i * self.samples_per_symbol - 1) / self.sample_rate
+            delta = np.float32(frequencies[i - 1] - frequencies[i])
+            # URH is compiled with C division semantics, so the remainder keeps the sign
+            correction = np.float32(math.fmod(float(correction) + two_pi * float(delta) * float(t), two_pi))
+            corrections[i:] = correction
+        return corrections
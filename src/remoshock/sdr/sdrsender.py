@@ -2,11 +2,82 @@
 # Copyright nilswinter 2020-2021. License: AGPL
 # _____________________________________________
 
+import time
+
+from remoshock.util.transportlock import get_preemption_event, timed_priority
+
 
 class SdrSender:
-    """parent class for SDR based senders"""
+    """parent class for SDR based senders.
+
+    Sub-classes set self.lock to the TransportLock of their device."""
+
+    def send(self, plan):
+        """transmits a TransmissionPlan
 
-    def send(self, frequency, sample_rate, carrier_frequency,
-             modulation_type, samples_per_symbol, low_frequency,
-             high_frequency, pause, data):
+        @param plan TransmissionPlan created by a receiver
+        """
         pass
+
+
+    def send_in_parts(self, plan, transmit, min_silence_ms, lead_ms):
+        """sends a TransmissionPlan split at long silence (e. g. the delay between
+        beep and shock), so that the radio can send commands for other receivers
+        during the silence.
+
+        The following parts are started on time using the monotonic clock. The
+        radio is reserved for them, so that only commands of other receivers,
+        which end before, are started during the silence. They preempt commands,
+        which take longer than expected and would delay them.
+
+        @param plan TransmissionPlan
+        @param transmit function called with a part and the time.monotonic() it has to start at
+                        (None for the first part). It returns the time.monotonic() at which
+                        the part started, None if it was not sent
+        @param min_silence_ms silence of at least this duration is not transmitted
+        @param lead_ms a timed part is handed to transmit this early
+        """
+        min_silence = int(min_silence_ms * plan.sample_rate / 1000)
+        preempted = get_preemption_event()
+        parts = plan.split(min_silence)
+        if len(parts) > 1:
+            # the first part has not started yet, so this estimate is early
+            self.lock.reserve(time.monotonic() + parts[1][0] / plan.sample_rate - lead_ms / 1000)
+        try:
+            first_start = None
+            for (offset, part) in parts:
+                if first_start is None:
+                    first_start = transmit(part, None)
+                    if first_start is None:
+                        return
+                    continue
+
+                start_deadline = first_start + offset / plan.sample_rate
+                self.lock.reserve(start_deadline - lead_ms / 1000)
+                wait = start_deadline - lead_ms / 1000 - time.monotonic()
+                if wait > 0:
+                    if preempted is None:
+                        time.sleep(wait)
+                    elif preempted.wait(wait):
+                        return
+                with timed_priority():
+                    stream_start = transmit(part, start_deadline)
+                if stream_start is None:
+                    return
+        finally:
+            self.lock.cancel_reservation()
+
+
+    def prepare(self, _plan):
+        """modulates the messages of a plan ahead of time, sub-classes with
+        a cache for modulated messages will do something useful here
+
+        @param _plan TransmissionPlan created by a receiver
+        @return False if there is no memory left for more messages
+        """
+        return False
+
+
+    def get_statistics(self):
+        """returns statistics about this sender (e. g. cache usage)"""
+        return {"lock": self.lock.get_statistics()}
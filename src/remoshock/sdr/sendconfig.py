@@ -0,0 +1,233 @@
+#
+# Most code in this file is copied from https://github.com/jopohl/urh
+# which is GPL. Please see https://github.com/jopohl/urh/blob/master/LICENSE
+# __________________________________________________________________________
+
+import threading
+import time
+
+import numpy as np
+
+from remoshock.sdr.waveform import Waveform, multiplex
+
+
+# number of USB transfers libhackrf keeps in flight while transmitting
+HACKRF_TRANSFER_COUNT = 4
+
+# minimal distance between messages for different receivers, which are
+# combined into one transmission
+MULTIPLEX_GUARD_MS = 2
+
+
+class TxBufferPool:
+    """buffers for the samples handed to the HackRF.
+
+    They are allocated on the first transmission and reused afterwards,
+    so sending a command does not allocate large arrays."""
+
+    def __init__(self, count):
+        """creates a TxBufferPool
+
+        @param count number of buffers
+        """
+        self.count = count
+        self.buffers = []
+        self.silence = np.zeros(1, dtype=np.uint8)
+
+
+    def get_buffers(self, buffer_length: int):
+        """returns the buffers, (re)allocating them if the HackRF asks for a different size"""
+        if len(self.buffers) == 0 or len(self.buffers[0]) != buffer_length:
+            self.buffers = [np.zeros(buffer_length, dtype=np.uint8) for _ in range(self.count)]
+        return self.buffers
+
+
+class PendingJoin:
+    """frames waiting to be added to a running transmission"""
+
+    def __init__(self, frames, valid_until, preempted, owner):
+        """creates a PendingJoin
+
+        @param frames all frames of the transmission including the added ones
+        @param valid_until the frames can only be applied, if no more than this number of bytes has been sent
+        @param preempted threading.Event of the joining command
+        @param owner owner of the added frames
+        """
+        self.owner = owner
+        self.frames = frames
+        self.waveform = Waveform.from_frames(frames)
+        self.valid_until = valid_until
+        self.preempted = preempted
+        self.accepted = False
+        self.applied = threading.Event()
+
+
+class SendConfig:
+    """a transmission of the HackRF, which other waveforms with the same
+    modulation can join.
+
+    Each waveform is stopped by the preemption event of its own command:
+    The remaining frames of a preempted command are dropped and the other
+    commands continue. The transmission is aborted, once no frames are left."""
+
+    def __init__(self, waveform: Waveform, buffer_pool: TxBufferPool, sample_rate, start_deadline=None, preempted=None):
+        """prepares a transmission
+
+        @param waveform samples to send
+        @param buffer_pool buffers to generate the samples in
+        @param sample_rate sample rate the HackRF is tuned to
+        @param start_deadline time.monotonic() at which the waveform should start. The HackRF is started
+                              early and sends silence until then. None to start immediately.
+        @param preempted threading.Event, which drops the waveform at the next buffer boundary
+        """
+        self.waveform = waveform
+        self.buffer_pool = buffer_pool
+        self.sample_rate = sample_rate
+        self.start_deadline = start_deadline
+        # the frames of the waveform are owned by this SendConfig, joined frames by other objects
+        self.preemption_events = {self: preempted} if preempted is not None else {}
+        self.stream_start = None
+        self.chunks = None
+        self.position = 0
+        self.buffer_length = 0
+        self.frames = None
+        self.total_samples = 0
+        self.finished = False
+        self.interrupted = False
+        self.aborted = False
+        self.callbacks_after_finish = 0
+        self.started = threading.Event()
+        self.completed = threading.Event()
+        self.join_lock = threading.Lock()
+        self.pending_join = None
+        self.modulation_key = None
+
+
+    def get_data_to_send(self, buffer_length: int):
+        try:
+            if not self.finished:
+                if self.chunks is None:
+                    self.stream_start = time.monotonic()
+                    waveform = self.waveform
+                    if self.start_deadline is not None:
+                        lead_in = round((self.start_deadline - self.stream_start) * self.sample_rate)
+                        waveform = waveform.with_lead_in(lead_in)
+
+                    # samples are generated just in time, while the HackRF is already transmitting
+                    with self.join_lock:
+                        self.buffer_length = buffer_length
+                        self.frames = waveform.frames(0, self)
+                        self.total_samples = waveform.total_samples()
+                        self.chunks = waveform.chunks(self.buffer_pool.get_buffers(buffer_length))
+                    self.started.set()
+
+                self.__apply_join()
+                self.__drop_preempted()
+                chunk = None if self.aborted else next(self.chunks, None)
+                if chunk is not None:
+                    self.position = self.position + len(chunk)
+                    return chunk
+                with self.join_lock:
+                    self.finished = True
+
+            self.callbacks_after_finish += 1
+            return self.buffer_pool.silence
+        except (BrokenPipeError, EOFError):
+            return self.buffer_pool.silence
+
+
+    def join(self, waveform: Waveform, start_deadline, preempted, latest_end=None):
+        """adds the messages of a waveform to this running transmission. The messages
+        of all joined waveforms take turns. They are sent in the gaps between each other,
+        or are delayed, if the gaps are too short.
+
+        @param waveform samples to add
+        @param start_deadline time.monotonic() at which the waveform should start, None to start as early as possible
+        @param preempted threading.Event of the joining command
+        @param latest_end time.monotonic() which the transmission must not be extended beyond, None for no limit
+        @return time.monotonic() at which the added waveform starts, None if the transmission cannot be joined
+        """
+        self.started.wait(1)
+        with self.join_lock:
+            if self.chunks is None or self.finished or self.aborted or self.pending_join is not None:
+                return None
+
+            # the next callback may have consumed one more buffer, before it applies the frames
+            earliest = (self.position + self.buffer_length) // 2
+            start = earliest
+            if start_deadline is not None:
+                start = max(earliest, round((start_deadline - self.stream_start) * self.sample_rate))
+
+            owner = object()
+            added = waveform.frames(start, owner)
+            if len(added) == 0:
+                return None
+            frames = multiplex(self.frames + added, earliest, round(MULTIPLEX_GUARD_MS * self.sample_rate / 1000))
+            first = next(frame.start for frame in frames if frame.owner is owner)
+            end = max(frame.end() for frame in frames)
+            if latest_end is not None and end > max((frame.end() for frame in self.frames), default=0) \
+                    and self.stream_start + end / self.sample_rate > latest_end:
+                return None
+            pending_join = PendingJoin(frames, earliest * 2, preempted, owner)
+            self.pending_join = pending_join
+
+        if not pending_join.applied.wait(1) or not pending_join.accepted:
+            return None
+        return self.stream_start + first / self.sample_rate
+
+
+    def __apply_join(self):
+        """continues the transmission with the frames of a pending join"""
+        with self.join_lock:
+            pending_join = self.pending_join
+            if pending_join is None:
+                return
+            self.pending_join = None
+
+            if self.position <= pending_join.valid_until:
+                self.frames = pending_join.frames
+                self.total_samples = pending_join.waveform.total_samples()
+                self.chunks = pending_join.waveform.chunks(self.buffer_pool.get_buffers(self.buffer_length), self.position)
+                if pending_join.preempted is not None:
+                    self.preemption_events[pending_join.owner] = pending_join.preempted
+                pending_join.accepted = True
+            pending_join.applied.set()
+
+
+    def __drop_preempted(self):
+        """removes the remaining frames of preempted commands. If no frames are
+        left, the transmission is aborted without waiting for the transfers in flight."""
+        preempted = [owner for (owner, event) in self.preemption_events.items() if event.is_set()]
+        if len(preempted) == 0:
+            return
+
+        with self.join_lock:
+            for owner in preempted:
+                del self.preemption_events[owner]
+            if self in preempted:
+                self.interrupted = True
+            if self.pending_join is not None:
+                # the pending frames may contain dropped ones, the joining command takes the lock instead
+                self.pending_join.applied.set()
+                self.pending_join = None
+
+            self.frames = [frame for frame in self.frames if frame.owner not in preempted]
+            if all(frame.end() * 2 <= self.position for frame in self.frames):
+                self.aborted = True
+                return
+            waveform = Waveform.from_frames(self.frames)
+            self.total_samples = waveform.total_samples()
+            self.chunks = waveform.chunks(self.buffer_pool.get_buffers(self.buffer_length), self.position)
+
+
+    def sending_is_finished(self):
+        return self.finished
+
+
+    def transmission_is_complete(self):
+        """all samples have been handed to the HackRF.
+
+        libhackrf keeps several USB transfers in flight. The transfer carrying
+        our last samples has been completed, once libhackrf asked to refill
+        all of them with silence."""
+        return self.callbacks_after_finish >= HACKRF_TRANSFER_COUNT
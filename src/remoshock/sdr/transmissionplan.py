@@ -0,0 +1,203 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import numpy as np
+
+
+class Message:
+    """a message which is repeated, each repetition followed by a gap"""
+
+    def __init__(self, bits, repeats, gap):
+        """creates a Message
+
+        @param bits message as string of "0" and "1" or as bytes of the values 0 and 1
+        @param repeats number of repetitions
+        @param gap silence in samples after each repetition
+        """
+        self.bits = bits
+        self.repeats = repeats
+        self.gap = gap
+
+
+    def key(self):
+        return ("message", self.bits, self.repeats, self.gap)
+
+
+    def total_samples(self, samples_per_symbol):
+        return self.repeats * (len(self.bits) * samples_per_symbol + self.gap)
+
+
+    def to_string(self):
+        """returns the message as bit string, e. g. for urh_cli"""
+        if isinstance(self.bits, str):
+            return self.bits
+        return (np.frombuffer(self.bits, dtype=np.uint8) + ord("0")).tobytes().decode("ascii")
+
+
+
+class Silence:
+    """a period without transmission"""
+
+    def __init__(self, samples):
+        """creates a Silence
+
+        @param samples duration in samples
+        """
+        self.samples = samples
+
+
+    def key(self):
+        return ("silence", self.samples)
+
+
+    def total_samples(self, _samples_per_symbol):
+        return self.samples
+
+
+
+class TransmissionPlan:
+    """describes a transmission as sequence of repeated messages and silence.
+
+    Receivers create a plan and hand it to the SDR sender. Senders can
+    modulate each distinct message once and generate repetitions and
+    silence without keeping the complete signal in memory."""
+
+    def __init__(self, frequency, sample_rate, carrier_frequency,
+                 modulation_type, samples_per_symbol, low_frequency,
+                 high_frequency, pause):
+        """creates an empty TransmissionPlan
+
+        @param frequency frequency the SDR is tuned to in Hz
+        @param sample_rate sample rate in samples per second
+        @param carrier_frequency carrier frequency in Hz
+        @param modulation_type "FSK" or "ASK"
+        @param samples_per_symbol number of samples per bit
+        @param low_frequency frequency in Hz (FSK) or amplitude (ASK) of a 0 bit
+        @param high_frequency frequency in Hz (FSK) or amplitude (ASK) of a 1 bit
+        @param pause default gap in samples after each message
+        """
+        self.frequency = frequency
+        self.sample_rate = sample_rate
+        self.carrier_frequency = carrier_frequency
+        self.modulation_type = modulation_type
+        self.samples_per_symbol = samples_per_symbol
+        self.low_frequency = low_frequency
+        self.high_frequency = high_frequency
+        self.pause = pause
+        self.items = []
+
+
+    def create_empty_copy(self):
+        """creates an empty TransmissionPlan with the same radio parameters"""
+        return TransmissionPlan(self.frequency, self.sample_rate, self.carrier_frequency,
+                                self.modulation_type, self.samples_per_symbol, self.low_frequency,
+                                self.high_frequency, self.pause)
+
+
+    def add_message(self, bits, repeats=1, gap=None):
+        """appends a message, which is repeated
+
+        @param bits message as string of "0" and "1", as uint8 numpy array or bytes of the values 0 and 1
+        @param repeats number of repetitions
+        @param gap silence in samples after each repetition, defaults to the pause of this plan
+        @return self
+        """
+        if gap is None:
+            gap = self.pause
+        if isinstance(bits, np.ndarray):
+            # bytes are immutable and hashable, so they can be part of the key of the plan
+            bits = bits.astype(np.uint8, copy=False).tobytes()
+        if repeats <= 0 or len(bits) == 0:
+            return self
+
+        last = self.items[-1] if len(self.items) > 0 else None
+        if isinstance(last, Message) and last.bits == bits and last.gap == gap:
+            last.repeats = last.repeats + repeats
+        else:
+            self.items.append(Message(bits, repeats, gap))
+        return self
+
+
+    def add_silence(self, duration_ms):
+        """appends a period without transmission
+
+        @param duration_ms duration in ms
+        @return self
+        """
+        samples = int(float(duration_ms) * float(self.sample_rate) / 1e3)
+        if samples > 0:
+            self.items.append(Silence(samples))
+        return self
+
+
+    def get_modulation_key(self):
+        """returns a hashable description of the radio and modulation parameters"""
+        return (self.frequency, self.sample_rate, self.carrier_frequency, self.modulation_type,
+                self.samples_per_symbol, self.low_frequency, self.high_frequency)
+
+
+    def key(self):
+        """returns a hashable description of the complete transmission"""
+        return (self.get_modulation_key(), tuple(item.key() for item in self.items))
+
+
+    def total_samples(self):
+        """duration of the transmission in samples"""
+        return sum(item.total_samples(self.samples_per_symbol) for item in self.items)
+
+
+    def split(self, min_silence_samples):
+        """splits the plan at long periods of silence into separate transmissions.
+
+        This allows the sender to release the radio during the silence.
+
+        @param min_silence_samples minimal duration of silence to split at
+        @return list of (start, plan) tuples, start is the offset in samples
+                from the beginning of the first transmission
+        """
+        parts = []
+        part = self.create_empty_copy()
+        part_start = 0
+        position = 0
+        for item in self.items:
+            if isinstance(item, Silence) and item.samples >= min_silence_samples:
+                position = position + item.samples
+                if len(part.items) > 0:
+                    parts.append((part_start, part))
+                    part = self.create_empty_copy()
+                part_start = position
+                continue
+
+            part.items.append(item)
+            position = position + item.total_samples(self.samples_per_symbol)
+
+        if len(part.items) > 0:
+            parts.append((part_start, part))
+        return parts
+
+
+    def to_urh_messages(self):
+        """converts the plan into the message format understood by urh_cli,
+        e. g. "0101/1100ms 0110".
+
+        Silence is added to the pause of the preceding message. Silence at the
+        beginning of the transmission is skipped, as the SDR is idle anyway."""
+        messages = []
+        pauses = []
+        for item in self.items:
+            if isinstance(item, Silence):
+                if len(pauses) > 0:
+                    pauses[-1] = pauses[-1] + item.samples
+                continue
+            for _ in range(item.repeats):
+                messages.append(item.to_string())
+                pauses.append(item.gap)
+
+        result = []
+        for (bits, pause) in zip(messages, pauses):
+            if pause == self.pause:
+                result.append(bits)
+            else:
+                result.append(bits + "/" + str(pause))
+        return " ".join(result)
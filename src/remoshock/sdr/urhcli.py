@@ -2,48 +2,285 @@
 # Copyright nilswinter 2020-2021. License: AGPL
 # _____________________________________________
 
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
 import subprocess
+import sys
 import threading
+import time
 
 from remoshock.sdr.sdrsender import SdrSender
+from remoshock.util.transportlock import TransportLock, get_preemption_event
 
 
-lock = threading.RLock()
+# time the worker may take to load URH, urh_cli is used meanwhile
+WORKER_STARTUP_TIMEOUT_S = 60
+
+# after the worker failed to start, urh_cli is used for this time
+WORKER_RETRY_S = 60
+
+
+def get_plan_parameters(plan):
+    """returns the radio parameters and the messages of a TransmissionPlan as dict,
+    which can be handed to the worker process"""
+    return {
+        "frequency": plan.frequency,
+        "sample_rate": plan.sample_rate,
+        "carrier_frequency": plan.carrier_frequency,
+        "modulation_type": plan.modulation_type,
+        "samples_per_symbol": plan.samples_per_symbol,
+        "low_frequency": plan.low_frequency,
+        "high_frequency": plan.high_frequency,
+        "pause": plan.pause,
+        "messages": plan.to_urh_messages()
+    }
+
+
+def create_arguments(sdr, device_identifier, parameters):
+    """returns the urh_cli command line arguments for a transmission
+
+    @param sdr name of the SDR hardware (e. g. HackRF)
+    @param device_identifier serial number of the device, None to use any device
+    @param parameters dict created by get_plan_parameters()
+    """
+    arguments = [
+        "--transmit",
+        "--device", sdr,
+        "--frequency", str(parameters["frequency"]),
+        "--sample-rate", str(parameters["sample_rate"]),
+        "--carrier-frequency", str(parameters["carrier_frequency"]),
+        "--modulation-type", parameters["modulation_type"],
+        "--samples-per-symbol", str(parameters["samples_per_symbol"]),
+        "--parameters", str(parameters["low_frequency"]), str(parameters["high_frequency"]),
+        "--pause", str(parameters["pause"]),
+        "--if-gain", "47",
+        "--messages", parameters["messages"]]
+    if device_identifier is not None:
+        arguments.extend(["--device-identifier", device_identifier])
+    return arguments
 
 
 class UrhCliSender(SdrSender):
-    """sends messages using urh_cli (the Universal Radio Hacker - Command Line Interface)"""
+    """sends messages using urh_cli (the Universal Radio Hacker - Command Line Interface)
+
+    By default, the transmissions are handed to a long-lived worker process
+    (see UrhWorker), which saves the startup time of urh_cli for each command.
+    The worker loads URH in the background, so that start-up is not delayed.
+    Until it is ready, urh_cli is used. The worker is restarted, if it
+    crashes. If it cannot be started, urh_cli is used instead."""
+
+    urh_cli_command = ["urh_cli"]
+    worker_command = [sys.executable, "-m", "remoshock.sdr.urhworker"]
 
-    def __init__(self, sdr, verbose):
+    def __init__(self, sdr, verbose, device_identifier=None, persistent=True):
         """constructs the UrhCliSender
 
         @param sdr name of the SDR hardware (e. g. HackRF)
-        @param verbose whether to print debug messages"""
+        @param verbose whether to print debug messages
+        @param device_identifier serial number of the device, None to use any device
+        @param persistent whether to use a long-lived worker process instead of starting urh_cli for each command"""
         self.sdr = sdr
         self.verbose = verbose
+        self.device_identifier = device_identifier
+        self.persistent = persistent
+        self.lock = TransportLock(sdr if device_identifier is None else sdr + " " + device_identifier)
+        self.request_ids = itertools.count(1)
+        self.worker = None
+        self.worker_ready = None
+        self.worker_answers = None
+        self.worker_started_at = None
+        self.worker_failed_at = None
+        self.worker_starts = 0
+        self.worker_crashes = 0
+        self.fallbacks = 0
+        if persistent:
+            with self.lock:
+                self.__start_worker()
+            atexit.register(self.__stop_worker)
+
+
+    def send(self, plan):
 
+        preempted = get_preemption_event()
+        with self.lock:
+            if preempted is not None and preempted.is_set():
+                return
 
-    def send(self, frequency, sample_rate, carrier_frequency,
-             modulation_type, samples_per_symbol, low_frequency,
-             high_frequency, pause, data):
-
-        with lock:
-            cmd = [
-                "urh_cli",
-                "--transmit",
-                "--device", self.sdr,
-                "--frequency", str(frequency),
-                "--sample-rate", str(sample_rate),
-                "--carrier-frequency", str(carrier_frequency),
-                "--modulation-type", modulation_type,
-                "--samples-per-symbol", str(samples_per_symbol),
-                "--parameters", str(low_frequency), str(high_frequency),
-                "--pause", str(pause),
-                "--if-gain", "47",
-                "--messages", data]
-
-            stdout = subprocess.DEVNULL
+            parameters = get_plan_parameters(plan)
+            arguments = create_arguments(self.sdr, self.device_identifier, parameters)
             if self.verbose:
-                print(cmd)
-                stdout = None
+                print(arguments)
+
+            if self.persistent:
+                if self.__ensure_worker() and self.__send_to_worker(parameters, plan, preempted):
+                    return
+                self.fallbacks = self.fallbacks + 1
+            self.__run_urh_cli(arguments, preempted)
+
+
+    def __run_urh_cli(self, arguments, preempted):
+        """starts urh_cli for one transmission"""
+        cmd = self.urh_cli_command + arguments
+        stdout = subprocess.DEVNULL
+        if self.verbose:
+            stdout = None
+        if preempted is None:
             subprocess.run(cmd, stdout=stdout)
+            return
+
+        # urh_cli is terminated, if the command is stopped
+        process = subprocess.Popen(cmd, stdout=stdout)
+        while process.poll() is None:
+            if preempted.wait(0.05):
+                process.terminate()
+                process.wait()
+
+
+    def __ensure_worker(self):
+        """checks whether the worker process is ready and (re)starts it, if it is not running
+
+        @return True if the worker is ready
+        """
+        if self.worker is not None and self.worker.poll() is not None:
+            if not self.worker_ready.is_set():
+                self.__worker_failed("exit code " + str(self.worker.returncode))
+            else:
+                logging.warning("urh worker exited with code " + str(self.worker.returncode) + ", restarting it")
+                self.worker_crashes = self.worker_crashes + 1
+                self.worker = None
+
+        if self.worker is None:
+            if self.worker_failed_at is not None and time.monotonic() - self.worker_failed_at < WORKER_RETRY_S:
+                return False
+            self.__start_worker()
+
+        if self.worker_ready.is_set():
+            return True
+        if time.monotonic() - self.worker_started_at > WORKER_STARTUP_TIMEOUT_S:
+            self.__worker_failed("timeout")
+        return False
+
+
+    def __start_worker(self):
+        """starts the worker process without waiting for it to load URH"""
+        # the worker has to find the remoshock package, even if it is not installed
+        env = dict(os.environ)
+        package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_dir, env.get("PYTHONPATH")]))
+
+        self.worker_starts = self.worker_starts + 1
+        self.worker_started_at = time.monotonic()
+        self.worker = subprocess.Popen(self.worker_command,
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       stderr=None if self.verbose else subprocess.DEVNULL,
+                                       text=True, env=env)
+        self.worker_ready = threading.Event()
+        self.worker_answers = queue.Queue()
+        thread = threading.Thread(target=self.__read_answers, args=(self.worker, self.worker_ready, self.worker_answers, self.sdr),
+                                  name="urhworker-answers", daemon=True)
+        thread.start()
+
+
+    def __worker_failed(self, error):
+        """stops a worker, which did not get ready, and uses urh_cli for a while"""
+        logging.warning("Could not start urh worker (" + error + "), using urh_cli for each command")
+        self.worker_failed_at = time.monotonic()
+        self.__stop_worker()
+
+
+    @staticmethod
+    def __read_answers(worker, ready, answers, sdr):
+        """forwards the answers of a worker to a queue, None indicates that the worker exited.
+        The ready event is set, once the worker has loaded URH."""
+        for line in worker.stdout:
+            try:
+                answer = json.loads(line)
+            except ValueError:
+                logging.warning("Invalid answer from urh worker: " + line)
+                continue
+            if "ready" not in answer:
+                answers.put(answer)
+            elif answer["ready"]:
+                logging.info("urh worker for " + sdr + " is ready")
+                ready.set()
+            else:
+                logging.warning("urh worker could not load URH: " + str(answer.get("error")))
+        answers.put(None)
+
+
+    def __send_to_worker(self, parameters, plan, preempted):
+        """hands a transmission to the worker and waits for it to finish
+
+        @return False if the transmission could not be handed to the worker
+        """
+        request_id = next(self.request_ids)
+        try:
+            self.__write_to_worker({"id": request_id, "device": self.sdr, "device_identifier": self.device_identifier,
+                                    "plan": parameters})
+        except OSError:
+            logging.warning("urh worker is not reachable")
+            return False
+
+        deadline = time.monotonic() + max(15, 5 + plan.total_samples() / plan.sample_rate)
+        stop_sent = False
+        while True:
+            if preempted is not None and preempted.is_set() and not stop_sent:
+                stop_sent = True
+                try:
+                    self.__write_to_worker({"stop": request_id})
+                except OSError:
+                    pass
+
+            try:
+                answer = self.worker_answers.get(timeout=0.05)
+            except queue.Empty:
+                if time.monotonic() > deadline:
+                    logging.error("urh worker did not complete the transmission, restarting it")
+                    self.__stop_worker()
+                    return True
+                continue
+
+            if answer is None:
+                # the transmission is not repeated, it might have been sent partially
+                logging.error("urh worker crashed while transmitting")
+                return True
+            if answer.get("id") != request_id:
+                continue
+            if answer.get("status") == "error":
+                logging.error("urh worker: " + str(answer.get("error")))
+            return True
+
+
+    def __write_to_worker(self, data):
+        self.worker.stdin.write(json.dumps(data) + "\n")
+        self.worker.stdin.flush()
+
+
+    def __stop_worker(self):
+        """closes the input of the worker, so that it exits"""
+        worker = self.worker
+        self.worker = None
+        if worker is None or worker.poll() is not None:
+            return
+        try:
+            worker.stdin.close()
+            worker.wait(2)
+        except (OSError, subprocess.TimeoutExpired):
+            worker.kill()
+
+
+    def get_statistics(self):
+        """returns statistics of the radio lock and of the worker process"""
+        result = super().get_statistics()
+        if self.persistent:
+            result["worker"] = {
+                "running": self.worker is not None and self.worker.poll() is None,
+                "starts": self.worker_starts,
+                "crashes": self.worker_crashes,
+                "fallbacks": self.fallbacks
+            }
+        return result
@@ -6,6 +6,7 @@
 # flake8: noqa
 
 import argparse
+import atexit
 import datetime
 import logging
 import os
@@ -15,8 +16,17 @@ import threading
 
 import numpy as np
 
+from remoshock.sdr.hotradio import HotRadio
+from remoshock.sdr.modulationpool import ModulationPool
+from remoshock.sdr.modulator import Modulator, ModulationScratch
 from remoshock.sdr.sdrsender import SdrSender
+from remoshock.sdr.sendconfig import HACKRF_TRANSFER_COUNT, MULTIPLEX_GUARD_MS, SendConfig, TxBufferPool
+from remoshock.sdr.transmissionplan import Silence, TransmissionPlan
+from remoshock.sdr.waveform import Waveform
+from remoshock.sdr.waveformcache import WaveformCache
+from remoshock.sdr.waveformstore import WaveformStore
 from remoshock.util.logutil import HidePrintIfNotVerbose
+from remoshock.util.transportlock import TransportLock, get_preemption_event, get_thread_priority
 
 cli_exe = sys.executable if hasattr(sys, 'frozen') else sys.argv[0]
 cur_dir = os.path.realpath(os.path.dirname(os.path.realpath(cli_exe)))
@@ -46,54 +56,32 @@ util.set_shared_library_path()
 from urh.util import Logger
 from urh.util.Logger import logger
 
-from urh.cli import urh_cli
 from urh.dev.native.lib import hackrf
-from multiprocessing import Array
 
 
 log_enabled = False
 
-def log(msg):
-    if log_enabled:
-        print(str(datetime.datetime.now().time()) + " " + msg)
-
-
-class SendConfig:
-    def __init__(self, send_buffer, total_samples: int):
-        self.send_buffer = send_buffer
-        self.total_samples = total_samples
-        self.current_sent_index = 0
-
+# silence of at least this duration is not transmitted. The radio is
+# released instead, and the rest of the transmission is started on time.
+MIN_RELEASE_SILENCE_MS = 300
 
-    def get_data_to_send(self, buffer_length: int):
-        try:
-            if self.sending_is_finished():
-                return np.zeros(1, dtype=self.send_buffer._type_._type_)
-
-            index = self.current_sent_index
-            np_view = np.frombuffer(self.send_buffer, dtype=self.send_buffer._type_._type_)
-            result = np_view[index:index + buffer_length]
-
-            self.progress_send_status(len(result))
-            return result
-        except (BrokenPipeError, EOFError):
-            return np.zeros(1, dtype=self.send_buffer._type_._type_)
+# a timed transmission starts this early. The HackRF sends silence until
+# the deadline, so that the startup time does not delay the signal.
+TIMED_START_LEAD_MS = 100
 
+# number of buffers used to generate samples for the HackRF. The callback
+# copies a chunk into the USB transfer, before it asks for the next one.
+CHUNK_BUFFER_COUNT = 2
 
-    def sending_is_finished(self):
-        return self.current_sent_index >= self.total_samples
-
-
-    def progress_send_status(self, buffer_length: int):
-        self.current_sent_index += buffer_length
-        if self.current_sent_index >= self.total_samples - 1:
-            self.current_sent_index = self.total_samples
 
+def log(msg):
+    if log_enabled:
+        print(str(datetime.datetime.now().time()) + " " + msg)
 
 
 class Sender:
 
-    def __init__(self):
+    def __init__(self, device_identifier=None):
         DEFAULT_CARRIER_AMPLITUDE = 1
         DEFAULT_CARRIER_PHASE = 0
         DEFAULT_NOISE = 0.1
@@ -125,7 +113,7 @@ class Sender:
         args.parameters = [92e3, 95e3]
         args.device_backend = "native"
         args.device = "HackRF"
-        args.device_identifier = None
+        args.device_identifier = device_identifier
         args.frequency = 27.1e6
         args.frequency_correction = 1
         args.sample_rate = 2e6
@@ -137,54 +125,107 @@ class Sender:
         Logger.save_log_level()
 
         self.args = args
+        self.device_open = False
+        self.reopen_required = False
+        self.tuned = {}
+        self.buffer_pool = TxBufferPool(CHUNK_BUFFER_COUNT)
+        self.modulation_scratch = ModulationScratch()
+        self.interrupted = False
+        self.active = None
         self.reset()
 
 
-    def reset(self):
+    def open_device(self):
+        """opens the HackRF device. It is kept open for all following commands."""
+        if self.device_open:
+            hackrf.close()
+            self.device_open = False
+        self.reopen_required = False
+        self.tuned = {}
+
         ready = hackrf.setup(self.args.device_identifier)
         if ready < 0 and ready > -1000:
             logger.error("Could not open HackRF device. Please check if it is connected and not used by another program.")
             return False
+        self.device_open = True
+        log("hackrf opened")
+        return True
+
+
+    def tune(self):
+        """applies frequency, sample rate, bandwidth and gains to the HackRF.
+
+        Settings which are already active on the device are skipped, so
+        consecutive commands on the same frequency do not pay for retuning."""
+        if (not self.device_open or self.reopen_required) and not self.open_device():
+            return False
+
         bandwidth = self.args.sample_rate if self.args.bandwidth is None else self.args.bandwidth
         gain = 20 if self.args.gain is None else self.args.gain
         if_gain = 20 if self.args.if_gain is None else self.args.if_gain
 
+        settings = [
+            ("frequency", self.args.frequency, hackrf.set_freq),
+            ("sample_rate", self.args.sample_rate, hackrf.set_sample_rate),
+            ("bandwidth", bandwidth, hackrf.set_baseband_filter_bandwidth),
+            ("gain", gain, hackrf.set_rf_gain),
+            ("if_gain", if_gain, hackrf.set_if_tx_gain)
+        ]
+
         hackrf.TIMEOUT = 0.01
-        hackrf.set_freq(self.args.frequency)
-        hackrf.set_sample_rate(self.args.sample_rate)
-        hackrf.set_baseband_filter_bandwidth(bandwidth)
-        hackrf.set_rf_gain(gain)
-        hackrf.set_if_tx_gain(if_gain)
+        for (name, value, setter) in settings:
+            if self.tuned.get(name) != value:
+                setter(value)
+                self.tuned[name] = value
+                log("hackrf " + name + " set to " + str(value))
         hackrf.TIMEOUT = 0.1
         return True
 
 
-    def modulate_messages(self, messages):
+    def reset(self):
+        """(re)opens the HackRF device and applies all settings"""
+        if not self.open_device():
+            return False
+        return self.tune()
+
+
+    def modulate_plan(self, plan: TransmissionPlan, scratch=None):
+        """modulates a TransmissionPlan into a Waveform.
+
+        Each distinct message is modulated only once, repetitions and
+        silence are generated while sending.
+
+        @param plan TransmissionPlan
+        @param scratch ModulationScratch for threads not holding the lock, None to use the one of this sender
+        """
         log("modulate messages")
-        self.args.messages = [messages]
-        messages_to_send = urh_cli.read_messages_to_send(self.args)
-        modulator = urh_cli.build_modulator_from_args(self.args)
-        samples = urh_cli.modulate_messages(messages_to_send, modulator)
+        modulator = Modulator(plan.sample_rate, plan.carrier_frequency,
+                              plan.modulation_type, plan.samples_per_symbol,
+                              plan.low_frequency, plan.high_frequency,
+                              scratch or self.modulation_scratch)
+        waveform = Waveform.from_plan(plan, modulator.modulate)
         log("modulate messages done")
-        return samples
+        return waveform
 
-    @staticmethod
-    def iq_to_bytes(samples: np.ndarray):
-        arr = Array("B", 2 * len(samples), lock=False)
-        numpy_view = np.frombuffer(arr, dtype=np.uint8)
-        numpy_view[:] = samples.flatten(order="C")
-        return arr
 
+    def init_send_parameters(self, waveform: Waveform, start_deadline=None, preempted=None):
+        return SendConfig(waveform, self.buffer_pool, self.args.sample_rate, start_deadline, preempted)
 
-    def init_send_parameters(self, samples_to_send: IQArray):
-        samples_to_send_ = samples_to_send.convert_to(np.int8)
-        send_buffer = self.iq_to_bytes(samples_to_send_)
-        total_samples = len(send_buffer)
-        return SendConfig(send_buffer, total_samples)
 
+    def send(self, waveform: Waveform, start_deadline=None, preempted=None, modulation_key=None):
+        """sends a waveform and waits for the transmission to complete.
+        self.interrupted indicates whether the waveform was preempted.
+        While sending, self.active is the SendConfig, so that other waveforms
+        with the same modulation_key can join the transmission.
 
-    def send(self, samples_to_send: np.ndarray):
-        send_config = self.init_send_parameters(samples_to_send)
+        @param waveform samples to send
+        @param start_deadline time.monotonic() at which the waveform should start, None to start immediately
+        @param preempted threading.Event, which stops the transmission at the next buffer boundary
+        @param modulation_key radio and modulation parameters of the waveform, None to prevent joining
+        @return time.monotonic() at which the first sample was requested, None if sending failed
+        """
+        send_config = self.init_send_parameters(waveform, start_deadline, preempted)
+        send_config.modulation_key = modulation_key
         log("send config generated")
 
         try:
@@ -192,31 +233,69 @@ class Sender:
             log("hackrf.start_tx_mode")
             if ret != 0:
                 logging.error("enter_async_send_mode failed")
-                return False
+                # reopen the device on the next command
+                self.reopen_required = True
+                return None
 
+            self.active = send_config
             start = time.time()
-            while not send_config.sending_is_finished():
+            # an aborted transmission is stopped at once, dropping the transfers in flight
+            while not send_config.transmission_is_complete() and not send_config.aborted:
                 try:
                     time.sleep(0.01)
                 except KeyboardInterrupt:
                     pass
-                if time.time() - start > 15:
+                # joined waveforms extend the transmission
+                if time.time() - start > max(15, 5 + send_config.total_samples / send_config.sample_rate):
                     logging.error("send did not complete")
+                    self.reopen_required = True
                     break
             log("send completed")
         finally:
-            time.sleep(0.2)
+            self.active = None
             hackrf.stop_tx_mode()
+            self.interrupted = send_config.interrupted
+            send_config.completed.set()
         log("send mode stopped")
+        return send_config.stream_start
+
+
+    def start_continuous(self, hot_radio):
+        """starts transmitting from a HotRadio, which sends silence until
+        waveforms are injected. The radio keeps transmitting until
+        stop_continuous() is called.
+
+        @return True if the radio was started
+        """
+        hot_radio.start(self.args.sample_rate, (self.args.frequency, self.args.sample_rate))
+        ret = hackrf.start_tx_mode(hot_radio.get_data_to_send)
+        log("hackrf.start_tx_mode continuous")
+        if ret != 0:
+            logging.error("enter_async_send_mode failed")
+            hot_radio.stop()
+            # reopen the device on the next command
+            self.reopen_required = True
+            return False
+        return True
+
+
+    def stop_continuous(self, hot_radio):
+        """stops transmitting from a HotRadio"""
+        hackrf.stop_tx_mode()
+        hot_radio.stop()
+        log("continuous send mode stopped")
 
 
     def shutdown_device(self):
-        hackrf.close()
+        if self.device_open:
+            hackrf.close()
+            self.device_open = False
         hackrf.exit()
 
 
 
-lock = threading.RLock()
+# the URH HackRF module handles one device per process
+lock = TransportLock("HackRF")
 
 
 class UrhInternalSender(SdrSender):
@@ -225,12 +304,43 @@ class UrhInternalSender(SdrSender):
     This code prevents a 1 second delay before each transmission when using
     HackRF devices. However, it might cause Python errors, if URH is updated"""
 
-    def __init__(self, verbose):
+    def __init__(self, verbose, waveform_cache_mb=64, multiplex=True, device_identifier=None, hot_radio=False,
+                 modulation_processes=1, template_cache_mb=0, waveform_store_mb=0):
+        """constructs the UrhInternalSender
+
+        @param verbose whether to print debug messages
+        @param waveform_cache_mb memory limit for cached send buffers in MB
+        @param multiplex whether commands may join a running transmission on the same frequency
+        @param device_identifier serial number of the HackRF, None to use any device
+        @param hot_radio whether the HackRF keeps transmitting silence between commands
+        @param modulation_processes number of processes for modulation, 0 to modulate in the calling thread
+        @param template_cache_mb memory limit for modulated messages in MB, which are shared by different commands.
+                                 It is also the limit for messages modulated ahead of time, even if they are stored on disk
+        @param waveform_store_mb disk space in MB for modulated messages kept across restarts, 0 to disable"""
         global log_enabled
         log_enabled = verbose
         self.verbose = verbose
         self.restore_loging_config()
-        self.sender = Sender()
+        self.waveform_cache = WaveformCache(waveform_cache_mb * 1024 * 1024)
+        self.template_cache = WaveformCache(template_cache_mb * 1024 * 1024)
+        self.waveform_store = self.__open_waveform_store(waveform_store_mb)
+        self.prepared = set()
+        self.prepared_bytes = 0
+        self.lock = lock
+        self.statistics_lock = threading.Lock()
+        self.timed_transmissions = 0
+        self.late_transmissions = 0
+        self.max_late_ms = 0
+        self.multiplex = multiplex
+        self.joined_transmissions = 0
+        self.modulation_pool = ModulationPool(modulation_processes) if modulation_processes > 0 else None
+        self.sender = Sender(device_identifier)
+        atexit.register(self.sender.shutdown_device)
+        self.hot_radio = None
+        if hot_radio:
+            self.hot_radio = HotRadio(MULTIPLEX_GUARD_MS, HACKRF_TRANSFER_COUNT, CHUNK_BUFFER_COUNT)
+            # atexit handlers run in reverse order, so the radio is stopped before the device is closed
+            atexit.register(self.__stop_hot_radio)
 
 
     def restore_loging_config(self):
@@ -242,37 +352,281 @@ class UrhInternalSender(SdrSender):
         logging.addLevelName(logging.CRITICAL, "CRITICAL")
 
 
-    def send(self, frequency, sample_rate, carrier_frequency, 
-             modulation_type, samples_per_symbol, low_frequency,
-             high_frequency, pause, data):
-
-        with lock:
-            self.sender.args.pause = pause
-            self.sender.args.modulation_type = modulation_type
-            self.sender.args.samples_per_symbol = samples_per_symbol
-            self.sender.args.carrier_frequency = carrier_frequency
-            self.sender.args.parameters = [low_frequency, high_frequency]
-            self.sender.args.sample_rate = sample_rate
-            self.sender.args.frequency = frequency
-
-            if self.sender.reset():
+    def send(self, plan):
+        """sends a TransmissionPlan.
+
+        The plan is split at long silence (e. g. the delay between beep and shock).
+        The radio is released during the silence, so that it can send commands
+        for other receivers. The following part is started on time using the
+        monotonic clock. It preempts commands of other receivers, which would
+        delay it.
+
+        In hot radio mode, the plan is injected into the continuous transmission
+        as a whole."""
+        if self.hot_radio is not None:
+            self.__inject(plan)
+            return
+        self.send_in_parts(plan, self.__transmit, MIN_RELEASE_SILENCE_MS, TIMED_START_LEAD_MS)
+
+
+    def __transmit(self, plan, start_deadline):
+        """sends a part of a TransmissionPlan without long silence
+
+        @return time.monotonic() at which the first sample was requested, None if sending failed or was preempted
+        """
+        preempted = get_preemption_event()
+        if self.multiplex:
+            stream_start = self.__join(plan, start_deadline, preempted)
+            if stream_start is not None:
+                if start_deadline is not None:
+                    self.__record_timing(stream_start, start_deadline)
+                return stream_start
+
+        # modulate before taking the radio, so that other commands can be sent meanwhile
+        waveform = self.__get_waveform(plan)
+        with self.lock.acquired(plan.total_samples() / plan.sample_rate):
+            if preempted is not None and preempted.is_set():
+                log("preempted before transmission")
+                return None
+
+            self.sender.args.sample_rate = plan.sample_rate
+            self.sender.args.frequency = plan.frequency
+
+            stream_start = None
+            if self.sender.tune():
                 with HidePrintIfNotVerbose(self.verbose):
                     self.sender.error = ""
-                    samples = self.sender.modulate_messages(data)
-                    self.sender.send(samples)
+                    stream_start = self.sender.send(waveform, start_deadline, preempted, plan.get_modulation_key())
                 if self.sender.error != "":
                     logging.error(self.sender.error)
+                if self.sender.interrupted:
+                    logging.info("Transmission preempted by a more urgent command")
+                    return None
+        if stream_start is not None and start_deadline is not None:
+            self.__record_timing(stream_start, start_deadline)
+        return stream_start
+
+
+    @staticmethod
+    def __open_waveform_store(waveform_store_mb):
+        if waveform_store_mb <= 0:
+            return None
+        directory = os.getenv("HOME") + "/.cache/remoshock/waveforms"
+        try:
+            return WaveformStore(directory, waveform_store_mb * 1024 * 1024)
+        except OSError as e:
+            logging.warning("Cannot use " + directory + " to store modulated signals: " + repr(e))
+            return None
+
+
+    def __get_waveform(self, plan):
+        """returns the modulated Waveform of a plan from the cache, or modulates it"""
+        key = plan.key()
+        waveform = self.waveform_cache.get(key)
+        if waveform is not None:
+            log("using cached waveform")
+            return waveform
+
+        templates = self.__get_templates(plan, dict.fromkeys(item.bits for item in plan.items if not isinstance(item, Silence)))
+        waveform = Waveform.from_plan(plan, templates.__getitem__)
+        self.waveform_cache.put(key, waveform, waveform.template_bytes())
+        return waveform
+
+
+    def __get_templates(self, plan, messages):
+        """returns the modulated samples of messages. Messages, which are neither
+        in the waveform store nor in the template cache, are modulated and added
+        to the store, if it is enabled, or to the cache.
+
+        @return dict of interleaved int8 I/Q samples by message
+        """
+        modulation_key = plan.get_modulation_key()
+        templates = {}
+        missing = []
+        for bits in messages:
+            if self.waveform_store is not None:
+                samples = self.waveform_store.get((modulation_key, bits))
+            else:
+                samples = self.template_cache.get((modulation_key, bits))
+            if samples is None:
+                missing.append(bits)
+            else:
+                templates[bits] = samples
+        if len(missing) == 0:
+            return templates
+
+        modulated = None
+        if self.modulation_pool is not None:
+            try:
+                modulated = self.modulation_pool.modulate_messages(plan, missing)
+            except Exception as e:
+                logging.warning("Modulation process failed, modulating in the server process: " + repr(e))
+        if modulated is None:
+            modulator = Modulator(plan.sample_rate, plan.carrier_frequency, plan.modulation_type, plan.samples_per_symbol,
+                                  plan.low_frequency, plan.high_frequency, ModulationScratch())
+            modulated = {bits: modulator.modulate(bits) for bits in missing}
+
+        for (bits, samples) in modulated.items():
+            if self.waveform_store is not None:
+                # the samples are read from disk, so they do not stay in memory
+                templates[bits] = self.waveform_store.put((modulation_key, bits), samples)
+            else:
+                self.template_cache.put((modulation_key, bits), samples, samples.nbytes)
+                templates[bits] = samples
+        return templates
+
+
+    def prepare(self, plan):
+        """modulates the messages of a plan ahead of time, so that commands
+        using them do not have to wait for the modulation
+
+        @param plan TransmissionPlan
+        @return False if the limit for prepared messages is reached or the waveform store or template cache is full
+        """
+        modulation_key = plan.get_modulation_key()
+        messages = dict.fromkeys(item.bits for item in plan.items
+                                 if not isinstance(item, Silence) and (modulation_key, item.bits) not in self.prepared)
+        size = sum(2 * len(bits) * plan.samples_per_symbol for bits in messages)
+        if self.prepared_bytes + size > self.template_cache.max_bytes:
+            return False
+
+        cache = self.waveform_store if self.waveform_store is not None else self.template_cache
+        missing = [bits for bits in messages if (modulation_key, bits) not in cache]
+        if cache.used_bytes + sum(2 * len(bits) * plan.samples_per_symbol for bits in missing) > cache.max_bytes:
+            return False
+        self.__get_templates(plan, missing)
+        self.prepared.update((modulation_key, bits) for bits in messages)
+        self.prepared_bytes = self.prepared_bytes + size
+        return True
+
+
+    def __inject(self, plan):
+        """sends a TransmissionPlan by injecting it into the continuous transmission
+        of the hot radio. The radio is (re)started, if it is not tuned to the plan."""
+        preempted = get_preemption_event()
+        priority = get_thread_priority()
+        waveform = self.__get_waveform(plan)
+
+        with self.lock:
+            if preempted is not None and preempted.is_set():
+                log("preempted before transmission")
+                return
+            tuning = (plan.frequency, plan.sample_rate)
+            if not self.hot_radio.running or self.hot_radio.tuning != tuning:
+                if not self.__start_hot_radio(plan, priority):
+                    return
+            injection = self.hot_radio.inject(waveform, None, preempted, priority)
+        if injection is None:
+            return
+
+        if not injection.completed.wait(max(15, 5 + waveform.total_samples() / plan.sample_rate)):
+            logging.error("send did not complete")
+        elif injection.interrupted:
+            logging.info("Transmission preempted by a more urgent command")
+
+
+    def __start_hot_radio(self, plan, priority):
+        """(re)starts the continuous transmission tuned to the plan.
+        A running transmission is stopped after its injected waveforms were sent.
+
+        @return True if the radio is running
+        """
+        if self.hot_radio.running:
+            if not self.hot_radio.wait_idle(priority):
+                logging.error("Radio did not become idle for retuning")
+            self.sender.stop_continuous(self.hot_radio)
+
+        self.sender.args.sample_rate = plan.sample_rate
+        self.sender.args.frequency = plan.frequency
+        if not self.sender.tune():
+            return False
+        return self.sender.start_continuous(self.hot_radio)
+
+
+    def __stop_hot_radio(self):
+        with self.lock:
+            if self.hot_radio.running:
+                self.sender.stop_continuous(self.hot_radio)
+
+
+    def __join(self, plan, start_deadline, preempted):
+        """adds a part of a TransmissionPlan to the running transmission, if it uses
+        the same frequency and modulation. The messages of the receivers take turns
+        (time-division multiplexing). The transmission is not extended beyond
+        the reservation of a timed transmission.
+
+        @return time.monotonic() at which the first sample was scheduled, None if the plan was not sent
+        """
+        send_config = self.sender.active
+        if send_config is None or send_config.modulation_key != plan.get_modulation_key():
+            return None
+
+        waveform = self.__get_waveform(plan)
+        # like the owner of the lock, the joined command is preempted by more urgent commands
+        with self.lock.guest():
+            stream_start = send_config.join(waveform, start_deadline, preempted, self.lock.available_until())
+            if stream_start is None:
+                return None
+            log("joined running transmission")
+            with self.statistics_lock:
+                self.joined_transmissions = self.joined_transmissions + 1
+            send_config.completed.wait()
+
+        if preempted is not None and preempted.is_set():
+            logging.info("Transmission preempted by a more urgent command")
+            return None
+        return stream_start
+
+
+    def __record_timing(self, stream_start, start_deadline):
+        """keeps track of timed transmissions, which started too late
+        because the radio was busy"""
+        with self.statistics_lock:
+            self.timed_transmissions = self.timed_transmissions + 1
+            late_ms = (stream_start - start_deadline) * 1000
+            if late_ms > 0:
+                self.late_transmissions = self.late_transmissions + 1
+                self.max_late_ms = max(self.max_late_ms, late_ms)
+                logging.warning("Transmission started " + str(round(late_ms)) + " ms late")
+
+
+    def get_statistics(self):
+        """returns statistics of the waveform cache, of timed transmissions and of the radio lock"""
+        result = super().get_statistics()
+        result["waveform_cache"] = self.waveform_cache.get_statistics()
+        if self.template_cache.max_bytes > 0:
+            result["template_cache"] = self.template_cache.get_statistics()
+            result["prepared_bytes"] = self.prepared_bytes
+        if self.waveform_store is not None:
+            result["waveform_store"] = self.waveform_store.get_statistics()
+        with self.statistics_lock:
+            result["timed_transmissions"] = {
+                "count": self.timed_transmissions,
+                "late": self.late_transmissions,
+                "max_late_ms": round(self.max_late_ms, 1)
+            }
+            result["joined_transmissions"] = self.joined_transmissions
+        if self.hot_radio is not None:
+            result["hot_radio"] = self.hot_radio.get_statistics()
+        if self.modulation_pool is not None:
+            result["modulation_pool"] = self.modulation_pool.get_statistics()
+        return result
 
 if __name__ == '__main__':
     sender = Sender()
+    args = sender.args
 
     try:
-        samples_to_send = sender.modulate_messages(sys.argv[1])
-        print(str(len(samples_to_send)))
-        sender.send(samples_to_send)
+        plan = TransmissionPlan(args.frequency, args.sample_rate, args.carrier_frequency, args.modulation_type,
+                                args.samples_per_symbol, args.parameters[0], args.parameters[1], args.pause)
+        for message in sys.argv[1].split(" "):
+            plan.add_message(message)
+        waveform = sender.modulate_plan(plan)
+        print(str(waveform.total_bytes()))
+        sender.send(waveform)
         time.sleep(1)
 
-        sender.send(samples_to_send)
+        sender.send(waveform)
 
     finally:
         sender.shutdown_device()
@@ -0,0 +1,237 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+from remoshock.sdr.urhcli import create_arguments
+
+
+class UrhWorker:
+    """a long-lived process, which transmits using Universal Radio Hacker.
+
+    Starting urh_cli for each command takes about one second for starting
+    Python and loading URH. The worker loads URH once. It receives the
+    device and the plan of each transmission as JSON line on stdin:
+
+        {"id": 1, "device": "LimeSDR", "device_identifier": null,
+         "plan": {"frequency": 27.1e6, ..., "messages": "0110/1s"}}
+        {"stop": 1}
+
+    and answers each transmission with a JSON line on stdout:
+
+        {"id": 1, "status": "ok"}
+
+    The status is "stopped", if the transmission was stopped early, or
+    "error" with a description in "error". The worker exits, when stdin
+    is closed."""
+
+    def __init__(self, transmit, output):
+        """creates an UrhWorker
+
+        @param transmit function called with the request and a threading.Event,
+                        which is set to stop the transmission
+        @param output file the answers are written to
+        """
+        self.transmit = transmit
+        self.output = output
+        self.requests = queue.Queue()
+        self.stop_requested = threading.Event()
+        self.lock = threading.Lock()
+        self.current = None
+        self.stop_id = None
+
+
+    def answer(self, data):
+        self.output.write(json.dumps(data) + "\n")
+        self.output.flush()
+
+
+    def read(self, requests):
+        """reads requests until the input is closed
+
+        @param requests file to read JSON lines from
+        """
+        for line in requests:
+            request = json.loads(line)
+            if "stop" in request:
+                with self.lock:
+                    self.stop_id = request["stop"]
+                    if self.current == self.stop_id:
+                        self.stop_requested.set()
+            else:
+                self.requests.put(request)
+        self.requests.put(None)
+
+
+    def serve(self, requests):
+        """processes requests until the input is closed
+
+        @param requests file to read JSON lines from
+        """
+        thread = threading.Thread(target=self.read, args=(requests,), name="urhworker-reader", daemon=True)
+        thread.start()
+        self.answer({"ready": True})
+
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+
+            with self.lock:
+                self.current = request["id"]
+                self.stop_requested.clear()
+                if self.stop_id == self.current:
+                    self.stop_requested.set()
+
+            try:
+                if not self.stop_requested.is_set():
+                    self.transmit(request, self.stop_requested)
+                result = {"status": "stopped" if self.stop_requested.is_set() else "ok"}
+            except (Exception, SystemExit) as e:
+                # urh_cli reports invalid arguments with sys.exit()
+                result = {"status": "error", "error": repr(e)}
+
+            with self.lock:
+                self.current = None
+            result["id"] = request["id"]
+            self.answer(result)
+
+
+
+class UrhTransmitter:
+    """transmits with Universal Radio Hacker in the running process.
+
+    Building a device detects the available backends and loads the driver.
+    The device is kept for later transmissions and only built again, if the
+    device, the frequency or the sample rate changes, or after an error.
+    Modulators are kept by modulation parameters."""
+
+    def __init__(self, urh_cli=None):
+        """creates an UrhTransmitter
+
+        @param urh_cli the urh_cli module, None to import it on first use
+        """
+        self.urh_cli = urh_cli
+        self.device = None
+        self.device_settings = None
+        self.device_errors = []
+        self.modulators = {}
+
+
+    def transmit(self, request, stop_requested):
+        """transmits the plan of a request
+
+        @param request dict with device, device_identifier and plan (see UrhWorker)
+        @param stop_requested threading.Event, which is set to stop the transmission
+        """
+        if self.urh_cli is None:
+            from urh.cli import urh_cli
+            from urh.util import Logger
+            from urh.util.Logger import logger
+            logger.setLevel(logging.ERROR)
+            Logger.save_log_level()
+            self.urh_cli = urh_cli
+        args = self.__parse_arguments(request)
+        device = self.__get_device(args)
+        modulator = self.__get_modulator(args)
+        samples = self.urh_cli.modulate_messages(self.urh_cli.read_messages_to_send(args), modulator)
+
+        try:
+            del self.device_errors[:]
+            device.samples_to_send = samples
+            device.current_index = 0
+            device.start()
+            try:
+                while not device.sending_finished and not stop_requested.wait(0.01):
+                    device.read_messages()
+                    if len(self.device_errors) > 0:
+                        raise IOError(self.device_errors[0].strip())
+            finally:
+                # ends the send process of URH, the device is kept for the next transmission
+                device.stop("Sending finished")
+        except (Exception, SystemExit):
+            self.device = None
+            raise
+
+
+    def __parse_arguments(self, request):
+        urh_cli = self.urh_cli
+        arguments = create_arguments(request["device"], request.get("device_identifier"), request["plan"])
+        args = urh_cli.create_parser().parse_args(arguments)
+
+        # defaults applied by urh_cli.main() without a project file
+        defaults = {
+            "samples_per_symbol": urh_cli.DEFAULT_SAMPLES_PER_SYMBOL,
+            "center": urh_cli.DEFAULT_CENTER,
+            "center_spacing": urh_cli.DEFAULT_CENTER_SPACING,
+            "noise": urh_cli.DEFAULT_NOISE,
+            "tolerance": urh_cli.DEFAULT_TOLERANCE,
+            "bits_per_symbol": 1,
+            "carrier_frequency": urh_cli.DEFAULT_CARRIER_FREQUENCY,
+            "carrier_amplitude": urh_cli.DEFAULT_CARRIER_AMPLITUDE,
+            "carrier_phase": urh_cli.DEFAULT_CARRIER_PHASE
+        }
+        for (name, value) in defaults.items():
+            if getattr(args, name, None) is None:
+                setattr(args, name, value)
+        return args
+
+
+    def __get_device(self, args):
+        """returns the device for the radio settings, it is built if the settings changed"""
+        settings = (args.device, args.device_identifier, args.frequency, args.sample_rate, args.bandwidth,
+                    args.gain, args.if_gain, args.baseband_gain, args.frequency_correction)
+        if self.device is not None and self.device_settings == settings:
+            return self.device
+
+        self.device = None
+        device = self.urh_cli.build_device_from_args(args)
+
+        # urh_cli exits on device errors, but the worker has to survive them
+        device.fatal_error_occurred.disconnect()
+        device.fatal_error_occurred.connect(self.device_errors.append)
+        self.device = device
+        self.device_settings = settings
+        return device
+
+
+    def __get_modulator(self, args):
+        key = (args.modulation_type, args.samples_per_symbol, tuple(args.parameters), args.carrier_frequency, args.sample_rate)
+        modulator = self.modulators.get(key)
+        if modulator is None:
+            modulator = self.urh_cli.build_modulator_from_args(args)
+            self.modulators[key] = modulator
+        return modulator
+
+
+
+def main():
+    # like urh_cli, so that URH can start device processes
+    multiprocessing.set_start_method("spawn")
+    output = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+
+    # URH prints progress bars, which must not be mixed with the answers
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    started = time.monotonic()
+    try:
+        from urh.cli import urh_cli  # noqa: F401
+    except (Exception, SystemExit) as e:
+        output.write(json.dumps({"ready": False, "error": repr(e)}) + "\n")
+        output.flush()
+        sys.exit(1)
+    print("URH loaded in " + str(round(time.monotonic() - started, 2)) + " s", file=sys.stderr)
+
+    UrhWorker(UrhTransmitter().transmit, output).serve(sys.stdin)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import collections
+
+import numpy as np
+
+from remoshock.sdr.transmissionplan import Silence
+
+
+NO_SAMPLES = np.zeros(0, dtype=np.int8)
+
+
+class Segment:
+    """a modulated message which is repeated, each repetition followed by a pause"""
+
+    def __init__(self, samples, repeats, pause):
+        """creates a Segment
+
+        @param samples modulated message as interleaved int8 I/Q values
+        @param repeats number of repetitions
+        @param pause silence in samples after each repetition
+        """
+        self.samples = samples
+        self.repeats = repeats
+        self.pause = pause
+
+
+    def period_bytes(self):
+        """size of one repetition including its pause in bytes"""
+        return len(self.samples) + 2 * self.pause
+
+
+    def total_bytes(self):
+        """size of all repetitions in bytes"""
+        return self.repeats * self.period_bytes()
+
+
+
+class Frame:
+    """one repetition of a modulated message at a position of a transmission"""
+
+    def __init__(self, start, samples, owner, pause, desired=None):
+        """creates a Frame
+
+        @param start position in samples
+        @param samples modulated message as interleaved int8 I/Q values
+        @param owner identifies the transmission the frame belongs to
+        @param pause the protocol requires at least this silence in samples before the next frame of the same owner
+        @param desired position the frame was planned for, defaults to start
+        """
+        self.start = start
+        self.samples = samples
+        self.owner = owner
+        self.pause = pause
+        self.desired = start if desired is None else desired
+
+
+    def end(self):
+        return self.start + len(self.samples) // 2
+
+
+
+class Waveform:
+    """a transmission described as sequence of repeated messages.
+
+    Each distinct message is modulated only once. The repetitions are
+    created by copying the modulated samples, which is much cheaper
+    than modulating the same message over and over again."""
+
+    def __init__(self, segments):
+        """creates a Waveform
+
+        @param segments list of Segment objects
+        """
+        self.segments = segments
+
+
+    @staticmethod
+    def from_plan(plan, modulate):
+        """creates a Waveform by modulating each distinct message of a TransmissionPlan once.
+
+        Silence does not need any memory, it is generated while sending.
+
+        @param plan TransmissionPlan
+        @param modulate function that modulates a bit string into interleaved int8 I/Q values
+        """
+        modulated = {}
+        segments = []
+        for item in plan.items:
+            if isinstance(item, Silence):
+                segments.append(Segment(NO_SAMPLES, 1, item.samples))
+                continue
+
+            samples = modulated.get(item.bits)
+            if samples is None:
+                samples = modulate(item.bits)
+                modulated[item.bits] = samples
+            segments.append(Segment(samples, item.repeats, item.gap))
+        return Waveform(segments)
+
+
+    def with_lead_in(self, samples):
+        """returns a Waveform which starts with the given number of silent samples.
+
+        The modulated messages are shared, not copied.
+
+        @param samples duration of the silence in samples
+        """
+        if samples <= 0:
+            return self
+        return Waveform([Segment(NO_SAMPLES, 1, samples)] + self.segments)
+
+
+    @staticmethod
+    def from_frames(frames):
+        """creates a Waveform from modulated messages at given positions.
+
+        Consecutive repetitions of a message with the same pause are
+        combined into one segment.
+
+        @param frames list of Frame objects sorted by start, which do not overlap
+        """
+        segments = []
+        if len(frames) > 0 and frames[0].start > 0:
+            segments.append(Segment(NO_SAMPLES, 1, frames[0].start))
+        total_samples = max([frame.end() + frame.pause for frame in frames], default=0)
+        for (i, frame) in enumerate(frames):
+            following = frames[i + 1].start if i + 1 < len(frames) else total_samples
+            pause = following - frame.end()
+            last = segments[-1] if len(segments) > 0 else None
+            if last is not None and last.samples is frame.samples and last.pause == pause:
+                last.repeats = last.repeats + 1
+            else:
+                segments.append(Segment(frame.samples, 1, pause))
+        return Waveform(segments)
+
+
+    def frames(self, offset=0, owner=None):
+        """returns each repetition of the modulated messages as Frame
+
+        @param offset position of the waveform in samples
+        @param owner identifies the transmission the frames belong to
+        """
+        frames = []
+        position = offset
+        for segment in self.segments:
+            length = len(segment.samples) // 2
+            for _ in range(segment.repeats):
+                if length > 0:
+                    frames.append(Frame(position, segment.samples, owner, segment.pause))
+                elif len(frames) > 0:
+                    frames[-1].pause = frames[-1].pause + segment.pause
+                position = position + length + segment.pause
+        return frames
+
+
+    def total_bytes(self):
+        """size of the complete transmission in bytes"""
+        return sum(segment.total_bytes() for segment in self.segments)
+
+
+    def total_samples(self):
+        """duration of the complete transmission in samples"""
+        return self.total_bytes() // 2
+
+
+    def template_bytes(self):
+        """memory used by the modulated messages in bytes"""
+        templates = {id(segment.samples): len(segment.samples) for segment in self.segments}
+        return sum(templates.values())
+
+
+    def chunks(self, buffers, start=0):
+        """generates the transmission in chunks just in time.
+
+        The buffers are filled in turn. So a chunk has to be consumed,
+        before len(buffers) further chunks are requested.
+
+        @param buffers list of equally sized uint8 numpy arrays
+        @param start offset in bytes to start at, e. g. to continue a transmission
+        """
+        buffer_index = 0
+        buffer = buffers[buffer_index].view(np.int8)
+        filled = 0
+        for segment in self.segments:
+            period = segment.period_bytes()
+            sample_bytes = len(segment.samples)
+            total = segment.total_bytes()
+            offset = min(start, total)
+            start = start - offset
+            while offset < total:
+                position = offset % period
+                if position < sample_bytes:
+                    length = min(sample_bytes - position, len(buffer) - filled)
+                    buffer[filled:filled + length] = segment.samples[position:position + length]
+                else:
+                    length = min(period - position, len(buffer) - filled)
+                    buffer[filled:filled + length] = 0
+                filled = filled + length
+                offset = offset + length
+
+                if filled == len(buffer):
+                    yield buffers[buffer_index]
+                    buffer_index = (buffer_index + 1) % len(buffers)
+                    buffer = buffers[buffer_index].view(np.int8)
+                    filled = 0
+
+        if filled > 0:
+            yield buffers[buffer_index][:filled]
+
+
+
+
+def multiplex(frames, earliest, guard):
+    """combines the frames of several transmissions into one (time-division multiplexing).
+
+    Frames starting before earliest keep their position. The other frames
+    are placed one after another, each at the earliest possible position
+    at or after the one it was planned for. Frames of the same owner keep
+    their order and at least the pause their protocol requires. Frames of
+    different owners keep a distance of guard samples. If the frames do not
+    fit into the gaps, they are delayed, so each owner gets all its frames.
+
+    @param frames list of Frame objects
+    @param earliest position in samples, before which frames are not moved
+    @param guard minimal distance between frames of different owners in samples
+    @return list of Frame objects sorted by start
+    """
+    frames = sorted(frames, key=lambda frame: frame.start)
+    result = [frame for frame in frames if frame.start < earliest]
+    queues = {}
+    for frame in frames:
+        if frame.start >= earliest:
+            queues.setdefault(frame.owner, collections.deque()).append(frame)
+
+    # end of the previous frame of each owner, after which the required pause starts
+    earliest_by_owner = {frame.owner: frame.end() + frame.pause for frame in result}
+    cursor = max([frame.end() for frame in result], default=earliest)
+    last_owner = result[-1].owner if len(result) > 0 else None
+    while len(queues) > 0:
+        best = None
+        for (owner, queue) in queues.items():
+            frame = queue[0]
+            start = max(frame.desired, earliest, cursor if owner == last_owner else cursor + guard,
+                        earliest_by_owner.get(owner, 0))
+            if best is None or (start, frame.desired) < (best[0], best[1].desired):
+                best = (start, frame)
+
+        (start, frame) = best
+        queue = queues[frame.owner]
+        queue.popleft()
+        if len(queue) == 0:
+            del queues[frame.owner]
+
+        placed = Frame(start, frame.samples, frame.owner, frame.pause, frame.desired)
+        result.append(placed)
+        cursor = placed.end()
+        last_owner = frame.owner
+        earliest_by_owner[frame.owner] = placed.end() + frame.pause
+    return result
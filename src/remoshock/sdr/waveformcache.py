@@ -0,0 +1,89 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import collections
+import threading
+
+
+class WaveformCache:
+    """a least recently used cache for modulated send buffers.
+
+    Modulation is the most CPU intensive step of a transmission. Most
+    commands are repeated many times during a session (same receiver,
+    same power, same duration), so we keep the final send buffers around
+    up to a configurable memory limit."""
+
+    def __init__(self, max_bytes):
+        """creates a WaveformCache
+
+        @param max_bytes upper limit for the memory used by cached buffers (0 disables the cache)
+        """
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.RLock()
+
+
+    def get(self, key):
+        """looks up a send buffer and marks it as recently used
+
+        @param key key of the buffer
+        @return the buffer or None, if it is not in the cache
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses = self.misses + 1
+                return None
+
+            self.hits = self.hits + 1
+            self.__entries.move_to_end(key)
+            return entry[0]
+
+
+    def put(self, key, buffer, size):
+        """adds a send buffer to the cache, evicting the least recently used
+        buffers if the memory limit is exceeded.
+
+        @param key key of the buffer
+        @param buffer the send buffer
+        @param size size of the buffer in bytes
+        """
+        if size > self.max_bytes:
+            return
+
+        with self.__lock:
+            old_entry = self.__entries.pop(key, None)
+            if old_entry is not None:
+                self.used_bytes = self.used_bytes - old_entry[1]
+
+            while self.used_bytes + size > self.max_bytes:
+                (_, (_, evicted_size)) = self.__entries.popitem(last=False)
+                self.used_bytes = self.used_bytes - evicted_size
+
+            self.__entries[key] = (buffer, size)
+            self.used_bytes = self.used_bytes + size
+
+
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.__entries
+
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+    def get_statistics(self):
+        """returns hit/miss counters and memory usage"""
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.__entries),
+                "used_bytes": self.used_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,190 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import collections
+import hashlib
+import logging
+import os
+import threading
+
+import numpy as np
+
+
+# increase if the modulation changes, so that files written by older versions are not used
+FORMAT_VERSION = 1
+
+# messages are bytes of the values 0 and 1 or strings of "0" and "1"
+TO_ASCII = bytes.maketrans(b"\x00\x01", b"01")
+
+
+class WaveformStore:
+    """keeps modulated messages on disk, so that they survive a restart.
+
+    There is one file of interleaved int8 I/Q values per message. Its name
+    is a hash of the modulation parameters and the bits of the message, so
+    a change of the protocol results in a new file. The files are memory
+    mapped instead of being loaded: Transmissions copy the samples straight
+    from the page cache and the memory used by the server does not grow
+    with the number of stored messages.
+
+    Each file is mapped once and the mapping is shared by all transmissions,
+    because a mapping keeps a file descriptor open. Only the most recently
+    used mappings are kept, so that a large store does not run into the
+    limit of open files. If the files exceed the size limit, the least
+    recently used ones are deleted."""
+
+    def __init__(self, directory, max_bytes, max_open_files=64):
+        """creates a WaveformStore
+
+        @param directory directory for the files, it is created if necessary
+        @param max_bytes upper limit for the size of all files
+        @param max_open_files upper limit for the number of mappings kept open
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_open_files = max_open_files
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.__files = collections.OrderedDict()
+        self.__maps = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".tmp"):
+                # left behind by an interrupted write
+                os.unlink(entry.path)
+            elif entry.name.endswith(".iq"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for (_, name, size) in sorted(entries):
+            self.__files[name] = size
+            self.used_bytes = self.used_bytes + size
+        with self.__lock:
+            self.__evict(0)
+
+
+    @staticmethod
+    def filename(key):
+        """returns the name of the file of a message
+
+        @param key tuple of the modulation key of the TransmissionPlan and the bits of the message
+        """
+        (modulation_key, bits) = key
+        if isinstance(bits, str):
+            bits = bits.encode("ascii")
+        else:
+            bits = bits.translate(TO_ASCII)
+        digest = hashlib.sha256(repr((FORMAT_VERSION, modulation_key)).encode("utf-8") + b"\0" + bits)
+        return digest.hexdigest() + ".iq"
+
+
+    def __contains__(self, key):
+        with self.__lock:
+            return self.filename(key) in self.__files
+
+
+    def get(self, key):
+        """maps the samples of a message into memory
+
+        @param key tuple of the modulation key of the TransmissionPlan and the bits of the message
+        @return read-only int8 numpy memmap, None if the message is not stored
+        """
+        name = self.filename(key)
+        with self.__lock:
+            if name not in self.__files:
+                self.misses = self.misses + 1
+                return None
+            self.hits = self.hits + 1
+            self.__files.move_to_end(name)
+            samples = self.__maps.get(name)
+            if samples is not None:
+                self.__maps.move_to_end(name)
+                return samples
+            try:
+                return self.__map(name)
+            except (OSError, ValueError) as e:
+                logging.warning("Stored waveform " + name + " is not readable: " + repr(e))
+                self.used_bytes = self.used_bytes - self.__files.pop(name)
+                return None
+
+
+    def put(self, key, samples):
+        """writes the samples of a message to disk
+
+        @param key tuple of the modulation key of the TransmissionPlan and the bits of the message
+        @param samples interleaved int8 I/Q values
+        @return the samples mapped from disk, or the given samples if they could not be stored
+        """
+        size = samples.nbytes
+        if size == 0 or size > self.max_bytes:
+            return samples
+
+        name = self.filename(key)
+        path = os.path.join(self.directory, name)
+        temp_path = path + "." + str(threading.get_ident()) + ".tmp"
+        try:
+            # other threads never see a partially written file
+            samples.tofile(temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning("Could not store waveform: " + repr(e))
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return samples
+
+        with self.__lock:
+            old_size = self.__files.pop(name, None)
+            if old_size is not None:
+                self.used_bytes = self.used_bytes - old_size
+            self.__evict(size)
+            self.__files[name] = size
+            self.used_bytes = self.used_bytes + size
+            self.writes = self.writes + 1
+            self.__maps.pop(name, None)
+            return self.__map(name)
+
+
+    def __map(self, name):
+        """maps a file into memory and closes the least recently used mapping,
+        if too many are open. Transmissions still using a closed mapping can
+        read it until they release it."""
+        samples = np.memmap(os.path.join(self.directory, name), dtype=np.int8, mode="r")
+        self.__maps[name] = samples
+        while len(self.__maps) > self.max_open_files:
+            self.__maps.popitem(last=False)
+        return samples
+
+
+    def __evict(self, size):
+        """deletes the least recently used files until size more bytes fit.
+        Transmissions still using a mapping of a deleted file can read it
+        until the mapping is released."""
+        while len(self.__files) > 0 and self.used_bytes + size > self.max_bytes:
+            (name, evicted_size) = self.__files.popitem(last=False)
+            self.__maps.pop(name, None)
+            self.used_bytes = self.used_bytes - evicted_size
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+    def get_statistics(self):
+        """returns hit/miss counters and disk usage"""
+        with self.__lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "files": len(self.__files),
+                "open_files": len(self.__maps),
+                "used_bytes": self.used_bytes,
+                "max_bytes": self.max_bytes
+            }
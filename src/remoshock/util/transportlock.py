@@ -0,0 +1,241 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import contextlib
+import itertools
+import threading
+import time
+
+
+context = threading.local()
+
+# priority of transmissions, which have to start at a given time (e. g. the shock of BEEPSHOCK)
+TIMED_PRIORITY = -1
+
+
+def set_thread_priority(priority, preempted=None):
+    """sets the priority of the transmissions started by the current thread
+
+    @param priority lower values are more urgent, None to reset
+    @param preempted threading.Event, which is set to ask the current thread to stop transmitting
+    """
+    context.priority = priority
+    context.preempted = preempted
+
+
+def get_thread_priority():
+    """returns the priority of the current thread, threads without priority are most urgent"""
+    return getattr(context, "priority", None) or 0
+
+
+def get_preemption_event():
+    """returns the event, which is set to ask the current thread to stop transmitting, or None"""
+    return getattr(context, "preempted", None)
+
+
+@contextlib.contextmanager
+def timed_priority():
+    """makes the current thread more urgent than all commands, so that it
+    preempts the owner of a TransportLock instead of waiting for it"""
+    previous = (getattr(context, "priority", None), get_preemption_event())
+    set_thread_priority(TIMED_PRIORITY, previous[1])
+    try:
+        yield
+    finally:
+        set_thread_priority(*previous)
+
+
+
+class TransportLock:
+    """a reentrant lock for one physical transport (e. g. a SDR or an Arduino serial port).
+
+    Independent hardware has independent locks, so that it can transmit
+    concurrently. The lock keeps track of the time threads had to wait.
+
+    Waiting threads get the lock in order of their priority. If a more
+    urgent thread has to wait, the owner is asked to stop transmitting
+    at the next buffer boundary. So are less urgent guests, which
+    transmit as part of the owner's transmission.
+
+    A thread may reserve the transport for a timed transmission (e. g. the
+    shock of BEEPSHOCK). Until then, the lock is only given to threads,
+    whose transmission ends before the reservation."""
+
+    def __init__(self, name):
+        """creates a TransportLock
+
+        @param name name of the transport used in statistics
+        """
+        self.name = name
+        self.acquisitions = 0
+        self.contended = 0
+        self.preemptions = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.__condition = threading.Condition(threading.Lock())
+        self.__owner = None
+        self.__owner_priority = None
+        self.__owner_preempted = None
+        self.__guests = []
+        self.__count = 0
+        self.__waiting = []
+        self.__reservations = {}
+        self.__sequence = itertools.count()
+
+
+    def acquire(self, duration_s=None):
+        """acquires the lock
+
+        @param duration_s expected duration of the transmission, None if unknown
+        """
+        me = threading.get_ident()
+        priority = get_thread_priority()
+        with self.__condition:
+            self.acquisitions = self.acquisitions + 1
+            if self.__owner == me:
+                self.__count = self.__count + 1
+                return
+
+            if self.__owner is not None or len(self.__waiting) > 0 or not self.__fits(priority, me, duration_s):
+                start = time.monotonic()
+                ticket = (priority, next(self.__sequence), me, duration_s)
+                self.__waiting.append(ticket)
+                if self.__fits(priority, me, duration_s):
+                    self.__preempt_owner(priority)
+                while self.__owner is not None or self.__next_ticket() != ticket:
+                    self.__condition.wait()
+                self.__waiting.remove(ticket)
+
+                wait = time.monotonic() - start
+                self.contended = self.contended + 1
+                self.total_wait_s = self.total_wait_s + wait
+                self.max_wait_s = max(self.max_wait_s, wait)
+
+            self.__owner = me
+            self.__owner_priority = priority
+            self.__owner_preempted = get_preemption_event()
+            self.__count = 1
+
+
+    def __fits(self, priority, thread, duration_s):
+        """checks whether a transmission ends before the reservations of other threads"""
+        if priority <= TIMED_PRIORITY:
+            return True
+        until = self.__available_until(thread)
+        if until is None:
+            return True
+        return duration_s is not None and time.monotonic() + duration_s <= until
+
+
+    def __next_ticket(self):
+        """returns the most urgent waiting ticket, which fits before the reservations"""
+        return min((ticket for ticket in self.__waiting if self.__fits(ticket[0], ticket[2], ticket[3])), default=None)
+
+
+    def __available_until(self, thread):
+        return min((start for (other, start) in self.__reservations.items() if other != thread), default=None)
+
+
+    def reserve(self, start):
+        """reserves the transport for a timed transmission of the current thread.
+        Other threads only get the lock, if their transmission ends before the
+        reservation. A second call moves the reservation.
+
+        @param start time.monotonic() at which the current thread will acquire the lock
+        """
+        with self.__condition:
+            self.__reservations[threading.get_ident()] = start
+            self.__condition.notify_all()
+
+
+    def cancel_reservation(self):
+        """cancels the reservation of the current thread"""
+        with self.__condition:
+            if self.__reservations.pop(threading.get_ident(), None) is not None:
+                self.__condition.notify_all()
+
+
+    def available_until(self):
+        """returns the time.monotonic() at which transmissions of the current
+        thread have to end, None if there is no reservation"""
+        with self.__condition:
+            return self.__available_until(threading.get_ident())
+
+
+    def __preempt_owner(self, priority):
+        """asks the owner and the guests to stop transmitting, if a more urgent thread waits"""
+        if self.__owner is not None and priority < self.__owner_priority:
+            self.__preempt(self.__owner_preempted)
+        for (guest_priority, preempted) in self.__guests:
+            if priority < guest_priority:
+                self.__preempt(preempted)
+
+
+    def __preempt(self, preempted):
+        if preempted is not None and not preempted.is_set():
+            self.preemptions = self.preemptions + 1
+            preempted.set()
+
+
+    @contextlib.contextmanager
+    def guest(self):
+        """registers the current thread as guest, while it transmits as part of
+        the transmission of the owner (e. g. by joining it) without holding the lock"""
+        guest = (get_thread_priority(), get_preemption_event())
+        with self.__condition:
+            self.__guests.append(guest)
+            if any(priority < guest[0] and self.__fits(priority, thread, duration_s)
+                   for (priority, _sequence, thread, duration_s) in self.__waiting):
+                self.__preempt(guest[1])
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__guests.remove(guest)
+
+
+    def release(self):
+        with self.__condition:
+            if self.__owner != threading.get_ident():
+                raise RuntimeError("cannot release un-acquired lock")
+            self.__count = self.__count - 1
+            if self.__count == 0:
+                self.__owner = None
+                self.__owner_preempted = None
+                self.__condition.notify_all()
+
+
+    @contextlib.contextmanager
+    def acquired(self, duration_s=None):
+        """acquires the lock for a transmission of known duration
+
+        @param duration_s expected duration of the transmission, None if unknown
+        """
+        self.acquire(duration_s)
+        try:
+            yield self
+        finally:
+            self.release()
+
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+
+    def __exit__(self, _type, _value, _traceback):
+        self.release()
+
+
+    def get_statistics(self):
+        """returns the number of acquisitions and the time spent waiting for the lock"""
+        with self.__condition:
+            return {
+                "name": self.name,
+                "acquisitions": self.acquisitions,
+                "contended": self.contended,
+                "preemptions": self.preemptions,
+                "total_wait_ms": round(self.total_wait_s * 1000, 1),
+                "max_wait_ms": round(self.max_wait_s * 1000, 1)
+            }
@@ -14,6 +14,8 @@ export class Ruleset {
 	#lastPunishmentTime = 0;
 	#intervalHandle;
 	#punishmentInProgress = false;
+	#lastViolationTime = 0;
+	#holdId;
 
 	constructor(appConfig, gameloopPauseTime, ui) {
 		this.#appConfig = appConfig;
@@ -53,22 +55,68 @@ export class Ruleset {
 	 */
 	async punish() {
 		let currentTime = Date.now();
+		this.#lastViolationTime = currentTime;
 		let immune_ms = parseInt(this.#appConfig.immune_ms, 10);
 		if (!this.#punishmentInProgress && this.#lastPunishmentTime + immune_ms < currentTime) {
 			this.#punishmentInProgress = true
 			this.#ui.indicate("punishing");
-			await remoshock.command(
-				parseInt(this.#appConfig.receiver, 10),
-				this.#appConfig.action,
-				parseInt(this.#appConfig.shock_power_percent, 10),
-				parseInt(this.#appConfig.duration_ms, 10),
-				"game");
+			let held = this.#appConfig.action != "BEEPSHOCK" && await this.#punishWhileViolated(currentTime);
+			if (!held) {
+				await remoshock.command(
+					parseInt(this.#appConfig.receiver, 10),
+					this.#appConfig.action,
+					parseInt(this.#appConfig.shock_power_percent, 10),
+					parseInt(this.#appConfig.duration_ms, 10),
+					"game");
+			}
 			this.#ui.stopIndicating("punishing");
 			this.#punishmentInProgress = false
 			this.#lastPunishmentTime = currentTime;
 		}
 	}
 
+	/**
+	 * punishes the player with a hold-to-activate command, which is released
+	 * after duration_ms or as soon as the player stops violating the rules
+	 *
+	 * @param startTime time of the violation
+	 * @return false, if the receiver does not support hold-to-activate commands
+	 */
+	async #punishWhileViolated(startTime) {
+		let response = await remoshock.holdStart(
+			parseInt(this.#appConfig.receiver, 10),
+			this.#appConfig.action,
+			parseInt(this.#appConfig.shock_power_percent, 10),
+			"game");
+		if (!response.ok) {
+			return false;
+		}
+		let hold = await response.json();
+		this.#holdId = hold.id;
+
+		let endTime = startTime + parseInt(this.#appConfig.duration_ms, 10);
+		let heartbeatInterval = Math.min(hold.heartbeat_timeout_ms / 2, this.#gameloopPauseTime);
+		while (this.#holdId === hold.id && Date.now() < endTime
+				&& Date.now() - this.#lastViolationTime <= 2 * this.#gameloopPauseTime) {
+			await remoshock.sleep(Math.min(heartbeatInterval, endTime - Date.now()));
+			if (this.#holdId === hold.id && !(await remoshock.holdHeartbeat(hold.id)).ok) {
+				break;
+			}
+		}
+		this.#releaseHold();
+		return true;
+	}
+
+	/**
+	 * releases the hold-to-activate command of the current punishment
+	 */
+	#releaseHold() {
+		if (this.#holdId !== undefined) {
+			remoshock.holdStop(this.#holdId);
+			this.#holdId = undefined;
+		}
+	}
+
 	/**
 	 * starts compliance checks
 	 */
@@ -91,6 +139,7 @@ export class Ruleset {
 			clearInterval(this.#intervalHandle)
 			this.#intervalHandle = undefined;
 		}
+		this.#releaseHold();
 	}
 
 	/**
@@ -118,6 +118,56 @@ class Remoshock {
 		return this.#postJson(url, command);
 	}
 
+	/**
+	 * starts a hold-to-activate command, which lasts until it is released.
+	 * The server releases it, if no heartbeat is received within
+	 * heartbeat_timeout_ms of the response.
+	 *
+	 * @param receiver number of receiver
+	 * @param action "LIGHT", "BEEP", "VIBRATE", "SHOCK"
+	 * @param power  power level 0-100
+	 */
+	holdStart(receiver, action, power, source) {
+		let url = this.urlprefix + "/hold/start"
+		let command = {
+			"receiver": receiver,
+			"action": action,
+			"power": power,
+			"source": source
+		}
+		return this.#postJson(url, command);
+	}
+
+	/**
+	 * renews a hold-to-activate command
+	 *
+	 * @param id id of the hold returned by holdStart
+	 */
+	holdHeartbeat(id) {
+		let url = this.urlprefix + "/hold/heartbeat"
+		return this.#postJson(url, {"id": id});
+	}
+
+	/**
+	 * releases a hold-to-activate command
+	 *
+	 * @param id id of the hold returned by holdStart
+	 */
+	holdStop(id) {
+		let url = this.urlprefix + "/hold/stop"
+		return this.#postJson(url, {"id": id});
+	}
+
+	/**
+	 * stops transmissions at once and drops queued commands
+	 *
+	 * @param receiver number of receiver, undefined for all receivers
+	 */
+	stop(receiver) {
+		let url = this.urlprefix + "/stop"
+		return this.#postJson(url, {"receiver": receiver});
+	}
+
 	/**
 	 * saves settings to the server
 	 *
@@ -0,0 +1,76 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+import unittest
+
+from remoshock.core.action import Action
+from remoshock.core.hold import HoldManager
+from remoshock.core.txqueue import COMPLETED, STOPPED, QueuedCommand, TxQueue
+
+
+def create_command():
+    return QueuedCommand(1, Action.VIBRATE, 10, 10000, "test", None, 10000)
+
+
+class HoldManagerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cancelled = []
+        self.hold_manager = HoldManager(self.cancelled.append, 200)
+
+
+    def test_release(self):
+        command = create_command()
+        hold = self.hold_manager.add(command)
+        self.assertTrue(self.hold_manager.heartbeat(hold.hold_id))
+        self.assertTrue(self.hold_manager.release(hold.hold_id))
+        self.assertEqual([command], self.cancelled)
+        self.assertFalse(self.hold_manager.heartbeat(hold.hold_id), "released hold cannot be renewed")
+        self.assertFalse(self.hold_manager.release(hold.hold_id))
+
+
+    def test_heartbeat_timeout(self):
+        renewed = self.hold_manager.add(create_command())
+        expiring = self.hold_manager.add(create_command())
+        for _ in range(6):
+            time.sleep(0.05)
+            self.assertTrue(self.hold_manager.heartbeat(renewed.hold_id), "heartbeat keeps the hold active")
+        self.assertEqual([expiring.queued_command], self.cancelled, "hold without heartbeat expired")
+        self.assertEqual(1, self.hold_manager.get_statistics()["expired"])
+
+
+    def test_finished_command(self):
+        command = create_command()
+        hold = self.hold_manager.add(command)
+        command.future.set_result(None)
+        self.assertFalse(self.hold_manager.heartbeat(hold.hold_id), "hold ends with its command")
+        self.assertEqual(0, self.hold_manager.get_statistics()["active"])
+
+
+    def test_release_stops_only_held_command(self):
+        running = threading.Semaphore(0)
+        released = threading.Event()
+
+        def execute(command):
+            running.release()
+            if command.receiver == 1:
+                command.preempted.wait(5)
+            else:
+                released.wait(5)
+
+        tx_queue = TxQueue("test", execute, 2)
+        hold_manager = HoldManager(tx_queue.cancel, 200)
+        held = tx_queue.submit(create_command())
+        other = tx_queue.submit(QueuedCommand(2, Action.VIBRATE, 10, 1000, "test", None, 1000))
+        running.acquire(timeout=5)
+        running.acquire(timeout=5)
+
+        hold = hold_manager.add(held)
+        self.assertTrue(hold_manager.release(hold.hold_id))
+        self.assertEqual(STOPPED, held.wait_for_outcome(5))
+        self.assertFalse(other.preempted.is_set(), "command of another receiver continues")
+        released.set()
+        self.assertEqual(COMPLETED, other.wait_for_outcome(5))
@@ -0,0 +1,54 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+import unittest
+
+from remoshock.core.prewarm import Prewarmer
+from remoshock.core.receiverproperties import ReceiverProperties
+from remoshock.receiver.patpett150 import PatpetT150
+
+
+class FakeSender:
+    """records prepared plans and runs out of memory after a limit"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.plans = []
+        self.done = threading.Event()
+
+
+    def prepare(self, plan):
+        if len(self.plans) >= self.limit:
+            self.done.set()
+            return False
+        self.plans.append(plan)
+        return True
+
+
+
+class PrewarmerTestCase(unittest.TestCase):
+
+    def test_budget(self):
+        receiver = PatpetT150(ReceiverProperties("patpett150"), "0101010101010101", 1)
+        sender = FakeSender(10)
+        receiver.boot(None, sender)
+        other = PatpetT150(ReceiverProperties("patpett150"), "0101010101010111", 1)
+        other.boot(None, sender)
+
+        prewarmer = Prewarmer([(1, receiver, sender), (2, other, sender)])
+        prewarmer.start()
+        self.assertTrue(sender.done.wait(10))
+        while prewarmer.get_statistics()["running"]:
+            time.sleep(0.01)
+
+        statistics = prewarmer.get_statistics()
+        self.assertEqual(10, statistics["prepared"])
+        self.assertEqual(2 * len(receiver.frames.frames) - 10, statistics["skipped"])
+
+        # lowest power levels first, so that all actions are covered
+        prepared = [plan.items[0].bits for plan in sender.plans]
+        expected = [receiver.frames.lookup(action, 0) for action in {key[0] for key in receiver.frames.frames}]
+        self.assertTrue(set(expected) <= set(prepared))
@@ -2,8 +2,15 @@
 # Copyright nilswinter 2020-2021. License: AGPL
 # _____________________________________________
 
+import argparse
+import configparser
 import unittest
+
+from remoshock.core.action import Action
+from remoshock.core.config import MultiReceiverSectionSupport
+from remoshock.core.receiverproperties import ReceiverProperties
 from remoshock.core.remoshock import Remoshock
+from remoshock.receiver.pac import Pac
 
 
 class RemoshockTestCase(unittest.TestCase):
@@ -14,3 +21,20 @@ class RemoshockTestCase(unittest.TestCase):
 
         remoshock = Remoshock(None)
         self.assertFalse(remoshock.debug_duration_in_message_count, "debug_duration_in_message_count must be False")
+
+
+    def test_zero_duration(self):
+        remoshock = Remoshock(None)
+        remoshock.receivers = [Pac(ReceiverProperties("pac"), "010110110", 1)]
+        self.assertIs(False, remoshock.submit(1, Action.SHOCK, 10, 0), "nothing to send is not an error")
+        self.assertIsNone(remoshock.submit(2, Action.SHOCK, 10, 0), "invalid receiver")
+        self.assertIsNone(remoshock.submit(1, Action.SHOCK, 10, -1), "invalid duration")
+
+
+    def test_config_without_sdr_sections(self):
+        remoshock = Remoshock(argparse.Namespace(enable_feature=[]))
+        remoshock.config = configparser.ConfigParser(dict_type=MultiReceiverSectionSupport, strict=False, default_section="default")
+        remoshock.config.read_string("[global]\nsdr=HackRF\n[sdr]\nname=hackrf27\nserial=1234\n[randomizer]\npause_min_s=900\n")
+        remoshock.config_manager = argparse.Namespace(settings=configparser.ConfigParser())
+        remoshock.receivers = []
+        self.assertEqual({"randomizer": {"pause_min_s": "900"}}, remoshock.get_config()["applications"], "device serials are not sent to clients")
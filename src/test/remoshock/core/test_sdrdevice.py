@@ -0,0 +1,35 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import unittest
+
+from remoshock.core.sdrdevice import SdrDevice, route_to_device
+
+
+class SdrDeviceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.general = SdrDevice("general", "HackRF")
+        self.band27 = SdrDevice("band27", "HackRF", "1234", 26e6, 28e6)
+        self.devices = [self.general, self.band27]
+
+
+    def test_covers(self):
+        self.assertTrue(self.band27.covers(27.1e6))
+        self.assertFalse(self.band27.covers(433.92e6))
+        self.assertTrue(self.general.covers(433.92e6))
+
+
+    def test_route_by_band(self):
+        self.assertIs(self.band27, route_to_device(self.devices, 27.1e6), "band limited device is preferred")
+        self.assertIs(self.general, route_to_device(self.devices, 433.92e6))
+
+
+    def test_route_by_name(self):
+        self.assertIs(self.general, route_to_device(self.devices, 27.1e6, "general"))
+        self.assertIsNone(route_to_device(self.devices, 27.1e6, "unknown"))
+
+
+    def test_route_fallback(self):
+        self.assertIs(self.band27, route_to_device([self.band27], 433.92e6), "first device if no band matches")
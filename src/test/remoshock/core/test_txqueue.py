@@ -0,0 +1,243 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from remoshock.core.action import Action
+from remoshock.core.priority import Priority
+from remoshock.core.txqueue import COMPLETED, PREEMPTED, STOPPED, QueuedCommand, TxQueue, estimate_airtime_ms
+
+
+def create_command(receiver, airtime_ms=0, priority=Priority.INTERACTIVE):
+    return QueuedCommand(receiver, Action.SHOCK, 0, airtime_ms, "test", None, airtime_ms, priority)
+
+
+class TxQueueTestCase(unittest.TestCase):
+
+    def test_order(self):
+        executed = []
+        tx_queue = TxQueue("test", lambda command: executed.append(command.command_id), 1)
+        commands = [tx_queue.submit(create_command(1)) for _ in range(5)]
+        for command in commands:
+            command.result(5)
+        self.assertEqual([command.command_id for command in commands], executed, "commands are executed in order")
+
+
+    def test_same_receiver_not_concurrent(self):
+        running = set()
+        overlaps = []
+        mutex = threading.Lock()
+
+        def execute(command):
+            with mutex:
+                if command.receiver in running:
+                    overlaps.append(command.command_id)
+                running.add(command.receiver)
+            time.sleep(0.01)
+            with mutex:
+                running.discard(command.receiver)
+
+        tx_queue = TxQueue("test", execute, 3)
+        commands = [tx_queue.submit(create_command(1 + i % 2)) for i in range(8)]
+        for command in commands:
+            command.result(5)
+        self.assertEqual([], overlaps, "commands for the same receiver must not overlap")
+        self.assertEqual(8, tx_queue.get_statistics()["processed"])
+
+
+    def test_result(self):
+        def execute(command):
+            if command.receiver == 2:
+                raise ValueError("failed")
+            return command.receiver
+
+        tx_queue = TxQueue("test", execute, 1)
+        self.assertEqual(1, tx_queue.submit(create_command(1)).result(5), "result of execute")
+        with self.assertRaises(ValueError):
+            tx_queue.submit(create_command(2)).result(5)
+
+
+    def test_estimated_time(self):
+        event = threading.Event()
+        tx_queue = TxQueue("test", lambda command: event.wait(5), 1)
+        first = tx_queue.submit(create_command(1, 1000))
+        second = tx_queue.submit(create_command(1, 500))
+        self.assertAlmostEqual(first.estimated_start + 1, first.estimated_finish, 3)
+        self.assertEqual(first.estimated_finish, second.estimated_start, "second command starts after the first one")
+        self.assertAlmostEqual(second.estimated_start + 0.5, second.estimated_finish, 3)
+        self.assertEqual(second.command_id, second.to_dict()["id"])
+        event.set()
+        second.result(5)
+
+
+    def test_priority(self):
+        event = threading.Event()
+        executed = []
+
+        def execute(command):
+            event.wait(5)
+            executed.append(command.priority)
+
+        tx_queue = TxQueue("test", execute, 1)
+        first = tx_queue.submit(create_command(1, 1000))
+        commands = [tx_queue.submit(create_command(i, 1000, priority)) for (i, priority) in
+                    [(2, Priority.KEEPALIVE), (3, Priority.SCHEDULED), (4, Priority.INTERACTIVE)]]
+        self.assertEqual(first.estimated_finish, commands[2].estimated_start, "not delayed by less urgent commands")
+        event.set()
+        for command in commands:
+            command.result(5)
+        self.assertEqual([Priority.INTERACTIVE, Priority.INTERACTIVE, Priority.SCHEDULED, Priority.KEEPALIVE], executed)
+
+
+    def test_keepalive_waits_for_idle(self):
+        event = threading.Event()
+        executed = []
+
+        def execute(command):
+            if command.receiver == 1:
+                event.wait(5)
+            executed.append(command.receiver)
+
+        tx_queue = TxQueue("test", execute, 2)
+        first = tx_queue.submit(create_command(1))
+        keepalive = tx_queue.submit(create_command(2, 0, Priority.KEEPALIVE))
+        time.sleep(0.05)
+        self.assertEqual([], executed, "keep alive is not started while another command is running")
+        event.set()
+        keepalive.result(5)
+        first.result(5)
+        self.assertEqual([1, 2], executed)
+
+
+    def test_preemption(self):
+        started = threading.Event()
+
+        def execute(command):
+            if command.priority == Priority.SCHEDULED:
+                started.set()
+                return command.preempted.wait(5)
+            return False
+
+        tx_queue = TxQueue("test", execute, 2)
+        scheduled = tx_queue.submit(create_command(1, 0, Priority.SCHEDULED))
+        started.wait(5)
+        interactive = tx_queue.submit(create_command(1))
+        self.assertTrue(scheduled.result(5), "running command of the same receiver was asked to stop")
+        self.assertEqual(PREEMPTED, scheduled.wait_for_outcome(5), "client is told that the command was cut short")
+        self.assertFalse(interactive.preempted.is_set())
+        self.assertEqual(COMPLETED, interactive.wait_for_outcome(5))
+        self.assertEqual(1, tx_queue.get_statistics()["preempted"])
+
+
+    def test_stop(self):
+        started = threading.Event()
+
+        def execute(command):
+            started.set()
+            return command.preempted.wait(5)
+
+        tx_queue = TxQueue("test", execute, 2)
+        running = tx_queue.submit(create_command(1))
+        started.wait(5)
+        pending = tx_queue.submit(create_command(1))
+        other = tx_queue.submit(create_command(2, 0, Priority.KEEPALIVE))
+        self.assertEqual(2, tx_queue.stop(1), "one running and one pending command")
+        self.assertTrue(running.result(5), "running command was asked to stop")
+        self.assertEqual(STOPPED, running.wait_for_outcome(5))
+        self.assertTrue(pending.future.cancelled(), "pending command was dropped")
+        self.assertIsNone(pending.wait_for_outcome(5), "dropped command was not executed")
+        self.assertFalse(other.future.cancelled(), "command for other receiver is kept")
+        tx_queue.stop()
+        concurrent.futures.wait([other.future], 5)
+        self.assertTrue(other.future.done(), "remaining command was stopped")
+
+
+    def test_merge(self):
+        started = threading.Event()
+        event = threading.Event()
+        executed = []
+
+        def execute(command):
+            started.set()
+            event.wait(5)
+            executed.append((command.action, command.power, command.duration))
+
+        def create(action, power, duration):
+            return QueuedCommand(1, action, power, duration, "test", None, duration, Priority.INTERACTIVE, 1000)
+
+        tx_queue = TxQueue("test", execute, 1)
+        running = tx_queue.submit(create(Action.SHOCK, 10, 500))
+        started.wait(5)
+        first = tx_queue.submit(create(Action.SHOCK, 10, 500))
+        merged = tx_queue.submit(create(Action.SHOCK, 10, 500))
+        self.assertIs(first, merged, "same action and power are merged")
+        self.assertAlmostEqual(first.estimated_start + 1, first.estimated_finish, 3)
+        limited = tx_queue.submit(create(Action.SHOCK, 10, 250))
+        self.assertIsNot(first, limited, "merged duration is limited")
+        tx_queue.submit(create(Action.SHOCK, 20, 250))
+        beep = tx_queue.submit(create(Action.BEEP, 0, 250))
+        self.assertIs(beep, tx_queue.submit(create(Action.BEEP, 5, 500)), "newer beep supersedes older one")
+        event.set()
+        beep.result(5)
+        running.result(5)
+
+        self.assertEqual([(Action.SHOCK, 10, 500), (Action.SHOCK, 10, 1000), (Action.SHOCK, 10, 250),
+                          (Action.SHOCK, 20, 250), (Action.BEEP, 5, 500)], executed)
+        self.assertEqual(2, tx_queue.get_statistics()["merged"])
+
+
+    def test_estimate_airtime_ms(self):
+        self.assertEqual(500, estimate_airtime_ms(Action.SHOCK, 500, 1000))
+        self.assertEqual(1500, estimate_airtime_ms(Action.BEEPSHOCK, 500, 1000))
+
+
+    def test_avoid_retune(self):
+        started = threading.Event()
+        event = threading.Event()
+        executed = []
+
+        def execute(command):
+            started.set()
+            event.wait(5)
+            executed.append(command.receiver)
+
+        def create(receiver, tuning):
+            return QueuedCommand(receiver, Action.SHOCK, 0, 0, "test", None, 0, Priority.INTERACTIVE, None, tuning)
+
+        tx_queue = TxQueue("test", execute, 1, 2)
+        first = tx_queue.submit(create(1, 27e6))
+        started.wait(5)
+        commands = [tx_queue.submit(create(receiver, tuning)) for (receiver, tuning) in
+                    [(2, 433e6), (3, 27e6), (4, 433e6), (5, 27e6), (6, 27e6)]]
+        event.set()
+        first.result(5)
+        for command in commands:
+            command.result(5)
+
+        self.assertEqual([1, 3, 5, 2, 4, 6], executed, "receiver 2 is overtaken at most twice")
+        statistics = tx_queue.get_statistics()
+        self.assertEqual(2, statistics["reordered"])
+        self.assertEqual(2, statistics["retunes"])
+        self.assertEqual(2, statistics["retunes_per_minute"])
+
+
+    def test_cancel(self):
+        started = threading.Event()
+
+        def execute(command):
+            started.set()
+            return command.preempted.wait(5)
+
+        tx_queue = TxQueue("test", execute, 1)
+        running = tx_queue.submit(create_command(1))
+        started.wait(5)
+        pending = tx_queue.submit(create_command(2))
+        self.assertTrue(tx_queue.cancel(pending))
+        self.assertTrue(pending.future.cancelled(), "pending command was dropped")
+        self.assertTrue(tx_queue.cancel(running))
+        self.assertTrue(running.result(5), "running command was asked to stop")
+        self.assertEqual(STOPPED, running.wait_for_outcome(5))
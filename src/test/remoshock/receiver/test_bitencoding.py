@@ -0,0 +1,25 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import unittest
+
+from remoshock.receiver.bitencoding import LineCode, concat, from_int, runs, to_string
+
+
+class BitEncodingTestCase(unittest.TestCase):
+    """tests for the encoding of frames as bit arrays"""
+
+    def test_from_int(self):
+        self.assertEqual("00010010", to_string(from_int(18, 8)), "most significant bit first")
+        self.assertEqual("010010", to_string(from_int(18, 6, lsb_first=True)), "least significant bit first")
+
+
+    def test_concat_and_runs(self):
+        self.assertEqual("0111000", to_string(concat("01", runs("10", [2, 3]))), "strings and arrays")
+
+
+    def test_line_code(self):
+        line_code = LineCode(zero="10", one="1000", prefix="11", suffix="0")
+        self.assertEqual("11" + "1000" + "10" + "1000" + "0", to_string(line_code.encode("101")), "symbols of different length")
+        self.assertEqual("110", to_string(line_code.encode("")), "empty data")
@@ -4,6 +4,7 @@
 
 import unittest
 
+from remoshock.core.action import Action
 from remoshock.core.receiverproperties import ReceiverProperties
 from remoshock.receiver.pac import Pac
 
@@ -29,3 +30,15 @@ class PacTestCase(unittest.TestCase):
         pacdog = Pac(ReceiverProperties("pac"), "010110110", 1)
         self.assertEqual("100000", pacdog.calculate_intensity_code(1), "intensity  1")
         self.assertEqual("000001", pacdog.calculate_intensity_code(32), "intensity 32")
+
+
+    def test_canonicalize(self):
+        pacdog = Pac(ReceiverProperties("pac"), "010110110", 1)
+        # 37 % and 38 % are both level 23 of 63
+        self.assertEqual((Action.SHOCK, 37, 500), pacdog.canonicalize(Action.SHOCK, 38, 600))
+        self.assertEqual((Action.SHOCK, 37, 250), pacdog.canonicalize(Action.SHOCK, 37, 10))
+        self.assertEqual((Action.LIGHT, 0, 250), pacdog.canonicalize(Action.LIGHT, 80, 250))
+
+        pacdog.boot(None, None)
+        self.assertIs(pacdog.frames.lookup(Action.SHOCK, 37), pacdog.frames.lookup(Action.SHOCK, 38), "shared frame")
+        self.assertEqual(2 * 64, len(list(pacdog.get_frame_plans())), "one frame per level")
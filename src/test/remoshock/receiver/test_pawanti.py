@@ -0,0 +1,32 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import contextlib
+import io
+import unittest
+
+from remoshock.core.receiverproperties import ReceiverProperties
+from remoshock.receiver.pawanti import Pawanti
+
+
+class PawantiTestCase(unittest.TestCase):
+    """test for Pawanti collar"""
+
+
+    def test_unsupported_transmitter_code(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            receiver = Pawanti(ReceiverProperties("pawanti"), "011100000000000000001011", 1)
+            self.assertFalse(receiver.validate_config())
+            receiver.boot(None, None)
+        self.assertEqual(1, output.getvalue().count("ERROR"), "reported once by validate_config")
+        self.assertEqual([], list(receiver.get_frame_plans()), "frames are not precomputed")
+
+
+    def test_supported_transmitter_code(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            receiver = Pawanti(ReceiverProperties("pawanti"), "011001010000000000001011", 1)
+            self.assertTrue(receiver.validate_config())
+            receiver.boot(None, None)
+        self.assertEqual(19, len(list(receiver.get_frame_plans())), "beep, 9 vibration levels and 9 shock levels")
@@ -0,0 +1,54 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import unittest
+
+from remoshock.core.action import Action
+from remoshock.receiver.bitencoding import LineCode, to_string
+from remoshock.receiver.protocol import Checksum, Constant, Field, ProtocolSpec, byte_sum, parity
+
+
+def create_protocol(checksum):
+    return ProtocolSpec(
+        fields=[
+            Constant("1"),
+            Field("action", codes={Action.BEEP: "01", Action.SHOCK: "10"}),
+            Field("power", 4, lsb_first=True),
+            checksum,
+            Field("tail", coded=False)
+        ],
+        line_code=LineCode(zero="10", one="11", prefix="000"),
+        radio=dict(frequency=433e6, sample_rate=2e6, carrier_frequency=0, modulation_type="ASK",
+                   samples_per_symbol=500, low_frequency="0", high_frequency="100", pause=100))
+
+
+class ProtocolSpecTestCase(unittest.TestCase):
+    """tests for declarative protocol descriptions"""
+
+    def test_frame(self):
+        protocol = create_protocol(Checksum("checksum", 2, parity([0, 1], [3, 4])))
+        values = {"action": Action.SHOCK, "power": 3, "tail": "01"}
+        self.assertEqual("1" + "10" + "1100" + "00" + "01", to_string(protocol.frame(values)), "fields and checksum")
+
+
+    def test_encode(self):
+        protocol = create_protocol(Checksum("checksum", 8, byte_sum))
+        values = {"action": Action.BEEP, "power": 0, "tail": "1"}
+        # bytes 10100000 and 00000001 of the frame without checksum
+        self.assertEqual("1" + "01" + "0000" + "10100001" + "1", to_string(protocol.frame(values)), "sum of the bytes")
+        encoded = to_string(protocol.encode(values))
+        self.assertEqual("000" + "11" + "10" + "11", encoded[0:9], "prefix and symbol coding")
+        self.assertEqual("11" + "1", encoded[-3:], "uncoded field")
+
+
+    def test_frame_table(self):
+        protocol = create_protocol(Checksum("checksum", 2, parity([0, 1], [3, 4])))
+
+        def values(action, power):
+            return {"action": action, "power": power, "tail": ""}
+
+        frames = protocol.compile(values, [Action.BEEP, Action.SHOCK], range(0, 16))
+        self.assertEqual(32, len(frames.frames), "all commands are precomputed")
+        self.assertEqual(protocol.encode(values(Action.SHOCK, 7)).tobytes(), frames.lookup(Action.SHOCK, 7))
+        self.assertEqual(protocol.encode(values(Action.SHOCK, 20)).tobytes(), frames.lookup(Action.SHOCK, 20), "not precomputed")
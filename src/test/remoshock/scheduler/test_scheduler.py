@@ -78,6 +78,29 @@ class TestScheduler(unittest.TestCase):
         self.assertTrue(mock_task2.called == 1, "task was executed")
         self.assertFalse(mock_task3.called == 1, "task was not executed")
 
+    def test_cancel_matching_groups(self):
+        """test cancelation of groups containing a matching task"""
+        timestamp = datetime.datetime.now()
+        delta = datetime.timedelta(milliseconds=10)
+        # far enough in the future, so that a busy machine cannot execute them before they are canceled
+        later = datetime.timedelta(seconds=1)
+        mock_task1 = MockTask(timestamp + later, "identifier1", "group_identifier")
+        scheduler().schedule_task(mock_task1)
+        mock_task2 = MockTask(timestamp + later, "identifier2", "group_identifier")
+        scheduler().schedule_task(mock_task2)
+        mock_task3 = MockTask(datetime.datetime.now() + delta, "identifier3", "other_group_identifier")
+        scheduler().schedule_task(mock_task3)
+        canceled = scheduler().cancel_matching_groups(lambda task: task.identifier == "identifier2")
+
+        for _ in range(50):
+            if mock_task3.called == 1:
+                break
+            time.sleep(.01)
+        self.assertEqual(1, canceled, "one group was canceled")
+        self.assertFalse(mock_task1.called == 1, "task of the matching group was not executed")
+        self.assertFalse(mock_task2.called == 1, "matching task was not executed")
+        self.assertTrue(mock_task3.called == 1, "task was executed")
+
     def test_periodic_task(self):
         mock_task = MockTask(None, "identifier1", None)
         periodic_task = PeriodicTask(0.010, mock_task)
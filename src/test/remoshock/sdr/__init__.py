@@ -0,0 +1,3 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
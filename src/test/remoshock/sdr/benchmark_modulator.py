@@ -0,0 +1,33 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+"""compares the speed of the native modulator with Universal Radio Hacker
+
+Usage (from the src directory): python3 -m test.remoshock.sdr.benchmark_modulator [repetitions]
+"""
+
+import sys
+import timeit
+
+from test.remoshock.sdr.test_modulator import capture_transmissions, create_modulator, distinct_messages, modulate_with_urh, urh_cli
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    if urh_cli is None:
+        print("Universal Radio Hacker is not installed, only the native modulator is measured.")
+
+    print("%-12s %-10s %6s %10s %10s" % ("receiver", "action", "bits", "native ms", "urh ms"))
+    for (name, action, plan) in capture_transmissions():
+        modulator = create_modulator(plan)
+        for bits in distinct_messages(plan):
+            native = timeit.timeit(lambda: modulator.modulate(bits), number=repetitions) / repetitions
+            urh = ""
+            if urh_cli is not None:
+                urh = "%10.2f" % (timeit.timeit(lambda: modulate_with_urh(plan, bits), number=repetitions) / repetitions * 1000)
+            print("%-12s %-10s %6d %10.2f %s" % (name, action.name, len(bits), native * 1000, urh))
+
+
+if __name__ == "__main__":
+    main()
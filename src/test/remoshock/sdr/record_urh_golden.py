@@ -0,0 +1,54 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+"""records the messages of all supported receivers modulated by Universal Radio Hacker.
+
+test_modulator compares the native modulator against these recordings, so
+that the equivalence is checked without Universal Radio Hacker installed.
+Re-record after changing the encoding of a receiver on purpose.
+
+Usage (from the src directory): python3 -m test.remoshock.sdr.record_urh_golden
+"""
+
+import hashlib
+import json
+import sys
+
+import numpy as np
+
+from test.remoshock.sdr.test_modulator import GOLDEN_FILE, capture_transmissions, create_modulator, distinct_messages, modulate_with_urh, urh_cli
+
+
+def main():
+    if urh_cli is None:
+        print("Universal Radio Hacker is not installed.")
+        sys.exit(1)
+
+    golden = []
+    for (name, action, plan) in capture_transmissions():
+        modulator = create_modulator(plan)
+        for bits in distinct_messages(plan):
+            expected = modulate_with_urh(plan, bits)
+            actual = modulator.modulate(bits)
+
+            # cosf() of the C library rounds a handful of the overdriven ASK
+            # samples differently than numpy. Their values are recorded.
+            rounding = np.nonzero(expected != actual)[0] if len(expected) == len(actual) else []
+            golden.append({
+                "receiver": name,
+                "action": action.name,
+                "bits": bits,
+                "samples": len(expected),
+                "sha256": hashlib.sha256(expected.tobytes()).hexdigest(),
+                "rounding": [[int(index), int(expected[index])] for index in rounding]
+            })
+
+    with open(GOLDEN_FILE, "w") as f:
+        json.dump(golden, f, indent=1)
+        f.write("\n")
+    print("Recorded {} messages to {}".format(len(golden), GOLDEN_FILE))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from remoshock.sdr.filesender import FileSender
+from remoshock.sdr.transmissionplan import TransmissionPlan
+from remoshock.util.transportlock import set_thread_priority
+
+
+class FileSenderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        (handle, self.filename) = tempfile.mkstemp(suffix=".log")
+        os.close(handle)
+
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+
+    def create_plan(self):
+        plan = TransmissionPlan(27.1e6, 2e6, 27.1e6, "FSK", 500, -40e3, 40e3, 100)
+        plan.add_message("1010", 2)
+        return plan
+
+
+    def read_entries(self):
+        with open(self.filename) as file:
+            return [json.loads(line) for line in file]
+
+
+    def test_send(self):
+        sender = FileSender("fake", self.filename)
+        plan = self.create_plan()
+        sender.send(plan)
+        sender.send(plan)
+
+        entries = self.read_entries()
+        self.assertEqual(2, len(entries))
+        self.assertEqual("fake", entries[0]["device"])
+        self.assertEqual(27.1e6, entries[0]["frequency"])
+        self.assertEqual(plan.to_urh_messages(), entries[0]["messages"])
+        self.assertFalse(entries[0]["interrupted"])
+        self.assertEqual(2, sender.get_statistics()["lock"]["acquisitions"])
+
+
+    def test_preemption(self):
+        sender = FileSender("fake", self.filename)
+        plan = self.create_plan()
+        plan.add_silence(5000)
+        preempted = threading.Event()
+        preempted.set()
+        set_thread_priority(1, preempted)
+        try:
+            sender.send(plan)
+        finally:
+            set_thread_priority(None)
+        self.assertTrue(self.read_entries()[0]["interrupted"])
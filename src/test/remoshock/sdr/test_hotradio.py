@@ -0,0 +1,82 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from remoshock.sdr.hotradio import HotRadio
+from remoshock.sdr.waveform import Segment, Waveform
+
+
+BUFFER_LENGTH = 8
+
+
+def create_waveform(value, repeats, pause):
+    """a waveform with a message of two samples"""
+    return Waveform([Segment(np.full(4, value, dtype=np.int8), repeats, pause)])
+
+
+class HotRadioTestCase(unittest.TestCase):
+    """tests for the continuous transmission with injected waveforms"""
+
+    def setUp(self):
+        self.hot_radio = HotRadio(0, 2)
+        self.hot_radio.start(1e9, "tuning")
+
+
+    def send(self, count):
+        """simulates the callbacks of the radio"""
+        return [bytes(self.hot_radio.get_data_to_send(BUFFER_LENGTH)) for _ in range(count)]
+
+
+    def test_silence(self):
+        self.assertEqual([bytes(BUFFER_LENGTH)] * 2, self.send(2), "the idle radio sends complete buffers of silence")
+        self.assertTrue(self.hot_radio.is_idle())
+
+
+    def test_inject(self):
+        self.send(1)
+        injection = self.hot_radio.inject(create_waveform(1, 2, 2))
+        self.assertEqual([bytes([1] * 4 + [0] * 4), bytes([1] * 4 + [0] * 4)], self.send(2), "injected at the next buffer boundary")
+        self.assertFalse(injection.completed.is_set(), "samples are still in flight")
+        self.send(2)
+        self.assertTrue(injection.completed.is_set())
+        self.assertFalse(injection.interrupted)
+        self.assertEqual(1, self.hot_radio.get_statistics()["injections"])
+
+
+    def test_injections_take_turns(self):
+        self.send(1)
+        self.hot_radio.inject(create_waveform(1, 2, 2))
+        self.hot_radio.inject(create_waveform(2, 2, 2))
+        self.assertEqual([bytes([1] * 4 + [2] * 4), bytes([1] * 4 + [2] * 4)], self.send(2))
+
+
+    def test_preemption(self):
+        preempted = threading.Event()
+        injection = self.hot_radio.inject(create_waveform(1, 4, 2), preempted=preempted)
+        self.send(1)
+        preempted.set()
+        self.assertEqual([bytes(BUFFER_LENGTH)], self.send(1), "the rest of the waveform is dropped")
+        self.assertTrue(injection.interrupted)
+        self.assertTrue(self.hot_radio.is_idle())
+
+
+    def test_stop(self):
+        injection = self.hot_radio.inject(create_waveform(1, 2, 2))
+        self.hot_radio.stop()
+        self.assertTrue(injection.interrupted)
+        self.assertIsNone(self.hot_radio.inject(create_waveform(1, 2, 2)), "stopped radio does not accept injections")
+
+
+    def test_underrun(self):
+        self.send(1)
+        time.sleep(0.01)
+        self.send(1)
+        statistics = self.hot_radio.get_statistics()
+        self.assertEqual(1, statistics["underruns"])
+        self.assertGreater(statistics["underrun_ms"], 5)
@@ -0,0 +1,54 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import os
+import unittest
+
+from remoshock.sdr.modulationpool import ModulationPool
+from remoshock.sdr.modulator import Modulator
+from remoshock.sdr.transmissionplan import TransmissionPlan
+from remoshock.sdr.waveform import Waveform
+
+
+class ModulationPoolTestCase(unittest.TestCase):
+    """tests for modulation in separate processes"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ModulationPool(2)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.executor.shutdown()
+
+
+    def test_same_samples_as_in_process(self):
+        plan = TransmissionPlan(27.1e6, 2e6, 0, "FSK", 40, 0, 20e3, 1000)
+        plan.add_message("1100101", 3).add_silence(0.001).add_message("0011")
+
+        waveform = self.pool.modulate_plan(plan)
+        modulator = Modulator(plan.sample_rate, plan.carrier_frequency, plan.modulation_type,
+                              plan.samples_per_symbol, plan.low_frequency, plan.high_frequency)
+        expected = Waveform.from_plan(plan, modulator.modulate)
+
+        self.assertEqual([segment.repeats for segment in expected.segments], [segment.repeats for segment in waveform.segments])
+        for (expected_segment, segment) in zip(expected.segments, waveform.segments):
+            self.assertEqual(expected_segment.pause, segment.pause)
+            if expected_segment.samples is None:
+                self.assertIsNone(segment.samples)
+            else:
+                self.assertEqual(expected_segment.samples.tobytes(), segment.samples.tobytes(), "modulated samples")
+        self.assertEqual(1, self.pool.get_statistics()["modulated"])
+
+
+    @unittest.skipIf(not os.path.isdir("/dev/shm"), "shared memory is not visible in the file system")
+    def test_shared_memory_released(self):
+        before = set(os.listdir("/dev/shm"))
+        plan = TransmissionPlan(27.1e6, 2e6, 0, "ASK", 40, 0, 100, 1000)
+        plan.add_message("0110").add_message("1001")
+        self.pool.modulate_plan(plan)
+        with self.assertRaises(ValueError):
+            self.pool.modulate_plan(TransmissionPlan(27.1e6, 2e6, 0, "PSK", 40, 0, 180, 1000).add_message("01"))
+        self.assertEqual(set(), set(os.listdir("/dev/shm")) - before, "no shared memory left behind")
@@ -0,0 +1,99 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+import unittest
+
+from remoshock.sdr.sdrsender import SdrSender
+from remoshock.sdr.transmissionplan import TransmissionPlan
+from remoshock.util.transportlock import TransportLock, get_preemption_event, set_thread_priority
+
+
+class FakeSender(SdrSender):
+    """transmits in buffers of 10 ms and stops early, if it is preempted"""
+
+    def __init__(self):
+        self.lock = TransportLock("fake")
+        self.starts = []
+
+
+    def transmit(self, plan, start_deadline, airtime_s=None):
+        """sends a plan
+
+        @param airtime_s duration announced to the lock, defaults to the duration of the plan
+        """
+        preempted = get_preemption_event()
+        duration = plan.total_samples() / plan.sample_rate
+        with self.lock.acquired(airtime_s or duration):
+            stream_start = max(time.monotonic(), start_deadline or 0)
+            self.starts.append((stream_start, start_deadline, plan))
+            end = stream_start + duration
+            while time.monotonic() < end:
+                if preempted is not None and preempted.is_set():
+                    return None
+                time.sleep(0.01)
+        return stream_start
+
+
+
+def create_plan(bits):
+    """creates a plan, which takes 1 ms per bit"""
+    plan = TransmissionPlan(27.1e6, 1e6, 0, "ASK", 1000, 0, 100, 0)
+    return plan.add_message(bits)
+
+
+class SdrSenderTestCase(unittest.TestCase):
+
+    def send_during_delay(self, other, airtime_s=None):
+        """sends BEEPSHOCK with a delay of 500 ms, during which another receiver sends a plan
+
+        @return starts of the transmissions, preemption event of the other receiver
+        """
+        sender = FakeSender()
+        beep_shock = create_plan("0101").add_silence(500).add_message("0110")
+        other_preempted = threading.Event()
+
+        def send_other():
+            set_thread_priority(0, other_preempted)
+            time.sleep(0.1)
+            sender.transmit(other, None, airtime_s)
+
+        thread = threading.Thread(target=send_other)
+        thread.start()
+        sender.send_in_parts(beep_shock, sender.transmit, 300, 100)
+        thread.join()
+        return (sender.starts, other_preempted)
+
+
+    def test_short_command_during_delay(self):
+        other = create_plan("1" * 100)
+        (starts, other_preempted) = self.send_during_delay(other)
+
+        self.assertIs(other, starts[1][2], "command of other receiver was sent during the delay")
+        (shock_start, deadline, _plan) = starts[2]
+        self.assertLess(shock_start - deadline, 0.05, "shock started on time")
+        self.assertFalse(other_preempted.is_set())
+
+
+    def test_long_command_waits_for_timed_part(self):
+        # the command for the other receiver would not end before the shock
+        other = create_plan("1" * 1000)
+        (starts, other_preempted) = self.send_during_delay(other)
+
+        (shock_start, deadline, _plan) = starts[1]
+        self.assertLess(shock_start - deadline, 0.05, "shock started on time")
+        self.assertIs(other, starts[2][2], "command of other receiver was sent after the shock")
+        self.assertFalse(other_preempted.is_set(), "command of other receiver was not truncated")
+
+
+    def test_timed_part_preempts_other_receiver(self):
+        # the command for the other receiver takes longer than announced
+        other = create_plan("1" * 10000)
+        (starts, other_preempted) = self.send_during_delay(other, 0.1)
+
+        (shock_start, deadline, _plan) = starts[-1]
+        self.assertTrue(other_preempted.is_set(), "other receiver was asked to stop")
+        self.assertLess(shock_start - deadline, 0.05, "shock started on time")
+        self.assertEqual(3, len(starts))
@@ -0,0 +1,137 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from remoshock.core.action import Action
+from remoshock.core.priority import Priority
+from remoshock.core.txqueue import COMPLETED, STOPPED, QueuedCommand, TxQueue
+from remoshock.sdr.sendconfig import SendConfig, TxBufferPool
+from remoshock.sdr.transmissionplan import TransmissionPlan
+from remoshock.sdr.waveform import Waveform
+
+
+BUFFER_LENGTH = 8
+
+
+def create_waveform(bit):
+    """creates 20 messages of 8 samples. Each I/Q value is 1 for bit "0" and 2 for bit "1"."""
+    plan = TransmissionPlan(0, 1000, 0, "FSK", 1, 0, 1, 8).add_message(bit * 8, 20)
+    return Waveform.from_plan(plan, lambda bits: np.repeat(np.array([int(b) + 1 for b in bits], dtype=np.int8), 2))
+
+
+class SendConfigTestCase(unittest.TestCase):
+    """tests for transmissions joined by other receivers"""
+
+    def start_joined(self, owner_preempted, joiner_preempted):
+        """starts a transmission of "1" messages, which is joined by "0" messages
+
+        @return SendConfig and the I/Q values sent so far"""
+        send_config = SendConfig(create_waveform("1"), TxBufferPool(4), 1000, None, owner_preempted)
+        values = send_config.get_data_to_send(BUFFER_LENGTH).view(np.int8).tolist()
+
+        results = []
+        joining = threading.Thread(target=lambda: results.append(send_config.join(create_waveform("0"), None, joiner_preempted)))
+        joining.start()
+        while send_config.pending_join is None:
+            time.sleep(0.001)
+        values.extend(send_config.get_data_to_send(BUFFER_LENGTH).view(np.int8).tolist())
+        joining.join()
+        self.assertIsNotNone(results[0], "joined")
+        return (send_config, values)
+
+
+    def send_rest(self, send_config):
+        """consumes the remaining chunks and returns the sent I/Q values"""
+        values = []
+        while not send_config.sending_is_finished():
+            values.extend(send_config.get_data_to_send(BUFFER_LENGTH).view(np.int8).tolist())
+        return values
+
+
+    def test_preempted_joiner_is_dropped(self):
+        joiner_preempted = threading.Event()
+        (send_config, values) = self.start_joined(threading.Event(), joiner_preempted)
+
+        joiner_preempted.set()
+        values = values + self.send_rest(send_config)
+        self.assertNotIn(1, values, "frames of the preempted receiver are dropped")
+        self.assertEqual(20 * 16, values.count(2), "the other receiver gets all messages")
+        self.assertFalse(send_config.interrupted, "the original transmission is not interrupted")
+        self.assertFalse(send_config.aborted, "the transmission is completed")
+
+
+    def test_preempted_owner_is_dropped(self):
+        owner_preempted = threading.Event()
+        (send_config, _values) = self.start_joined(owner_preempted, threading.Event())
+
+        owner_preempted.set()
+        values = self.send_rest(send_config)
+        self.assertNotIn(2, values, "frames of the preempted receiver are dropped")
+        self.assertEqual(20 * 16, values.count(1), "the joined receiver gets all messages")
+        self.assertTrue(send_config.interrupted, "the original transmission is interrupted")
+        self.assertFalse(send_config.aborted, "the joined transmission is completed")
+
+
+    def test_abort_without_remaining_frames(self):
+        owner_preempted = threading.Event()
+        joiner_preempted = threading.Event()
+        (send_config, _values) = self.start_joined(owner_preempted, joiner_preempted)
+
+        owner_preempted.set()
+        joiner_preempted.set()
+        self.assertIs(send_config.buffer_pool.silence, send_config.get_data_to_send(BUFFER_LENGTH), "nothing left to send")
+        self.assertTrue(send_config.aborted, "the transmission is aborted")
+
+
+    def test_stop_one_receiver(self):
+        """stopping a receiver does not stop the receivers, which joined its transmission"""
+        joined = threading.Event()
+        stopped = threading.Event()
+        values = []
+        send_configs = []
+
+        def execute(command):
+            if command.receiver == 1:
+                send_config = SendConfig(create_waveform("1"), TxBufferPool(4), 1000, None, command.preempted)
+                send_configs.append(send_config)
+                values.extend(send_config.get_data_to_send(BUFFER_LENGTH).view(np.int8).tolist())
+                stopped.wait(5)
+                values.extend(self.send_rest(send_config))
+            else:
+                while len(send_configs) == 0:
+                    time.sleep(0.001)
+                joining = threading.Thread(target=lambda: send_configs[0].join(create_waveform("0"), None, command.preempted))
+                joining.start()
+                while send_configs[0].pending_join is None:
+                    time.sleep(0.001)
+                values.extend(send_configs[0].get_data_to_send(BUFFER_LENGTH).view(np.int8).tolist())
+                joining.join()
+                joined.set()
+                stopped.wait(5)
+
+        tx_queue = TxQueue("test", execute, 2)
+        owner = tx_queue.submit(QueuedCommand(1, Action.SHOCK, 10, 300, "test", None, 300, Priority.INTERACTIVE))
+        joiner = tx_queue.submit(QueuedCommand(2, Action.VIBRATE, 10, 300, "test", None, 300, Priority.INTERACTIVE))
+        self.assertTrue(joined.wait(5), "second receiver joined the transmission")
+        self.assertEqual(1, tx_queue.stop(1))
+        stopped.set()
+
+        self.assertEqual(STOPPED, owner.wait_for_outcome(5))
+        self.assertEqual(COMPLETED, joiner.wait_for_outcome(5))
+        self.assertEqual(20 * 16, values.count(1), "the joined receiver gets all messages")
+        self.assertFalse(send_configs[0].aborted, "the joined transmission is completed")
+
+
+    def test_join_before_reservation(self):
+        """a joined waveform must not extend the transmission beyond a reserved time"""
+        send_config = SendConfig(create_waveform("1"), TxBufferPool(4), 1000, None, threading.Event())
+        send_config.get_data_to_send(BUFFER_LENGTH)
+        latest_end = send_config.stream_start + send_config.total_samples / 1000
+        self.assertIsNone(send_config.join(create_waveform("0"), None, threading.Event(), latest_end), "join was rejected")
+        self.assertIsNone(send_config.pending_join)
@@ -0,0 +1,55 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import unittest
+
+import numpy as np
+
+from remoshock.sdr.transmissionplan import Message, Silence, TransmissionPlan
+
+
+def create_plan():
+    return TransmissionPlan(27.1e6, 2e6, 27.1e6, "FSK", 3100, 92e3, 95e3, 100)
+
+
+class TransmissionPlanTestCase(unittest.TestCase):
+
+    def test_add_message(self):
+        plan = create_plan().add_message("01", 2).add_message("01").add_message("01", gap=0).add_message("11", 0)
+        self.assertEqual(2, len(plan.items), "consecutive identical messages are merged, empty ones skipped")
+        self.assertEqual(("message", "01", 3, 100), plan.items[0].key(), "default gap")
+        self.assertEqual(("message", "01", 1, 0), plan.items[1].key(), "explicit gap")
+
+
+    def test_add_silence(self):
+        plan = create_plan().add_message("1").add_silence(1100)
+        self.assertIsInstance(plan.items[0], Message)
+        self.assertIsInstance(plan.items[1], Silence)
+        self.assertEqual(2200000, plan.items[1].samples, "1100ms at 2 MHz")
+        self.assertEqual(3100 + 100 + 2200000, plan.total_samples(), "total duration")
+
+
+    def test_to_urh_messages(self):
+        plan = create_plan().add_silence(5).add_message("01", 2, gap=0).add_silence(1).add_message("10", 2)
+        self.assertEqual("01/0 01/2000 10 10", plan.to_urh_messages(), "urh_cli message format")
+
+
+    def test_key(self):
+        self.assertEqual(create_plan().add_message("01").key(), create_plan().add_message("01").key(), "equal plans")
+        self.assertNotEqual(create_plan().add_message("01").key(), create_plan().add_message("01", gap=0).key(), "different gaps")
+
+
+    def test_split(self):
+        plan = create_plan().add_message("1", gap=0).add_silence(0.1).add_message("0", gap=0).add_silence(1).add_message("01")
+        parts = plan.split(1000)
+        self.assertEqual([0, 3100 + 200 + 3100 + 2000], [start for (start, _) in parts], "start of each part")
+        self.assertEqual(("message", "1", 1, 0), parts[0][1].items[0].key(), "first part")
+        self.assertEqual(3, len(parts[0][1].items), "short silence is kept")
+        self.assertEqual([("message", "01", 1, 100)], [item.key() for item in parts[1][1].items], "second part")
+
+
+    def test_bit_array_messages(self):
+        plan = create_plan().add_message(np.array([0, 1], dtype=np.uint8), 2).add_message(np.array([0, 1], dtype=np.uint8))
+        self.assertEqual([("message", b"\x00\x01", 3, 100)], [item.key() for item in plan.items], "bit arrays are stored as bytes")
+        self.assertEqual("01 01 01", plan.to_urh_messages(), "urh_cli message format")
@@ -0,0 +1,64 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from remoshock.sdr.transmissionplan import TransmissionPlan
+from remoshock.sdr.urhcli import UrhCliSender
+
+
+# loads slowly, once a file exists, and answers each request with ok
+SLOW_WORKER = """
+import json, os, sys, time
+while not os.path.exists(sys.argv[1]):
+    time.sleep(0.01)
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    print(json.dumps({"id": json.loads(line)["id"], "status": "ok"}), flush=True)
+"""
+
+
+class UrhCliSenderTestCase(unittest.TestCase):
+    """tests for the worker process of urh_cli"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.loaded = os.path.join(self.directory.name, "loaded")
+        self.urh_cli_calls = os.path.join(self.directory.name, "urh_cli")
+
+        class SlowWorkerSender(UrhCliSender):
+            urh_cli_command = [sys.executable, "-c", "open(" + repr(self.urh_cli_calls) + ", 'a').write('x')"]
+            worker_command = [sys.executable, "-c", SLOW_WORKER, self.loaded]
+
+        self.sender_class = SlowWorkerSender
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_worker_started_in_background(self):
+        start = time.monotonic()
+        sender = self.sender_class("HackRF", False)
+        self.assertLess(time.monotonic() - start, 1, "the worker is not waited for")
+
+        plan = TransmissionPlan(27.1e6, 2e6, 0, "FSK", 40, 0, 20e3, 1000).add_message("0110")
+        sender.send(plan)
+        with open(self.urh_cli_calls) as f:
+            self.assertEqual("x", f.read(), "urh_cli used while the worker is loading")
+
+        open(self.loaded, "w").close()
+        for _ in range(500):
+            if sender.get_statistics()["worker"]["running"] and sender.worker_ready.is_set():
+                break
+            time.sleep(0.01)
+        sender.send(plan)
+        with open(self.urh_cli_calls) as f:
+            self.assertEqual("x", f.read(), "worker used once it is ready")
+        statistics = sender.get_statistics()["worker"]
+        self.assertEqual((1, 1), (statistics["starts"], statistics["fallbacks"]))
@@ -0,0 +1,191 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import argparse
+import io
+import json
+import threading
+import unittest
+
+from remoshock.sdr.urhworker import UrhTransmitter, UrhWorker
+
+
+class UrhWorkerTestCase(unittest.TestCase):
+    """tests for the protocol of the long-lived worker process"""
+
+    def serve(self, requests, transmit):
+        output = io.StringIO()
+        worker = UrhWorker(transmit, output)
+        worker.serve(io.StringIO("".join(json.dumps(request) + "\n" for request in requests)))
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+    def test_transmit(self):
+        transmitted = []
+
+        def transmit(request, _stop_requested):
+            if request["plan"] is None:
+                raise SystemExit(1)
+            transmitted.append(request["plan"])
+
+        answers = self.serve([{"id": 1, "plan": {"messages": "0110"}}, {"id": 2, "plan": None}], transmit)
+        self.assertEqual([{"messages": "0110"}], transmitted)
+        self.assertEqual({"ready": True}, answers[0])
+        self.assertEqual({"id": 1, "status": "ok"}, answers[1])
+        self.assertEqual("error", answers[2]["status"])
+
+
+    def test_stop(self):
+        output = io.StringIO()
+        started = threading.Event()
+
+        def transmit(_request, stop_requested):
+            started.set()
+            stop_requested.wait(5)
+
+        worker = UrhWorker(transmit, output)
+        thread = threading.Thread(target=worker.serve, args=(io.StringIO('{"id": 1, "plan": {}}\n'),))
+        thread.start()
+        started.wait(5)
+        worker.read(io.StringIO('{"stop": 1}\n'))
+        thread.join(5)
+        answers = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertIn({"id": 1, "status": "stopped"}, answers)
+
+
+    def test_stop_before_start(self):
+        transmitted = []
+        answers = self.serve([{"stop": 1}, {"id": 1, "plan": {}}], lambda request, _stop: transmitted.append(request))
+        self.assertEqual([], transmitted, "stopped transmission is not started")
+        self.assertEqual({"id": 1, "status": "stopped"}, answers[1])
+
+
+
+class FakeSignal:
+
+    def __init__(self):
+        self.slots = []
+
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+
+    def disconnect(self):
+        self.slots = []
+
+
+
+class FakeDevice:
+    """sends instantly, or fails once if asked to"""
+
+    def __init__(self, urh_cli):
+        self.urh_cli = urh_cli
+        self.fatal_error_occurred = FakeSignal()
+        self.samples_to_send = None
+        self.current_index = 0
+        self.sending_finished = False
+
+
+    def start(self):
+        self.urh_cli.started.append(self.samples_to_send)
+        self.sending_finished = False
+
+
+    def read_messages(self):
+        if self.urh_cli.fail:
+            self.urh_cli.fail = False
+            for slot in self.fatal_error_occurred.slots:
+                slot("device lost\n")
+        else:
+            self.sending_finished = True
+
+
+    def stop(self, _message):
+        pass
+
+
+
+class FakeUrhCli:
+    """the parts of urh_cli used by UrhTransmitter"""
+
+    DEFAULT_SAMPLES_PER_SYMBOL = 100
+    DEFAULT_CENTER = 0
+    DEFAULT_CENTER_SPACING = 0.1
+    DEFAULT_NOISE = 0.1
+    DEFAULT_TOLERANCE = 5
+    DEFAULT_CARRIER_FREQUENCY = 1e3
+    DEFAULT_CARRIER_AMPLITUDE = 1
+    DEFAULT_CARRIER_PHASE = 0
+
+    def __init__(self):
+        self.devices = []
+        self.started = []
+        self.fail = False
+
+
+    def create_parser(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--transmit", action="store_true")
+        for option in ["--device", "--device-identifier", "--modulation-type", "--messages", "--carrier-frequency", "--pause"]:
+            parser.add_argument(option)
+        for option in ["--frequency", "--sample-rate", "--if-gain"]:
+            parser.add_argument(option, type=float)
+        parser.add_argument("--samples-per-symbol", type=int)
+        parser.add_argument("--parameters", nargs="+")
+        parser.set_defaults(bandwidth=None, gain=None, baseband_gain=None, frequency_correction=None, verbose=None,
+                            center=None, center_spacing=None, noise=None, tolerance=None, bits_per_symbol=None,
+                            carrier_amplitude=None, carrier_phase=None)
+        return parser
+
+
+    def build_device_from_args(self, _args):
+        device = FakeDevice(self)
+        self.devices.append(device)
+        return device
+
+
+    def build_modulator_from_args(self, args):
+        return args.modulation_type
+
+
+    def read_messages_to_send(self, args):
+        return args.messages
+
+
+    def modulate_messages(self, messages, modulator):
+        return modulator + ":" + messages
+
+
+
+class UrhTransmitterTestCase(unittest.TestCase):
+    """tests for transmissions in the worker process"""
+
+    def request(self, frequency, messages):
+        plan = {"frequency": frequency, "sample_rate": 2e6, "carrier_frequency": 0, "modulation_type": "FSK",
+                "samples_per_symbol": 40, "low_frequency": 0, "high_frequency": 20e3, "pause": 1000, "messages": messages}
+        return {"id": 1, "device": "LimeSDR", "device_identifier": None, "plan": plan}
+
+
+    def test_device_kept(self):
+        urh_cli = FakeUrhCli()
+        transmitter = UrhTransmitter(urh_cli)
+        for messages in ["0110", "0111", "0110"]:
+            transmitter.transmit(self.request(27.1e6, messages), threading.Event())
+        self.assertEqual(1, len(urh_cli.devices), "device built once")
+        self.assertEqual(["FSK:0110", "FSK:0111", "FSK:0110"], urh_cli.started)
+
+        transmitter.transmit(self.request(27.2e6, "0110"), threading.Event())
+        self.assertEqual(2, len(urh_cli.devices), "device built again for another frequency")
+
+
+    def test_device_rebuilt_after_error(self):
+        urh_cli = FakeUrhCli()
+        transmitter = UrhTransmitter(urh_cli)
+        transmitter.transmit(self.request(27.1e6, "0110"), threading.Event())
+        urh_cli.fail = True
+        with self.assertRaises(IOError):
+            transmitter.transmit(self.request(27.1e6, "0110"), threading.Event())
+        transmitter.transmit(self.request(27.1e6, "0110"), threading.Event())
+        self.assertEqual(2, len(urh_cli.devices), "device built again after the error")
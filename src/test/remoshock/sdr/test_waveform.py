@@ -0,0 +1,101 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import unittest
+
+import numpy as np
+
+from remoshock.sdr.transmissionplan import TransmissionPlan
+from remoshock.sdr.waveform import Frame, Waveform, multiplex
+
+
+def create_plan():
+    """creates a plan with one sample per bit at 1 MHz and a default pause of 2 samples"""
+    return TransmissionPlan(0, 1e6, 0, "FSK", 1, 0, 1, 2)
+
+
+def modulate(bits):
+    """a fake modulator which creates one I/Q pair with value 1 or 2 per bit"""
+    return np.repeat(np.array([int(bit) + 1 for bit in bits], dtype=np.int8), 2)
+
+
+class WaveformTestCase(unittest.TestCase):
+    """tests for repeated messages that are modulated only once"""
+
+    def test_repeated_messages_are_modulated_once(self):
+        calls = []
+
+        def counting_modulate(bits):
+            calls.append(bits)
+            return modulate(bits)
+
+        waveform = Waveform.from_plan(create_plan().add_message("1", gap=0).add_message("01", 3, gap=1).add_message("01"), counting_modulate)
+        self.assertEqual(["1", "01"], calls, "each distinct message is modulated once")
+        self.assertEqual([1, 3, 1], [segment.repeats for segment in waveform.segments], "repeats")
+
+
+    def test_chunks(self):
+        waveform = Waveform.from_plan(create_plan().add_message("1", gap=0).add_message("01", 2, gap=1).add_message("0"), modulate)
+        buffers = [np.zeros(6, dtype=np.uint8), np.zeros(6, dtype=np.uint8)]
+        chunks = [chunk.view(np.int8).tolist() for chunk in waveform.chunks(buffers)]
+
+        expected = [[2, 2, 1, 1, 2, 2],
+                    [0, 0, 1, 1, 2, 2],
+                    [0, 0, 1, 1, 0, 0],
+                    [0, 0]]
+        self.assertEqual(expected, chunks, "generated chunks")
+        self.assertEqual(20, waveform.total_bytes(), "total size")
+        self.assertEqual(8, waveform.template_bytes(), "size of modulated messages")
+
+
+    def test_silence(self):
+        waveform = Waveform.from_plan(create_plan().add_message("1", gap=0).add_silence(0.003).add_message("1", gap=0), modulate)
+        buffers = [np.zeros(6, dtype=np.uint8), np.zeros(6, dtype=np.uint8)]
+        chunks = [chunk.view(np.int8).tolist() for chunk in waveform.chunks(buffers)]
+
+        self.assertEqual([[2, 2, 0, 0, 0, 0], [0, 0, 2, 2]], chunks, "silence is generated while sending")
+        self.assertEqual(2, waveform.template_bytes(), "silence does not use memory")
+
+
+    def test_lead_in(self):
+        waveform = Waveform.from_plan(create_plan().add_message("1", gap=0), modulate)
+        buffers = [np.zeros(6, dtype=np.uint8), np.zeros(6, dtype=np.uint8)]
+        chunks = [chunk.view(np.int8).tolist() for chunk in waveform.with_lead_in(2).chunks(buffers)]
+        self.assertEqual([[0, 0, 0, 0, 2, 2]], chunks, "silence before the message")
+        self.assertIs(waveform, waveform.with_lead_in(0), "no lead in")
+
+
+    def test_frames(self):
+        waveform = Waveform.from_plan(create_plan().add_message("1", 3, gap=1).add_silence(0.002).add_message("01"), modulate)
+        frames = waveform.frames()
+        self.assertEqual([0, 2, 4, 8], [frame.start for frame in frames], "start of each message")
+        self.assertEqual([1, 1, 3, 2], [frame.pause for frame in frames], "silence is added to the pause")
+        self.assertEqual(12, waveform.total_samples())
+
+        restored = Waveform.from_frames(frames)
+        buffers = [np.zeros(4, dtype=np.uint8), np.zeros(4, dtype=np.uint8)]
+        expected = [chunk.tolist() for chunk in waveform.chunks(buffers)]
+        self.assertEqual(expected, [chunk.tolist() for chunk in restored.chunks(buffers)], "same samples")
+        self.assertEqual([2, 1, 1], [segment.repeats for segment in restored.segments], "repetitions with same pause are combined")
+
+
+    def test_chunks_start(self):
+        waveform = Waveform.from_plan(create_plan().add_message("1", gap=0).add_message("01", 2, gap=1).add_message("0"), modulate)
+        buffers = [np.zeros(6, dtype=np.uint8), np.zeros(6, dtype=np.uint8)]
+        chunks = [chunk.view(np.int8).tolist() for chunk in waveform.chunks(buffers, 8)]
+        self.assertEqual([[1, 1, 2, 2, 0, 0], [1, 1, 0, 0, 0, 0]], chunks, "continued in the second period of 01")
+
+
+    def test_multiplex(self):
+        message = modulate("111")
+        running = [Frame(0, message, "a", 3), Frame(6, message, "a", 3), Frame(12, message, "a", 3)]
+        joined = [Frame(5, message, "b", 2), Frame(8, message, "b", 2)]
+        frames = multiplex(running + joined, 4, 1)
+        self.assertEqual([(0, "a"), (5, "b"), (9, "a"), (13, "b"), (17, "a")], [(frame.start, frame.owner) for frame in frames],
+                         "frames take turns and keep the pause of their protocol")
+        self.assertEqual(23, Waveform.from_frames(frames).total_samples(), "pause after the last frame")
+
+        frames = multiplex([Frame(0, message, "a", 10), Frame(13, message, "a", 10), Frame(4, message, "b", 2)], 1, 1)
+        self.assertEqual([(0, "a"), (4, "b"), (13, "a")], [(frame.start, frame.owner) for frame in frames],
+                         "frames fit into the gap")
@@ -0,0 +1,42 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import unittest
+
+from remoshock.sdr.waveformcache import WaveformCache
+
+
+class WaveformCacheTestCase(unittest.TestCase):
+    """tests for the cache of modulated send buffers"""
+
+    def test_hit_and_miss(self):
+        cache = WaveformCache(100)
+        self.assertIsNone(cache.get("a"), "empty cache")
+        cache.put("a", "buffer a", 10)
+        self.assertEqual("buffer a", cache.get("a"), "cached buffer")
+        self.assertEqual(1, cache.hits, "hits")
+        self.assertEqual(1, cache.misses, "misses")
+
+
+    def test_least_recently_used_is_evicted(self):
+        cache = WaveformCache(30)
+        cache.put("a", "buffer a", 10)
+        cache.put("b", "buffer b", 10)
+        cache.put("c", "buffer c", 10)
+        cache.get("a")
+        cache.put("d", "buffer d", 10)
+
+        self.assertIsNone(cache.get("b"), "b was evicted")
+        self.assertEqual("buffer a", cache.get("a"), "a was recently used")
+        self.assertEqual(30, cache.used_bytes, "memory limit")
+
+
+    def test_memory_limit(self):
+        cache = WaveformCache(30)
+        cache.put("a", "buffer a", 31)
+        self.assertEqual(0, len(cache), "buffer larger than limit is not cached")
+
+        cache = WaveformCache(0)
+        cache.put("a", "buffer a", 1)
+        self.assertEqual(0, len(cache), "cache is disabled")
@@ -0,0 +1,67 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from remoshock.sdr.waveformstore import WaveformStore
+
+
+MODULATION_KEY = (27.1e6, 2e6, 0, "FSK", 40, 0, 20e3)
+
+
+class WaveformStoreTestCase(unittest.TestCase):
+    """tests for modulated messages on disk"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_restart(self):
+        samples = np.arange(-100, 100, dtype=np.int8)
+        store = WaveformStore(self.directory.name, 1000)
+        self.assertIsNone(store.get((MODULATION_KEY, "0110")))
+        stored = store.put((MODULATION_KEY, "0110"), samples)
+        self.assertIsInstance(stored, np.memmap)
+        self.assertEqual(samples.tobytes(), stored.tobytes())
+
+        # bytes and strings of the same bits refer to the same file
+        store = WaveformStore(self.directory.name, 1000)
+        self.assertIn((MODULATION_KEY, b"\x00\x01\x01\x00"), store)
+        self.assertEqual(samples.tobytes(), store.get((MODULATION_KEY, "0110")).tobytes())
+        self.assertIsNone(store.get((MODULATION_KEY[:-1] + (10e3,), "0110")), "different protocol parameters")
+
+
+    def test_size_limit(self):
+        store = WaveformStore(self.directory.name, 500)
+        for bits in ["00", "01", "10"]:
+            store.put((MODULATION_KEY, bits), np.zeros(200, dtype=np.int8))
+        self.assertEqual(400, store.used_bytes)
+        self.assertNotIn((MODULATION_KEY, "00"), store, "oldest file deleted")
+        self.assertIn((MODULATION_KEY, "10"), store)
+        self.assertEqual(2, len(os.listdir(self.directory.name)))
+
+        store = WaveformStore(self.directory.name, 200)
+        self.assertEqual(1, len(os.listdir(self.directory.name)), "limit applied at start")
+
+
+    def test_open_files_limit(self):
+        store = WaveformStore(self.directory.name, 10000, max_open_files=2)
+        first = store.put((MODULATION_KEY, "00"), np.full(100, 1, dtype=np.int8))
+        for bits in ["01", "10", "11"]:
+            store.put((MODULATION_KEY, bits), np.zeros(100, dtype=np.int8))
+        self.assertEqual(2, store.get_statistics()["open_files"])
+        self.assertEqual(1, first[0], "mapping still readable after it was closed by the store")
+
+        mapped = store.get((MODULATION_KEY, "00"))
+        self.assertIsNot(first, mapped, "mapped again")
+        self.assertIs(mapped, store.get((MODULATION_KEY, "00")))
+        self.assertEqual(2, store.get_statistics()["open_files"])
@@ -0,0 +1,125 @@
+#
+# Copyright nilswinter 2026. License: AGPL
+# _____________________________________________
+
+import threading
+import time
+import unittest
+
+from remoshock.util.transportlock import TransportLock, set_thread_priority
+
+
+class TransportLockTestCase(unittest.TestCase):
+
+    def test_uncontended(self):
+        lock = TransportLock("test")
+        with lock:
+            with lock:
+                pass
+        statistics = lock.get_statistics()
+        self.assertEqual(2, statistics["acquisitions"], "reentrant acquisitions")
+        self.assertEqual(0, statistics["contended"], "no waiting")
+
+
+    def test_wait_time(self):
+        lock = TransportLock("test")
+        locked = threading.Event()
+
+        def hold():
+            with lock:
+                locked.set()
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        locked.wait()
+        with lock:
+            pass
+        thread.join()
+
+        statistics = lock.get_statistics()
+        self.assertEqual(1, statistics["contended"], "second thread had to wait")
+        self.assertGreaterEqual(statistics["max_wait_ms"], 20, "wait time")
+
+
+    def test_priority(self):
+        lock = TransportLock("test")
+        order = []
+        waiting = []
+
+        def wait_for_lock(priority):
+            set_thread_priority(priority)
+            with lock:
+                order.append(priority)
+
+        lock.acquire()
+        for priority in [2, 0, 1]:
+            thread = threading.Thread(target=wait_for_lock, args=(priority,))
+            thread.start()
+            waiting.append(thread)
+            while lock.get_statistics()["acquisitions"] < len(waiting) + 1:
+                time.sleep(0.001)
+        lock.release()
+        for thread in waiting:
+            thread.join()
+        self.assertEqual([0, 1, 2], order, "most urgent thread first")
+
+
+    def test_preemption(self):
+        lock = TransportLock("test")
+        preempted = threading.Event()
+        locked = threading.Event()
+
+        def hold():
+            set_thread_priority(2, preempted)
+            with lock:
+                locked.set()
+                preempted.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        locked.wait()
+        set_thread_priority(0)
+        with lock:
+            self.assertTrue(preempted.is_set(), "less urgent owner was asked to stop")
+        set_thread_priority(None)
+        thread.join()
+        self.assertEqual(1, lock.get_statistics()["preemptions"])
+
+
+    def test_guest_preemption(self):
+        lock = TransportLock("test")
+        owner_preempted = threading.Event()
+        guest_preempted = threading.Event()
+        urgent_guest_preempted = threading.Event()
+        waiting = threading.Event()
+
+        def guest(priority, preempted):
+            set_thread_priority(priority, preempted)
+            with lock.guest():
+                waiting.wait(5)
+
+        set_thread_priority(0, owner_preempted)
+        lock.acquire()
+        guests = [threading.Thread(target=guest, args=(2, guest_preempted)),
+                  threading.Thread(target=guest, args=(0, urgent_guest_preempted))]
+        for thread in guests:
+            thread.start()
+
+        def wait_for_lock():
+            set_thread_priority(1)
+            with lock:
+                pass
+
+        waiter = threading.Thread(target=wait_for_lock)
+        waiter.start()
+        guest_preempted.wait(5)
+        self.assertTrue(guest_preempted.is_set(), "less urgent guest was asked to stop")
+        self.assertFalse(urgent_guest_preempted.is_set(), "more urgent guest continues")
+        self.assertFalse(owner_preempted.is_set(), "more urgent owner continues")
+
+        lock.release()
+        set_thread_priority(None)
+        waiting.set()
+        for thread in guests + [waiter]:
+            thread.join()